@@ -4,8 +4,9 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_wtf.csrf import CSRFProtect
 from config import config
+from app.replica import RoutingSession
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 migrate = Migrate()
 csrf = CSRFProtect()
 
@@ -29,21 +30,55 @@ def create_app(config_name='default'):
     # Load configuration
     app.config.from_object(config[config_name])
     
+    # Time pool checkouts when a queue pool is configured
+    engine_options = app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {}
+    if app.config.get('DB_POOL_METRICS') and 'pool_size' in engine_options:
+        from app.instrumentation import InstrumentedQueuePool
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = dict(engine_options, poolclass=InstrumentedQueuePool)
+
     # Initialize extensions
     db.init_app(app)
     migrate.init_app(app, db)
     csrf.init_app(app)
+
+    from app import replica, instrumentation, tenancy
+    replica.init_app(app)
+    instrumentation.init_app(app)
+    tenancy.init_app(app)
     
     # Import models to register with SQLAlchemy
     from app.models import category, expense
+
+    # Register full-text search index DDL with the expenses table
+    from app import search
+
+    # Keep columnar analytics snapshots in step with committed writes
+    from app import analytics
     
+    # Format integer cents in templates: {{ expense.amount_cents|money }}
+    from app.money import format_cents
+    app.add_template_filter(format_cents, 'money')
+
+    # {% cache %} fragments and the on-disk template bytecode cache
+    from app import fragments
+    fragments.init_app(app)
+
     # Register blueprints
     from app.routes.main import main_bp
+    from app.routes.api import api_bp
+    from app.routes.internal import internal_bp
+    from app.routes.auth import auth_bp
+    app.register_blueprint(auth_bp)
     app.register_blueprint(main_bp)
+    csrf.exempt(api_bp)
+    app.register_blueprint(api_bp)
+    app.register_blueprint(internal_bp)
     
-    # Create database tables
-    with app.app_context():
-        db.create_all()
+    # Schema creation is an explicit step (flask init-db); opt in for development.
+    # Only on the primary: a read replica gets its schema by replication
+    if app.config.get('AUTO_CREATE_SCHEMA'):
+        with app.app_context():
+            db.create_all(bind_key=None)
     
     # Shell context for CLI
     @app.shell_context_processor
@@ -0,0 +1,460 @@
+"""
+Columnar Expense Analytics for Flask Expense Tracker
+
+Optional in-memory engine for analytic views. Each process keeps a columnar
+snapshot of each active user's expenses as NumPy arrays (date as days since the Unix
+epoch, amount in integer cents, category id), loaded once in bulk and kept
+current from the ORM insert/update/delete events of committed transactions.
+Totals, category mixes, percentiles and arbitrary range/group queries are
+then answered with vectorized operations instead of SQL round trips.
+
+Writes that bypass the ORM (bulk import, other processes) are detected via
+the user's 'expenses' data version stamp and trigger a reload, like the
+category registry. Requires numpy and ANALYTICS_ENABLED; check available() first.
+When enabled, the dashboard and summary API take their aggregates from it.
+numpy is only imported once analytics is used, so apps with it disabled
+never pay for loading it.
+"""
+
+import threading
+import time
+from datetime import date, datetime
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+from app import db
+from app.cache import LRUCache
+from app.models.expense import Expense
+from app.models.version import DataVersion
+from app.money import from_cents
+from app.tenancy import current_user_id, split_key, tenant_key
+
+# numpy, imported by load_numpy() on first use; False if it is not installed
+np = None
+
+EPOCH = date(1970, 1, 1)
+
+GROUP_BY_OPTIONS = ('day', 'month', 'year', 'category')
+
+# Users whose snapshots each worker keeps; the least recently used are dropped
+ANALYTICS_SNAPSHOTS = 64
+
+# Rows fetched per round trip while loading a snapshot
+LOAD_FETCH_SIZE = 10000
+
+
+def load_numpy():
+    """Import numpy on first use. Returns whether it is installed."""
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:  # pragma: no cover - numpy is an optional dependency
+            numpy = False
+        np = numpy
+    return np is not False
+
+
+def available():
+    """Whether the engine can be used: it is enabled and numpy is installed."""
+    return has_app_context() and bool(current_app.config.get('ANALYTICS_ENABLED')) and load_numpy()
+
+
+def _day(value):
+    """Days since the Unix epoch for a date."""
+    return (value - EPOCH).days
+
+
+def _month_bounds(year, month):
+    """Epoch-day range [start, end) of a month."""
+    end = date(year + month // 12, month % 12 + 1, 1)
+    return _day(date(year, month, 1)), _day(end)
+
+
+class ExpenseColumns:
+    """
+    Columnar snapshot of one user's expenses.
+
+    Attributes:
+        version (int): User's 'expenses' data version the snapshot corresponds to
+        loaded_at (float): Monotonic time of the bulk load
+        checked_at (float): Monotonic time the version was last verified
+    """
+
+    def __init__(self, ids, days, cents, categories, version):
+        self._lock = threading.Lock()
+        self.ids = ids
+        self.days = days
+        self.cents = cents
+        self.categories = categories
+        self.live = np.ones(len(ids), dtype=bool)
+        self.index = {int(expense_id): row for row, expense_id in enumerate(ids)}
+        self.pending = {}
+        self.version = version
+        self.loaded_at = self.checked_at = time.monotonic()
+
+    def __repr__(self):
+        return f'<ExpenseColumns rows={len(self)} version={self.version}>'
+
+    def __len__(self):
+        with self._lock:
+            self._merge()
+            return int(self.live.sum())
+
+    @classmethod
+    def load(cls):
+        """
+        Bulk load a snapshot of the current user's expenses with one streamed SELECT.
+
+        Raises:
+            RuntimeError: If numpy is not installed
+        """
+        if not load_numpy():
+            raise RuntimeError('Columnar analytics needs numpy; run `pip install numpy`')
+        key = tenant_key('expenses')
+        version = DataVersion.current(key)[key]
+        stmt = db.select(
+            Expense.id, Expense.date, Expense.amount_cents, Expense.category_id
+        ).order_by(Expense.id).execution_options(yield_per=LOAD_FETCH_SIZE)
+
+        ids, days, cents, categories = [], [], [], []
+        for row in db.session.execute(stmt):
+            ids.append(row.id)
+            days.append(row.date)
+            cents.append(row.amount_cents)
+            categories.append(row.category_id)
+
+        return cls(
+            np.array(ids, dtype=np.int64),
+            np.array(days, dtype='datetime64[D]').astype(np.int32),
+            np.array(cents, dtype=np.int64),
+            np.array(categories, dtype=np.int32),
+            version
+        )
+
+    def apply(self, changes):
+        """
+        Apply committed ORM changes.
+
+        Args:
+            changes (list): ('upsert', id, date, amount_cents, category_id) or
+                ('delete', id) tuples, in commit order. Upserts of known ids
+                overwrite, so replaying a change is harmless.
+        """
+        with self._lock:
+            for change in changes:
+                expense_id = change[1]
+                row = self.index.get(expense_id)
+                if change[0] == 'delete':
+                    self.pending.pop(expense_id, None)
+                    if row is not None:
+                        self.live[row] = False
+                    continue
+
+                _, _, expense_date, cents, category_id = change
+                values = (_day(expense_date), cents, category_id)
+                if row is None:
+                    self.pending[expense_id] = values
+                else:
+                    self.days[row], self.cents[row], self.categories[row] = values
+                    self.live[row] = True
+
+    def _merge(self):
+        """Append pending inserts to the arrays. Caller holds the lock."""
+        if not self.pending:
+            return
+        start = len(self.ids)
+        new_ids = list(self.pending)
+        days, cents, categories = zip(*self.pending.values())
+        self.ids = np.concatenate([self.ids, np.array(new_ids, dtype=np.int64)])
+        self.days = np.concatenate([self.days, np.array(days, dtype=np.int32)])
+        self.cents = np.concatenate([self.cents, np.array(cents, dtype=np.int64)])
+        self.categories = np.concatenate([self.categories, np.array(categories, dtype=np.int32)])
+        self.live = np.concatenate([self.live, np.ones(len(new_ids), dtype=bool)])
+        self.index.update({expense_id: start + offset for offset, expense_id in enumerate(new_ids)})
+        self.pending.clear()
+
+    def _select(self, start=None, end=None, category_id=None):
+        """
+        Return (days, cents, categories) for live rows matching the filters.
+
+        Args:
+            start (date): First day, inclusive
+            end (date): Last day, inclusive
+            category_id (int): Only this category
+        """
+        with self._lock:
+            self._merge()
+            mask = self.live.copy()
+            if start is not None:
+                mask &= self.days >= _day(start)
+            if end is not None:
+                mask &= self.days <= _day(end)
+            if category_id:
+                mask &= self.categories == category_id
+            return self.days[mask], self.cents[mask], self.categories[mask]
+
+    def _range_total(self, start_day, end_day):
+        """Sum of cents for live rows with start_day <= day < end_day."""
+        with self._lock:
+            self._merge()
+            mask = self.live & (self.days >= start_day) & (self.days < end_day)
+            return int(self.cents[mask].sum())
+
+    def monthly_total(self, year, month):
+        """Total spent in a month, in cents."""
+        return self._range_total(*_month_bounds(year, month))
+
+    def yearly_total(self, year):
+        """Total spent in a year, in cents."""
+        return self._range_total(_day(date(year, 1, 1)), _day(date(year + 1, 1, 1)))
+
+    def aggregate(self, start=None, end=None, category_id=None, group_by=None):
+        """
+        Sum and count expenses, optionally grouped.
+
+        Args:
+            start (date): First day, inclusive
+            end (date): Last day, inclusive
+            category_id (int): Only this category
+            group_by (str): None, 'day', 'month', 'year' or 'category'
+        Returns:
+            dict: {'total_cents', 'count'} without grouping, else
+                {key: (total cents, count)} keyed by first day of the period
+                or by category id
+        Raises:
+            ValueError: If group_by is not supported
+        """
+        days, cents, categories = self._select(start, end, category_id)
+        if group_by is None:
+            return {'total_cents': int(cents.sum()), 'count': int(len(cents))}
+        if group_by not in GROUP_BY_OPTIONS:
+            raise ValueError(f"Unsupported grouping: {group_by}")
+
+        if group_by == 'category':
+            keys = categories
+        else:
+            unit = {'day': 'D', 'month': 'M', 'year': 'Y'}[group_by]
+            keys = days.astype('datetime64[D]').astype(f'datetime64[{unit}]').astype('datetime64[D]').astype(np.int64)
+
+        unique, inverse = np.unique(keys, return_inverse=True)
+        totals = np.zeros(len(unique), dtype=np.int64)
+        np.add.at(totals, inverse, cents)
+        counts = np.bincount(inverse, minlength=len(unique))
+
+        result = {}
+        for key, total, count in zip(unique.tolist(), totals.tolist(), counts.tolist()):
+            if group_by != 'category':
+                key = date.fromordinal(EPOCH.toordinal() + key)
+            result[key] = (total, count)
+        return result
+
+    def percentiles(self, percents=(50, 90, 99), start=None, end=None, category_id=None):
+        """
+        Expense amount percentiles.
+
+        Returns:
+            dict: {percent: amount}, empty when no expenses match
+        """
+        _, cents, _ = self._select(start, end, category_id)
+        if not len(cents):
+            return {}
+        values = np.percentile(cents, percents)
+        return {percent: round(float(value) / 100, 2) for percent, value in zip(percents, values)}
+
+
+class AnalyticsEngine:
+    """
+    Process-local columnar snapshots, one per database and user.
+
+    The user's 'expenses' stamp is checked at most every ANALYTICS_CHECK_INTERVAL
+    seconds; a stamp that moved for reasons other than this process's ORM
+    writes (which are applied incrementally) triggers a full reload. Only the
+    maxsize most recently used users keep a snapshot.
+    """
+
+    def __init__(self, maxsize=ANALYTICS_SNAPSHOTS):
+        self._lock = threading.Lock()
+        self._snapshots = LRUCache(maxsize=maxsize)
+
+    def _scope(self, user_id=None):
+        """Key snapshots by database and user, so apps and users never share them."""
+        return db.engine, user_id if user_id is not None else current_user_id()
+
+    def snapshot(self):
+        """Return a current snapshot, loading or reloading it if stale."""
+        scope = self._scope()
+        check_interval = current_app.config.get('ANALYTICS_CHECK_INTERVAL', 2)
+        now = time.monotonic()
+
+        snapshot = self._snapshots.get(scope)
+        if snapshot:
+            if now - snapshot.checked_at < check_interval:
+                return snapshot
+            key = tenant_key('expenses')
+            if DataVersion.current(key)[key] == snapshot.version:
+                snapshot.checked_at = now
+                return snapshot
+
+        with self._lock:
+            snapshot = ExpenseColumns.load()
+            self._snapshots.set(scope, snapshot)
+        return snapshot
+
+    def apply(self, changes, bumps):
+        """
+        Apply committed ORM changes and the stamp bumps they caused.
+
+        Args:
+            changes (dict): user id -> list of changes (see ExpenseColumns.apply)
+            bumps (dict): user id -> number of 'expenses' stamp bumps
+        """
+        for user_id, user_changes in changes.items():
+            snapshot = self._snapshots.get(self._scope(user_id))
+            if snapshot is not None:
+                snapshot.apply(user_changes)
+                snapshot.version += bumps.get(user_id, 0)
+
+    def invalidate(self):
+        """Drop all snapshots."""
+        with self._lock:
+            self._snapshots.clear()
+
+    def get_monthly_total(self, year=None, month=None):
+        """Get total expenses for a specific month, as an exact Decimal."""
+        today = datetime.now()
+        return from_cents(self.snapshot().monthly_total(year or today.year, month or today.month))
+
+    def get_yearly_total(self, year=None):
+        """Get total expenses for a specific year, as an exact Decimal."""
+        return from_cents(self.snapshot().yearly_total(year or datetime.now().year))
+
+    def get_category_totals(self, year=None, month=None):
+        """Get expense totals in cents grouped by category, like Expense.get_category_totals."""
+        from app.models.category import category_registry
+
+        start = end = None
+        if year and month:
+            start = date(year, month, 1)
+            end = date.fromordinal(date(year + month // 12, month % 12 + 1, 1).toordinal() - 1)
+
+        totals = self.snapshot().aggregate(start, end, group_by='category')
+        results = []
+        for category in category_registry.all():
+            if category.id in totals:
+                results.append({
+                    'category': category.name,
+                    'icon': category.icon,
+                    'color': category.color,
+                    'total_cents': totals[category.id][0]
+                })
+        return results
+
+    def get_dashboard_stats(self, year=None, month=None):
+        """Get all dashboard aggregates, in the shape of Expense.get_dashboard_stats."""
+        today = datetime.now()
+        year = year or today.year
+        month = month or today.month
+        snapshot = self.snapshot()
+        return {
+            'monthly_total_cents': snapshot.monthly_total(year, month),
+            'yearly_total_cents': snapshot.yearly_total(year),
+            'total_count': len(snapshot),
+            'category_totals': self.get_category_totals(year, month)
+        }
+
+    def aggregate(self, start=None, end=None, category_id=None, group_by=None):
+        """Sum and count expenses over a range, optionally grouped. See ExpenseColumns.aggregate."""
+        return self.snapshot().aggregate(start, end, category_id, group_by)
+
+    def percentiles(self, percents=(50, 90, 99), start=None, end=None, category_id=None):
+        """Expense amount percentiles. See ExpenseColumns.percentiles."""
+        return self.snapshot().percentiles(percents, start, end, category_id)
+
+    def check_consistency(self):
+        """
+        Compare the snapshot with SQL, per (month, category).
+
+        Returns:
+            list: (month start, category id, snapshot (total, count),
+                SQL (total, count)) for every group that differs
+        """
+        snapshot = self.snapshot()
+        days, cents, categories = snapshot._select()
+        months = days.astype('datetime64[D]').astype('datetime64[M]').astype('datetime64[D]').astype(np.int64)
+
+        memory = {}
+        for month_day, category_id, amount in zip(months.tolist(), categories.tolist(), cents.tolist()):
+            key = (date.fromordinal(EPOCH.toordinal() + month_day), category_id)
+            total, count = memory.get(key, (0, 0))
+            memory[key] = (total + amount, count + 1)
+
+        year_col = db.extract('year', Expense.date)
+        month_col = db.extract('month', Expense.date)
+        rows = db.session.query(
+            year_col, month_col, Expense.category_id,
+            db.func.sum(Expense.amount_cents), db.func.count(Expense.id)
+        ).group_by(year_col, month_col, Expense.category_id)
+        database = {
+            (date(int(year), int(month), 1), category_id): (int(total), count)
+            for year, month, category_id, total, count in rows
+        }
+
+        mismatches = []
+        for key in sorted(set(memory) | set(database)):
+            ours, theirs = memory.get(key, (0, 0)), database.get(key, (0, 0))
+            if ours != theirs:
+                mismatches.append((
+                    key[0], key[1],
+                    (ours[0] / 100, ours[1]),
+                    (theirs[0] / 100, theirs[1])
+                ))
+        return mismatches
+
+
+analytics = AnalyticsEngine()
+
+
+def _record(target, change):
+    """Queue a change, per owning user, on the writing session until it commits."""
+    session = object_session(target)
+    if session is not None and available():
+        changes = session.info.setdefault('analytics_changes', {})
+        changes.setdefault(target.user_id, []).append(change)
+
+
+@event.listens_for(Expense, 'after_insert')
+@event.listens_for(Expense, 'after_update')
+def _record_upsert(mapper, connection, target):
+    _record(target, ('upsert', target.id, target.date, target.amount_cents, target.category_id))
+
+
+@event.listens_for(Expense, 'after_delete')
+def _record_delete(mapper, connection, target):
+    _record(target, ('delete', target.id))
+
+
+@event.listens_for(Session, 'after_flush')
+def _count_version_bumps(session, flush_context):
+    """Count the per-user 'expenses' stamp bumps caused by ORM flushes."""
+    for key in flush_context.attributes.get('bumped_versions', ()):
+        name, user_id = split_key(key)
+        if name == 'expenses':
+            bumps = session.info.setdefault('analytics_bumps', {})
+            bumps[user_id] = bumps.get(user_id, 0) + 1
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_changes(session):
+    """Apply a committed transaction's expense changes to this process's snapshot."""
+    changes = session.info.pop('analytics_changes', None)
+    bumps = session.info.pop('analytics_bumps', {})
+    if changes and has_app_context():
+        analytics.apply(changes, bumps)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_changes(session):
+    """Forget changes from a transaction that was rolled back."""
+    session.info.pop('analytics_changes', None)
+    session.info.pop('analytics_bumps', None)
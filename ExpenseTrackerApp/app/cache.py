@@ -0,0 +1,77 @@
+"""
+In-Process Caches for Flask Expense Tracker
+
+Small thread-safe LRU cache used to keep computed results between requests
+within one worker process.
+"""
+
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    Thread-safe least-recently-used cache with a fixed number of entries.
+
+    Attributes:
+        maxsize (int): Maximum number of entries kept
+        hits (int): Number of successful lookups
+        misses (int): Number of failed lookups
+    """
+
+    _missing = object()
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __repr__(self):
+        return f'<LRUCache {len(self._data)}/{self.maxsize} hits={self.hits} misses={self.misses}>'
+
+    def get(self, key, default=None):
+        """Return the cached value for key, marking it most recently used."""
+        with self._lock:
+            value = self._data.get(key, self._missing)
+            if value is self._missing:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        """Store value under key, evicting the least recently used entry."""
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_set(self, key, factory):
+        """Return the cached value for key, computing it with factory() on a miss."""
+        value = self.get(key, self._missing)
+        if value is self._missing:
+            value = factory()
+            self.set(key, value)
+        return value
+
+    def pop(self, key, default=None):
+        """Remove key and return its value, or default if it is not cached."""
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def keys(self):
+        """Return a snapshot list of the cached keys, least recently used first."""
+        with self._lock:
+            return list(self._data)
+
+    def clear(self):
+        """Remove all entries."""
+        with self._lock:
+            self._data.clear()
@@ -0,0 +1,108 @@
+"""
+Streaming Expense Export for Flask Expense Tracker
+
+Exports expenses as CSV or NDJSON by streaming plain column rows from a
+server-side cursor, so memory use stays flat regardless of row count.
+"""
+
+import csv
+import json
+from app import db
+from app.models.category import Category
+from app.models.expense import Expense
+from app.money import cents_to_float, format_cents
+from app.replica import use_replica
+
+EXPORT_FORMATS = ('csv', 'ndjson')
+
+EXPORT_COLUMNS = ('id', 'date', 'description', 'amount', 'category', 'notes', 'created_at')
+
+# Rows fetched from the cursor per round trip
+EXPORT_FETCH_SIZE = 1000
+
+
+class _LineBuffer:
+    """File-like object that hands back whatever csv.writer writes."""
+
+    def write(self, value):
+        return value
+
+
+def export_statement(search_term=None, category_id=None):
+    """Build the export SELECT with the same filters as the expenses list."""
+    stmt = db.select(
+        Expense.id,
+        Expense.date,
+        Expense.description,
+        Expense.amount_cents,
+        Category.name.label('category'),
+        Expense.notes,
+        Expense.created_at
+    ).join(Category, Category.id == Expense.category_id)
+
+    stmt = Expense.apply_filters(stmt, search_term, category_id, ranked=False)
+    return stmt.order_by(
+        Expense.date.desc(),
+        Expense.created_at.desc(),
+        Expense.id.desc()
+    )
+
+
+def _stream_rows(search_term, category_id):
+    """Yield result rows through a server-side cursor on the read replica."""
+    # Build the statement on the replica too: the search backend depends on
+    # the database that runs it
+    with use_replica():
+        stmt = export_statement(search_term, category_id).execution_options(
+            yield_per=EXPORT_FETCH_SIZE
+        )
+        result = db.session.execute(stmt)
+    try:
+        for row in result:
+            yield row
+    finally:
+        result.close()
+
+
+def generate_csv(search_term=None, category_id=None):
+    """Yield the export as CSV text chunks, header first."""
+    writer = csv.writer(_LineBuffer())
+    yield writer.writerow(EXPORT_COLUMNS)
+    for row in _stream_rows(search_term, category_id):
+        yield writer.writerow((
+            row.id,
+            row.date.isoformat(),
+            row.description,
+            format_cents(row.amount_cents),
+            row.category,
+            row.notes or '',
+            row.created_at.isoformat()
+        ))
+
+
+def generate_ndjson(search_term=None, category_id=None):
+    """Yield the export as newline-delimited JSON, one expense per line."""
+    for row in _stream_rows(search_term, category_id):
+        yield json.dumps({
+            'id': row.id,
+            'date': row.date.isoformat(),
+            'description': row.description,
+            'amount': cents_to_float(row.amount_cents),
+            'category': row.category,
+            'notes': row.notes,
+            'created_at': row.created_at.isoformat()
+        }, ensure_ascii=False) + '\n'
+
+
+def generate_export(fmt, search_term=None, category_id=None):
+    """
+    Return a generator producing the export in the given format.
+
+    Raises:
+        ValueError: If fmt is not supported
+    """
+    if fmt == 'csv':
+        return generate_csv(search_term, category_id)
+    if fmt == 'ndjson':
+        return generate_ndjson(search_term, category_id)
+    raise ValueError(f"Unsupported export format: {fmt}")
@@ -0,0 +1,109 @@
+"""
+Template Fragment Caching for Flask Expense Tracker
+
+Adds a {% cache %} tag that renders a block once and reuses the HTML until
+its key changes:
+
+    {% cache 'category_options', categories %}
+        ... expensive markup ...
+    {% endcache %}
+
+The first argument names the fragment; the others are the values it
+depends on, such as data version stamps or the category snapshot from the
+registry (a new tuple after every reload). Keys are also scoped to the
+database and the current user, so users never see each other's markup.
+Rendered fragments live in a per-process LRU cache. A block whose key has
+a missing (undefined or None) or unhashable part is rendered without
+caching. Pass data only a cached block uses as a LazySequence, so its
+query only runs when the block is rendered.
+
+Also sets up a Jinja bytecode cache on disk, so freshly started workers
+load compiled templates instead of compiling them again.
+"""
+
+import os
+from jinja2 import FileSystemBytecodeCache, Undefined, nodes
+from jinja2.ext import Extension
+from app import db
+from app.cache import LRUCache
+from app.tenancy import current_user_id
+
+
+class FragmentCacheExtension(Extension):
+    """Jinja extension implementing {% cache name, key... %}...{% endcache %}."""
+
+    tags = {'cache'}
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        environment.extend(fragment_cache=None)
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        parts = [parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            parts.append(parser.parse_expression())
+        body = parser.parse_statements(('name:endcache',), drop_needle=True)
+        return nodes.CallBlock(
+            self.call_method('_render', [nodes.List(parts)]), [], [], body
+        ).set_lineno(lineno)
+
+    def _render(self, parts, caller):
+        """Return the cached fragment for parts, rendering it on a miss."""
+        cache = self.environment.fragment_cache
+        if cache is None or any(part is None or isinstance(part, Undefined) for part in parts):
+            return caller()
+
+        key = (db.engine, current_user_id(), *parts)
+        try:
+            hash(key)
+        except TypeError:
+            return caller()
+        return cache.get_or_set(key, caller)
+
+
+class LazySequence:
+    """
+    A sequence loaded by calling load() the first time it is used.
+
+    Example:
+        render_template('index.html', recent_expenses=LazySequence(
+            lambda: Expense.get_recent_expenses(limit=10)
+        ))
+    """
+
+    def __init__(self, load):
+        self._load = load
+        self._items = None
+
+    @property
+    def items(self):
+        """The loaded items, loading them on first access."""
+        if self._items is None:
+            self._items = list(self._load())
+        return self._items
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __getitem__(self, index):
+        return self.items[index]
+
+    def __repr__(self):
+        state = f'{len(self._items)} items' if self._items is not None else 'not loaded'
+        return f'<LazySequence {state}>'
+
+
+def init_app(app):
+    """Enable fragment caching and the template bytecode cache for app."""
+    app.jinja_env.add_extension(FragmentCacheExtension)
+    size = app.config.get('FRAGMENT_CACHE_SIZE', 512)
+    app.jinja_env.fragment_cache = LRUCache(maxsize=size) if size else None
+
+    directory = app.config.get('JINJA_BYTECODE_CACHE_DIR')
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(directory)
@@ -0,0 +1,360 @@
+"""
+Query Instrumentation for Flask Expense Tracker
+
+Counts and times SQL statements issued through the app's engines, so tests
+and debugging sessions can check how many queries a request really costs;
+adds per-request Server-Timing headers and a slow-query log; and records
+connection pool checkout metrics.
+
+Statement listeners are only attached to an engine while something needs
+them: for the app's lifetime when QUERY_INSTRUMENTATION is on, otherwise
+just for the duration of a count_queries() or query_budget() block, so
+statements cost nothing extra when instrumentation is off.
+"""
+
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from flask import before_render_template, current_app, g, has_app_context, request, template_rendered
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+_local = threading.local()
+
+# Engine -> number of active users of its statement listeners
+_listener_users = weakref.WeakKeyDictionary()
+_listener_lock = threading.Lock()
+
+
+class QueryCounter:
+    """
+    Collects the SQL statements executed while it is active.
+
+    Attributes:
+        statements (list): SQL text of each executed statement
+        parameters (list): Bound parameters of each statement, in the same order
+        durations (list): Seconds each statement took, in the same order
+    """
+
+    def __init__(self):
+        self.statements = []
+        self.parameters = []
+        self.durations = []
+
+    @property
+    def count(self):
+        """Number of statements executed."""
+        return len(self.statements)
+
+    @property
+    def total_time(self):
+        """Seconds spent executing statements."""
+        return sum(self.durations)
+
+    def __repr__(self):
+        return f'<QueryCounter {self.count} queries in {self.total_time * 1000:.1f}ms>'
+
+
+def _push_counter(counter):
+    """Activate counter on this thread."""
+    counters = getattr(_local, 'counters', None)
+    if counters is None:
+        counters = _local.counters = []
+    counters.append(counter)
+
+
+def _pop_counter(counter):
+    """Deactivate counter on this thread."""
+    counters = getattr(_local, 'counters', [])
+    if counter in counters:
+        counters.remove(counter)
+
+
+def _start_statement(conn, cursor, statement, parameters, context, executemany):
+    """Note when the statement started."""
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+
+def _finish_statement(conn, statement, parameters):
+    """Record the statement and its duration on every active counter."""
+    started = conn.info.get('query_started')
+    elapsed = time.perf_counter() - started.pop() if started else 0.0
+    for counter in getattr(_local, 'counters', ()):
+        counter.statements.append(statement)
+        counter.parameters.append(parameters)
+        counter.durations.append(elapsed)
+
+
+def _record_statement(conn, cursor, statement, parameters, context, executemany):
+    """Record a successful statement."""
+    _finish_statement(conn, statement, parameters)
+
+
+def _record_failed_statement(exception_context):
+    """Record a statement that raised, so its start time is not leaked."""
+    if exception_context.connection is not None and exception_context.statement is not None:
+        _finish_statement(
+            exception_context.connection,
+            exception_context.statement,
+            exception_context.parameters
+        )
+
+
+_LISTENERS = (
+    ('before_cursor_execute', _start_statement),
+    ('after_cursor_execute', _record_statement),
+    ('handle_error', _record_failed_statement)
+)
+
+
+def _listen(engines):
+    """Attach the statement listeners to engines, counting nested users."""
+    with _listener_lock:
+        for engine in engines:
+            users = _listener_users.get(engine, 0)
+            if not users:
+                for name, listener in _LISTENERS:
+                    event.listen(engine, name, listener)
+            _listener_users[engine] = users + 1
+
+
+def _unlisten(engines):
+    """Release engines from _listen(), detaching the listeners from unused ones."""
+    with _listener_lock:
+        for engine in engines:
+            users = _listener_users.get(engine, 0) - 1
+            if users <= 0:
+                _listener_users.pop(engine, None)
+                for name, listener in _LISTENERS:
+                    event.remove(engine, name, listener)
+            else:
+                _listener_users[engine] = users
+
+
+def _app_engines(app=None):
+    """Return every engine of app, or of the current app."""
+    from app import db
+
+    if app is None:
+        if not has_app_context():
+            return []
+        app = current_app._get_current_object()
+    with app.app_context():
+        return list(db.engines.values())
+
+
+@contextmanager
+def count_queries(app=None):
+    """
+    Count queries executed on this thread within the block.
+
+    Args:
+        app (Flask): App whose engines to watch; defaults to the current app,
+            and must be given outside an app context (e.g. around test
+            client requests)
+
+    Example:
+        with count_queries(app) as counter:
+            client.get('/')
+        print(counter.count)
+    """
+    engines = _app_engines(app)
+    _listen(engines)
+    counter = QueryCounter()
+    _push_counter(counter)
+    try:
+        yield counter
+    finally:
+        _pop_counter(counter)
+        _unlisten(engines)
+
+
+@contextmanager
+def query_budget(max_queries, app=None):
+    """
+    Fail if the block executes more than max_queries SQL statements.
+
+    Intended for tests guarding against N+1 regressions:
+
+        with query_budget(4, app):
+            client.get('/expenses')
+
+    Raises:
+        AssertionError: If the budget is exceeded, listing every statement
+    """
+    with count_queries(app) as counter:
+        yield counter
+    if counter.count > max_queries:
+        listing = '\n'.join(f'  {i}. {sql}' for i, sql in enumerate(counter.statements, 1))
+        raise AssertionError(
+            f"Query budget exceeded: {counter.count} queries (budget {max_queries})\n{listing}"
+        )
+
+
+class PoolMetrics:
+    """
+    Counters for connection checkouts from one pool.
+
+    Attributes:
+        checkouts (int): Successful checkouts
+        timeouts (int): Checkouts that gave up after pool_timeout
+        overflow_checkouts (int): Checkouts served beyond pool_size
+        peak_overflow (int): Highest overflow connection count seen
+        total_wait (float): Seconds spent waiting for checkouts
+        max_wait (float): Longest single checkout wait in seconds
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.overflow_checkouts = 0
+        self.peak_overflow = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record_checkout(self, wait, overflow):
+        """Record a successful checkout that took wait seconds."""
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            if overflow > 0:
+                self.overflow_checkouts += 1
+                self.peak_overflow = max(self.peak_overflow, overflow)
+
+    def record_timeout(self, wait):
+        """Record a checkout that timed out after wait seconds."""
+        with self._lock:
+            self.timeouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def to_dict(self):
+        """Convert the counters to a dictionary for JSON serialization."""
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            return {
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'overflow_checkouts': self.overflow_checkouts,
+                'peak_overflow': self.peak_overflow,
+                'total_wait_ms': round(self.total_wait * 1000, 3),
+                'avg_wait_ms': round(self.total_wait * 1000 / attempts, 3) if attempts else 0.0,
+                'max_wait_ms': round(self.max_wait * 1000, 3)
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that times every checkout and counts overflow and timeouts."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            self.metrics.record_timeout(time.perf_counter() - started)
+            raise
+        self.metrics.record_checkout(time.perf_counter() - started, self.overflow())
+        return connection
+
+
+def pool_stats(engine):
+    """Return the current state and checkout metrics of an engine's pool."""
+    pool = engine.pool
+    stats = {
+        'pool_class': type(pool).__name__,
+        'status': pool.status()
+    }
+    if isinstance(pool, QueuePool):
+        stats.update({
+            'size': pool.size(),
+            'checked_in': pool.checkedin(),
+            'checked_out': pool.checkedout(),
+            'overflow': pool.overflow()
+        })
+    metrics = getattr(pool, 'metrics', None)
+    if metrics is not None:
+        stats['metrics'] = metrics.to_dict()
+    return stats
+
+
+def _template_started(sender, template, context, **extra):
+    """Note when a template starts rendering."""
+    stack = getattr(g, '_template_started', None)
+    if stack is not None:
+        stack.append(time.perf_counter())
+
+
+def _template_finished(sender, template, context, **extra):
+    """Add the render time of a finished template to the request total."""
+    stack = getattr(g, '_template_started', None)
+    if stack:
+        elapsed = time.perf_counter() - stack.pop()
+        # Only count outermost renders; nested renders are already included
+        if not stack:
+            g._template_time += elapsed
+
+
+def init_app(app):
+    """
+    Instrument every request when QUERY_INSTRUMENTATION is enabled.
+
+    Counts queries and database time per request, logs statements slower
+    than SLOW_QUERY_THRESHOLD_MS with their route, and adds a Server-Timing
+    header breaking out db, template render and total time.
+    """
+    if not app.config.get('QUERY_INSTRUMENTATION'):
+        return
+
+    _listen(_app_engines(app))
+    before_render_template.connect(_template_started, app)
+    template_rendered.connect(_template_finished, app)
+
+    @app.before_request
+    def start_request_timing():
+        g._request_started = time.perf_counter()
+        g._template_started = []
+        g._template_time = 0.0
+        g._query_counter = QueryCounter()
+        _push_counter(g._query_counter)
+
+    @app.after_request
+    def add_server_timing(response):
+        counter = g.pop('_query_counter', None)
+        started = g.pop('_request_started', None)
+        if counter is None or started is None:
+            return response
+        _pop_counter(counter)
+
+        total_ms = (time.perf_counter() - started) * 1000
+        db_ms = counter.total_time * 1000
+        template_ms = g.get('_template_time', 0.0) * 1000
+
+        threshold = app.config.get('SLOW_QUERY_THRESHOLD_MS', 100) / 1000
+        route = f'{request.method} {request.endpoint or request.path}'
+        for statement, elapsed in zip(counter.statements, counter.durations):
+            if elapsed >= threshold:
+                app.logger.warning(
+                    'Slow query (%.1fms) in %s: %s', elapsed * 1000, route, ' '.join(statement.split())
+                )
+
+        response.headers.add(
+            'Server-Timing',
+            f'db;dur={db_ms:.1f};desc="{counter.count} queries", '
+            f'tpl;dur={template_ms:.1f};desc="Template render", '
+            f'total;dur={total_ms:.1f}'
+        )
+        return response
+
+    @app.teardown_request
+    def stop_request_timing(exc):
+        counter = g.pop('_query_counter', None)
+        if counter is not None:
+            _pop_counter(counter)
@@ -1,5 +1,10 @@
 
+from app.models.user import User
 from app.models.category import Category
 from app.models.expense import Expense
+from app.models.rollup import ExpenseRollup
+from app.models.version import DataVersion
+from app.models.budget import Budget
+from app.models.recurring import RecurringExpense
 
-__all__ = ['Category', 'Expense']
\ No newline at end of file
+__all__ = ['User', 'Category', 'Expense', 'ExpenseRollup', 'DataVersion', 'Budget', 'RecurringExpense']
\ No newline at end of file
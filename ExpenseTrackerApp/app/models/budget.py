@@ -0,0 +1,167 @@
+"""
+Budget Model for Expense Tracker
+
+Monthly spending limits per category. Budget checks read the maintained
+monthly rollup (updated in the same transaction as every expense write), so
+checking one category is a primary-key lookup and the dashboard status for
+all categories is a single query, whatever the number of expenses.
+"""
+
+from datetime import datetime
+from app import db
+from app.money import from_cents
+from app.models.rollup import ExpenseRollup
+from app.models.version import DataVersion
+from app.replica import read_only
+from app.tenancy import TenantScoped
+
+
+class Budget(TenantScoped, db.Model):
+    """
+    Spending limit for one category in one month.
+
+    Attributes:
+        category_id (int): Budgeted category
+        year (int): Calendar year
+        month (int): Calendar month (1-12)
+        amount_cents (int): Limit in cents
+    """
+
+    __tablename__ = 'budgets'
+    __table_args__ = (
+        db.Index('ix_budgets_user_period', 'user_id', 'year', 'month'),
+    )
+
+    # Composite primary key, matching the rollup's (category_id, year, month)
+    category_id = db.Column(
+        db.Integer,
+        db.ForeignKey('categories.id', ondelete='CASCADE'),
+        primary_key=True,
+        autoincrement=False
+    )
+    year = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    month = db.Column(db.Integer, primary_key=True, autoincrement=False)
+
+    amount_cents = db.Column(db.BigInteger, nullable=False)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f'<Budget {self.year}-{self.month:02d} cat={self.category_id}: {self.amount_cents}c>'
+
+    @property
+    def amount(self):
+        """Limit as an exact Decimal."""
+        return from_cents(self.amount_cents)
+
+    @staticmethod
+    def _status_query():
+        """Query (category, budget cents, month total cents) per budget."""
+        from app.models.category import Category
+
+        return db.session.query(
+            Category,
+            Budget.amount_cents,
+            ExpenseRollup.total_cents
+        ).join(
+            Budget, Budget.category_id == Category.id
+        ).outerjoin(
+            ExpenseRollup,
+            (ExpenseRollup.category_id == Budget.category_id) &
+            (ExpenseRollup.year == Budget.year) &
+            (ExpenseRollup.month == Budget.month)
+        )
+
+    @staticmethod
+    def _status(category, budget_cents, spent_cents):
+        """Build the status dict for one budgeted category."""
+        spent_cents = int(spent_cents or 0)
+        return {
+            'category_id': category.id,
+            'category': category.name,
+            'icon': category.icon,
+            'color': category.color,
+            'budget_cents': budget_cents,
+            'spent_cents': spent_cents,
+            'remaining_cents': budget_cents - spent_cents,
+            'percent_used': round(spent_cents * 100 / budget_cents, 1) if budget_cents else 0.0,
+            'over_budget': spent_cents > budget_cents
+        }
+
+    @staticmethod
+    def check(category_id, expense_date):
+        """
+        Get the budget status of one category for the month of expense_date.
+
+        Reads the budget and the running month total with one primary-key
+        join, so it costs the same however many expenses the month holds.
+        Call it after flushing the expense write and before committing it,
+        so the total includes that write and nothing can fail once the
+        write is committed.
+
+        Returns:
+            dict: Budget status (see month_status), or None if no budget is set
+        """
+        row = Budget._status_query().filter(
+            Budget.category_id == category_id,
+            Budget.year == expense_date.year,
+            Budget.month == expense_date.month
+        ).first()
+
+        if row is None:
+            return None
+        return Budget._status(*row)
+
+    @staticmethod
+    @read_only
+    def month_status(year=None, month=None):
+        """
+        Get the budget status of every budgeted category for a month.
+
+        Returns:
+            list: Dicts with category, icon, color, budget_cents, spent_cents,
+                remaining_cents, percent_used and over_budget, ordered by
+                category name
+        """
+        from app.models.category import Category
+
+        if not year:
+            year = datetime.now().year
+        if not month:
+            month = datetime.now().month
+
+        rows = Budget._status_query().filter(
+            Budget.year == year,
+            Budget.month == month
+        ).order_by(Category.name).all()
+
+        return [Budget._status(*row) for row in rows]
+
+    @staticmethod
+    def set_month(year, month, amounts):
+        """
+        Set, change or clear budgets for a month in one transaction.
+
+        Args:
+            year (int): Calendar year
+            month (int): Calendar month
+            amounts (dict): category_id -> limit in cents, or None to clear
+        """
+        existing = {
+            budget.category_id: budget
+            for budget in Budget.query.filter_by(year=year, month=month)
+        }
+        for category_id, cents in amounts.items():
+            budget = existing.get(category_id)
+            if cents is None:
+                if budget:
+                    db.session.delete(budget)
+            elif budget:
+                budget.amount_cents = cents
+            else:
+                db.session.add(Budget(category_id=category_id, year=year, month=month, amount_cents=cents))
+        db.session.commit()
+
+
+DataVersion.track(Budget, 'budgets')
@@ -170,16 +170,83 @@ This model manages expense categories with icons, colors, and descriptions.
 Each category can have multiple expenses associated with it.
 """
 
+import threading
+import time
 from datetime import datetime
+from flask import current_app
+from sqlalchemy import event
 from app import db
+from app.cache import LRUCache
+from app.money import from_cents, cents_to_float
+from app.models.version import DataVersion
+from app.tenancy import TenantScoped, current_user_id, tenant_key, split_key
 
-class Category(db.Model):
+DEFAULT_CATEGORIES = [
+    {
+        'name': 'Food & Dining',
+        'description': 'Restaurants, groceries, and food-related expenses',
+        'icon': '🍽️',
+        'color': '#FF6B6B'
+    },
+    {
+        'name': 'Transportation',
+        'description': 'Gas, parking, public transport, and travel costs',
+        'icon': '🚗',
+        'color': '#4ECDC4'
+    },
+    {
+        'name': 'Entertainment',
+        'description': 'Movies, games, hobbies, and recreational activities',
+        'icon': '🎬',
+        'color': '#45B7D1'
+    },
+    {
+        'name': 'Shopping',
+        'description': 'Clothing, accessories, and personal items',
+        'icon': '🛍️',
+        'color': '#96CEB4'
+    },
+    {
+        'name': 'Bills & Utilities',
+        'description': 'Electricity, water, internet, and monthly bills',
+        'icon': '💡',
+        'color': '#FECA57'
+    },
+    {
+        'name': 'Healthcare',
+        'description': 'Medical expenses, pharmacy, and health-related costs',
+        'icon': '🏥',
+        'color': '#FF9FF3'
+    },
+    {
+        'name': 'Education',
+        'description': 'Books, courses, and educational materials',
+        'icon': '📚',
+        'color': '#54A0FF'
+    },
+    {
+        'name': 'Travel',
+        'description': 'Flights, hotels, and vacation expenses',
+        'icon': '✈️',
+        'color': '#5F27CD'
+    },
+    {
+        'name': 'Others',
+        'description': 'Miscellaneous expenses that don\'t fit other categories',
+        'icon': '📝',
+        'color': '#747D8C'
+    }
+]
+
+
+class Category(TenantScoped, db.Model):
     """
     Category model for organizing expenses.
 
     Attributes:
         id (int): Primary key
-        name (str): Category name (unique)
+        user_id (int): Owning user
+        name (str): Category name (unique per user)
         description (str): Category description
         color (str): Hex color code for UI
         icon (str): Emoji icon for category
@@ -188,12 +255,15 @@ class Category(db.Model):
     """
 
     __tablename__ = 'categories'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'name', name='uq_categories_user_name'),
+    )
 
     # Primary key
     id = db.Column(db.Integer, primary_key=True)
 
     # Category information
-    name = db.Column(db.String(50), nullable=False, unique=True, index=True)
+    name = db.Column(db.String(50), nullable=False)
     description = db.Column(db.Text)
     color = db.Column(db.String(7), default='#007bff')
     icon = db.Column(db.String(50), default='💰')
@@ -222,15 +292,33 @@ class Category(db.Model):
     def __str__(self):
         return f'{self.icon} {self.name}'
 
+    def _get_stats(self):
+        """Return (total cents, count) from the monthly rollup, computed once."""
+        stats = getattr(self, '_stats', None)
+        if stats is None:
+            from app.models.rollup import ExpenseRollup
+
+            total, count = db.session.query(
+                db.func.sum(ExpenseRollup.total_cents),
+                db.func.sum(ExpenseRollup.count)
+            ).filter(ExpenseRollup.category_id == self.id).one()
+            stats = self._stats = (int(total or 0), int(count or 0))
+        return stats
+
     @property
     def total_expenses(self):
-        """Calculate total amount spent in this category."""
-        return sum(float(expense.amount) for expense in self.expenses)
+        """Calculate total amount spent in this category, as an exact Decimal."""
+        return from_cents(self._get_stats()[0])
+
+    @property
+    def total_cents(self):
+        """Total amount spent in this category, in cents."""
+        return self._get_stats()[0]
 
     @property
     def expense_count(self):
         """Count number of expenses in this category."""
-        return len(self.expenses)
+        return self._get_stats()[1]
 
     def to_dict(self):
         """Convert category to dictionary for JSON serialization."""
@@ -241,88 +329,218 @@ class Category(db.Model):
             'color': self.color,
             'icon': self.icon,
             'is_active': self.is_active,
-            'total_expenses': self.total_expenses,
+            'total_expenses': cents_to_float(self.total_cents),
             'expense_count': self.expense_count,
             'created_at': self.created_at.isoformat()
         }
 
     @staticmethod
-    def create_default_categories():
-        """Create default expense categories."""
-        default_categories = [
-            {
-                'name': 'Food & Dining',
-                'description': 'Restaurants, groceries, and food-related expenses',
-                'icon': '🍽️',
-                'color': '#FF6B6B'
-            },
-            {
-                'name': 'Transportation',
-                'description': 'Gas, parking, public transport, and travel costs',
-                'icon': '🚗',
-                'color': '#4ECDC4'
-            },
-            {
-                'name': 'Entertainment',
-                'description': 'Movies, games, hobbies, and recreational activities',
-                'icon': '🎬',
-                'color': '#45B7D1'
-            },
-            {
-                'name': 'Shopping',
-                'description': 'Clothing, accessories, and personal items',
-                'icon': '🛍️',
-                'color': '#96CEB4'
-            },
-            {
-                'name': 'Bills & Utilities',
-                'description': 'Electricity, water, internet, and monthly bills',
-                'icon': '💡',
-                'color': '#FECA57'
-            },
-            {
-                'name': 'Healthcare',
-                'description': 'Medical expenses, pharmacy, and health-related costs',
-                'icon': '🏥',
-                'color': '#FF9FF3'
-            },
-            {
-                'name': 'Education',
-                'description': 'Books, courses, and educational materials',
-                'icon': '📚',
-                'color': '#54A0FF'
-            },
-            {
-                'name': 'Travel',
-                'description': 'Flights, hotels, and vacation expenses',
-                'icon': '✈️',
-                'color': '#5F27CD'
-            },
-            {
-                'name': 'Others',
-                'description': 'Miscellaneous expenses that don\'t fit other categories',
-                'icon': '📝',
-                'color': '#747D8C'
-            }
-        ]
+    def create_default_categories(user_id=None):
+        """
+        Create any missing default expense categories for a user.
 
-        categories_created = 0
-        for cat_data in default_categories:
-            existing = Category.query.filter_by(name=cat_data['name']).first()
-            if not existing:
-                category = Category(**cat_data)
-                db.session.add(category)
-                categories_created += 1
+        Uses one set-based INSERT that skips names already present (ON CONFLICT
+        DO NOTHING / INSERT IGNORE), so seeding is a single statement however
+        many defaults exist, and safe to run concurrently from several workers.
+
+        Args:
+            user_id (int): Owner of the categories; defaults to the current user
+        Returns:
+            int: Number of categories created
+        """
+        if user_id is None:
+            user_id = current_user_id()
+        if user_id is None:
+            raise ValueError("Default categories need a user")
+
+        table = Category.__table__
+        dialect = db.session.get_bind(Category).dialect.name
+        rows = [dict(cat_data, user_id=user_id) for cat_data in DEFAULT_CATEGORIES]
+
+        if dialect in ('sqlite', 'postgresql'):
+            if dialect == 'sqlite':
+                from sqlalchemy.dialects.sqlite import insert
+            else:
+                from sqlalchemy.dialects.postgresql import insert
+            stmt = insert(table).values(rows).on_conflict_do_nothing(index_elements=['user_id', 'name'])
+        elif dialect in ('mysql', 'mariadb'):
+            stmt = table.insert().values(rows).prefix_with('IGNORE')
+        else:
+            existing = set(db.session.scalars(
+                db.select(table.c.name).where(
+                    table.c.user_id == user_id,
+                    table.c.name.in_([row['name'] for row in rows])
+                )
+            ))
+            rows = [row for row in rows if row['name'] not in existing]
+            stmt = table.insert().values(rows) if rows else None
 
         try:
+            categories_created = db.session.execute(stmt).rowcount if stmt is not None else 0
+            # Core statements bypass the flush hooks, so bump the stamp by hand
+            if categories_created:
+                DataVersion.bump_in_session(db.session, {tenant_key('categories', user_id)})
             db.session.commit()
             if categories_created > 0:
                 print(f"✅ Created {categories_created} default categories")
+            return categories_created
         except Exception as e:
             db.session.rollback()
             print(f"❌ Error creating categories: {e}")
+            return 0
+
+    @classmethod
+    def with_stats(cls, active_only=False):
+        """
+        Get categories with total_expenses and expense_count preloaded.
+
+        Uses one GROUP BY over the monthly rollup, so the cost does not grow
+        with expense history.
+        """
+        from app.models.rollup import ExpenseRollup
+
+        query = db.session.query(
+            cls,
+            db.func.coalesce(db.func.sum(ExpenseRollup.total_cents), 0),
+            db.func.coalesce(db.func.sum(ExpenseRollup.count), 0)
+        ).outerjoin(
+            ExpenseRollup, ExpenseRollup.category_id == cls.id
+        ).group_by(cls.id).order_by(cls.name)
+
+        if active_only:
+            query = query.filter(cls.is_active.is_(True))
+
+        categories = []
+        for category, total, count in query.all():
+            category._stats = (int(total), int(count))
+            categories.append(category)
+        return categories
 
     @classmethod
     def get_active_categories(cls):
         """Get all active categories ordered by name."""
         return cls.query.filter_by(is_active=True).order_by(cls.name).all()
+
+
+@event.listens_for(Category, 'expire', raw=True)
+def _clear_stats(state, attrs):
+    """Drop cached stats whenever the instance is expired (e.g. on commit)."""
+    # Raw state, since the instance may already be garbage collected
+    state.dict.pop('_stats', None)
+
+
+class CachedCategory:
+    """Read-only snapshot of a category row, safe to share across requests."""
+
+    __slots__ = ('id', 'name', 'description', 'color', 'icon', 'is_active', 'created_at')
+
+    def __init__(self, category):
+        for attr in self.__slots__:
+            setattr(self, attr, getattr(category, attr))
+
+    def __repr__(self):
+        return f'<CachedCategory {self.name}>'
+
+    def __str__(self):
+        return f'{self.icon} {self.name}'
+
+
+# Users whose categories each worker keeps; the least recently used are dropped
+CATEGORY_REGISTRY_SIZE = 1024
+
+
+class CategoryRegistry:
+    """
+    Process-local cache of each user's categories.
+
+    Entries are reloaded when older than CATEGORY_CACHE_TTL seconds, or when
+    the user's 'categories' data version stamp has moved. The stamp is checked at most
+    every CATEGORY_CACHE_CHECK_INTERVAL seconds, so other workers' writes show
+    up quickly; writes committed by this process invalidate it immediately.
+    Only the maxsize most recently used users keep an entry.
+    """
+
+    def __init__(self, maxsize=CATEGORY_REGISTRY_SIZE):
+        self._lock = threading.Lock()
+        self._entries = LRUCache(maxsize=maxsize)
+
+    def _scope(self):
+        """Key cache entries by database and user, so apps and users never share them."""
+        return db.engine, current_user_id()
+
+    def _load(self):
+        """Load a fresh entry from the database."""
+        key = tenant_key('categories')
+        version = DataVersion.current(key)[key]
+        categories = tuple(CachedCategory(c) for c in Category.query.order_by(Category.name).all())
+        now = time.monotonic()
+        return {
+            'version': version,
+            'loaded_at': now,
+            'checked_at': now,
+            'all': categories,
+            'active': tuple(c for c in categories if c.is_active),
+            'by_id': {c.id: c for c in categories}
+        }
+
+    def _entry(self):
+        """Return a current cache entry, reloading it if stale."""
+        scope = self._scope()
+        ttl = current_app.config.get('CATEGORY_CACHE_TTL', 300)
+        check_interval = current_app.config.get('CATEGORY_CACHE_CHECK_INTERVAL', 2)
+        now = time.monotonic()
+
+        entry = self._entries.get(scope)
+        if entry and now - entry['loaded_at'] < ttl:
+            if now - entry['checked_at'] < check_interval:
+                return entry
+            key = tenant_key('categories')
+            if DataVersion.current(key)[key] == entry['version']:
+                entry['checked_at'] = now
+                return entry
+
+        with self._lock:
+            entry = self._load()
+            self._entries.set(scope, entry)
+        return entry
+
+    def all(self):
+        """
+        Get all categories ordered by name.
+
+        Returns the same tuple until the entry is reloaded, so it can key
+        {% cache %} fragments rendered from it.
+        """
+        return self._entry()['all']
+
+    def active(self):
+        """Get active categories ordered by name (a tuple, like all())."""
+        return self._entry()['active']
+
+    def get(self, category_id):
+        """Get a category by id, or None."""
+        return self._entry()['by_id'].get(category_id)
+
+    def invalidate(self, user_id=None):
+        """Drop the cached entries of one user, or all entries."""
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+                return
+            for scope in self._entries.keys():
+                if scope[1] == user_id:
+                    self._entries.pop(scope)
+
+
+category_registry = CategoryRegistry()
+
+DataVersion.track(Category, 'categories')
+
+
+@DataVersion.on_commit
+def _invalidate_registry(names):
+    """Reload a user's categories after this process commits a write to them."""
+    for key in names:
+        name, user_id = split_key(key)
+        if name == 'categories':
+            category_registry.invalidate(user_id)
@@ -1,24 +1,45 @@
 
 from datetime import datetime, date
-from decimal import Decimal, ROUND_HALF_UP
+from sqlalchemy import event
+from sqlalchemy.orm import Session
 from app import db
+from app.money import to_cents, from_cents, cents_to_float, format_cents
+from app.models.rollup import ExpenseRollup
+from app.models.version import DataVersion
+from app.pagination import KeysetPage, decode_cursor
+from app.replica import read_only
+from app.tenancy import TenantScoped
 
-class Expense(db.Model):
+class Expense(TenantScoped, db.Model):
     """Expense model for tracking individual expenses."""
 
     __tablename__ = 'expenses'
+    __table_args__ = (
+        # Every query is scoped to one user, so indexes lead with user_id.
+        # Both end in the list's (date, created_at, id) sort key, so pages,
+        # keyset seeks and date-range aggregates walk an index in order
+        # instead of sorting; check with `flask check-query-plans`.
+        db.Index('ix_expenses_user_recent', 'user_id', 'date', 'created_at', 'id'),
+        db.Index('ix_expenses_user_category_recent', 'user_id', 'category_id', 'date', 'created_at', 'id'),
+        # One expense per rule and date, so re-materializing never duplicates
+        db.Index('uq_expenses_recurring_date', 'recurring_id', 'date', unique=True),
+    )
 
     # Primary key
     id = db.Column(db.Integer, primary_key=True)
 
     # Expense details
-    description = db.Column(db.String(255), nullable=False, index=True)
-    amount = db.Column(db.Numeric(10, 2), nullable=False)
-    date = db.Column(db.Date, nullable=False, default=date.today, index=True)
+    # Searched through the full-text index in app.search, not a B-tree
+    description = db.Column(db.String(255), nullable=False)
+    # Stored as integer cents; use the amount property for a Decimal
+    amount_cents = db.Column(db.BigInteger, nullable=False)
+    date = db.Column(db.Date, nullable=False, default=date.today)
     notes = db.Column(db.Text)
 
     # Foreign key
-    category_id = db.Column(db.Integer, db.ForeignKey('categories.id'), nullable=False, index=True)
+    category_id = db.Column(db.Integer, db.ForeignKey('categories.id'), nullable=False)
+    # Set on expenses generated from a recurring rule
+    recurring_id = db.Column(db.Integer, db.ForeignKey('recurring_expenses.id', ondelete='SET NULL'))
 
     # Timestamps
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
@@ -27,7 +48,7 @@ class Expense(db.Model):
     def __init__(self, description, amount, category_id, date=None, notes=None):
         """Initialize a new Expense."""
         self.description = description.strip()
-        self.amount = self._validate_amount(amount)
+        self.amount_cents = self._validate_amount(amount)
         self.category_id = category_id
         self.date = date or datetime.now().date()
         self.notes = notes.strip() if notes else None
@@ -36,19 +57,30 @@ class Expense(db.Model):
         return f'<Expense {self.description}: ${self.amount}>'
 
     def _validate_amount(self, amount):
-        """Validate and convert amount to proper Decimal."""
+        """Validate and convert amount to positive integer cents."""
         try:
-            decimal_amount = Decimal(str(amount))
-            if decimal_amount <= 0:
-                raise ValueError("Amount must be positive")
-            return decimal_amount.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+            cents = to_cents(amount)
         except (TypeError, ValueError):
             raise ValueError(f"Invalid amount: {amount}")
+        if cents <= 0:
+            raise ValueError("Amount must be positive")
+        return cents
+
+    @property
+    def amount(self):
+        """Amount as an exact Decimal, e.g. Decimal('12.50')."""
+        if self.amount_cents is None:
+            return None
+        return from_cents(self.amount_cents)
+
+    @amount.setter
+    def amount(self, value):
+        self.amount_cents = self._validate_amount(value)
 
     @property
     def formatted_amount(self):
         """Return formatted amount as currency string."""
-        return f"${self.amount:.2f}"
+        return f"${format_cents(self.amount_cents)}"
 
     @property
     def formatted_date(self):
@@ -65,101 +97,317 @@ class Expense(db.Model):
         """Check if expense was created in the last 7 days."""
         return (datetime.now().date() - self.date).days <= 7
 
-    def to_dict(self):
-        """Convert expense to dictionary for JSON serialization."""
+    def to_dict(self, category=None):
+        """
+        Convert expense to dictionary for JSON serialization.
+
+        Args:
+            category (Category): Pre-resolved category, to avoid a lazy load
+        """
+        category = category or self.category
         return {
             'id': self.id,
             'description': self.description,
-            'amount': float(self.amount),
+            'amount': cents_to_float(self.amount_cents),
+            'amount_cents': self.amount_cents,
             'formatted_amount': self.formatted_amount,
             'date': self.formatted_date,
             'display_date': self.display_date,
             'notes': self.notes,
             'category_id': self.category_id,
-            'category_name': self.category.name if self.category else None,
-            'category_icon': self.category.icon if self.category else None,
-            'category_color': self.category.color if self.category else '#747D8C',
+            'category_name': category.name if category else None,
+            'category_icon': category.icon if category else None,
+            'category_color': category.color if category else '#747D8C',
             'is_recent': self.is_recent,
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat()
         }
 
     @staticmethod
+    def to_dict_many(expenses):
+        """
+        Serialize many expenses, resolving categories with a single query.
+
+        Categories are looked up from an id -> category map instead of each
+        row's lazy relationship.
+        """
+        from app.models.category import Category
+
+        category_ids = {expense.category_id for expense in expenses}
+        categories = {}
+        if category_ids:
+            categories = {
+                category.id: category
+                for category in Category.query.filter(Category.id.in_(category_ids))
+            }
+        return [expense.to_dict(categories.get(expense.category_id)) for expense in expenses]
+
+    @staticmethod
+    def with_category(query=None):
+        """Return an expense query that eager-loads each row's category."""
+        query = query if query is not None else Expense.query
+        return query.options(db.joinedload(Expense.category))
+
+    @staticmethod
+    def apply_filters(query, search_term=None, category_id=None, ranked=True):
+        """
+        Apply the expense list filters to a query or select statement.
+
+        Args:
+            query: ORM query or select() over the expenses table
+            search_term (str): Full-text search input
+            category_id (int): Restrict to one category
+            ranked (bool): Order search matches by relevance
+        """
+        from app.search import apply_search
+
+        if search_term:
+            query = apply_search(query, search_term, ranked=ranked)
+        if category_id:
+            query = query.filter(Expense.category_id == category_id)
+        return query
+
+    @staticmethod
+    @read_only
     def get_monthly_total(year=None, month=None):
-        """Get total expenses for a specific month."""
+        """Get total expenses for a specific month, as an exact Decimal."""
         if not year:
             year = datetime.now().year
         if not month:
             month = datetime.now().month
 
-        start_date = date(year, month, 1)
-        if month == 12:
-            end_date = date(year + 1, 1, 1)
-        else:
-            end_date = date(year, month + 1, 1)
-
-        total = db.session.query(db.func.sum(Expense.amount)).filter(
-            Expense.date >= start_date,
-            Expense.date < end_date
+        total = db.session.query(db.func.sum(ExpenseRollup.total_cents)).filter(
+            ExpenseRollup.year == year,
+            ExpenseRollup.month == month
         ).scalar()
 
-        return float(total) if total else 0.0
+        return from_cents(total)
 
     @staticmethod
+    @read_only
     def get_yearly_total(year=None):
-        """Get total expenses for a specific year."""
+        """Get total expenses for a specific year, as an exact Decimal."""
         if not year:
             year = datetime.now().year
 
-        start_date = date(year, 1, 1)
-        end_date = date(year + 1, 1, 1)
-
-        total = db.session.query(db.func.sum(Expense.amount)).filter(
-            Expense.date >= start_date,
-            Expense.date < end_date
+        total = db.session.query(db.func.sum(ExpenseRollup.total_cents)).filter(
+            ExpenseRollup.year == year
         ).scalar()
 
-        return float(total) if total else 0.0
+        return from_cents(total)
 
     @staticmethod
+    @read_only
     def get_category_totals(year=None, month=None):
-        """Get expense totals grouped by category."""
+        """Get expense totals in cents grouped by category."""
         from app.models.category import Category
 
         query = db.session.query(
             Category.name,
             Category.icon,
             Category.color,
-            db.func.sum(Expense.amount).label('total')
-        ).join(Expense).group_by(Category.id)
+            db.func.sum(ExpenseRollup.total_cents).label('total')
+        ).join(ExpenseRollup, ExpenseRollup.category_id == Category.id)
 
         if year and month:
-            start_date = date(year, month, 1)
-            if month == 12:
-                end_date = date(year + 1, 1, 1)
-            else:
-                end_date = date(year, month + 1, 1)
-
             query = query.filter(
-                Expense.date >= start_date,
-                Expense.date < end_date
+                ExpenseRollup.year == year,
+                ExpenseRollup.month == month
             )
 
-        results = query.all()
+        results = query.group_by(Category.id).having(
+            db.func.sum(ExpenseRollup.count) > 0
+        ).all()
         return [
             {
                 'category': result.name,
                 'icon': result.icon,
                 'color': result.color,
-                'total': float(result.total)
+                'total_cents': int(result.total)
+            }
+            for result in results
+        ]
+
+    @staticmethod
+    @read_only
+    def get_dashboard_stats(year=None, month=None):
+        """
+        Get all dashboard aggregates in a single query.
+
+        Returns monthly and yearly totals in cents, the all-time expense
+        count and the per-category totals for the month, using conditional
+        aggregation over the monthly rollup.
+        """
+        from app.models.category import Category
+
+        if not year:
+            year = datetime.now().year
+        if not month:
+            month = datetime.now().month
+
+        in_year = ExpenseRollup.year == year
+        in_month = db.and_(in_year, ExpenseRollup.month == month)
+
+        results = db.session.query(
+            Category.name,
+            Category.icon,
+            Category.color,
+            db.func.sum(db.case((in_month, ExpenseRollup.total_cents), else_=0)).label('month_total'),
+            db.func.sum(db.case((in_month, ExpenseRollup.count), else_=0)).label('month_count'),
+            db.func.sum(db.case((in_year, ExpenseRollup.total_cents), else_=0)).label('year_total'),
+            db.func.sum(ExpenseRollup.count).label('count')
+        ).join(
+            ExpenseRollup, ExpenseRollup.category_id == Category.id
+        ).group_by(Category.id).all()
+
+        category_totals = [
+            {
+                'category': result.name,
+                'icon': result.icon,
+                'color': result.color,
+                'total_cents': int(result.month_total)
             }
             for result in results
+            if result.month_count
         ]
 
+        return {
+            'monthly_total_cents': int(sum(result.month_total or 0 for result in results)),
+            'yearly_total_cents': int(sum(result.year_total or 0 for result in results)),
+            'total_count': int(sum(result.count or 0 for result in results)),
+            'category_totals': category_totals
+        }
+
     @staticmethod
+    @read_only
     def get_recent_expenses(limit=10):
-        """Get most recent expenses."""
-        return Expense.query.order_by(
+        """Get most recent expenses with their categories."""
+        return Expense.with_category().order_by(
             Expense.date.desc(),
             Expense.created_at.desc()
         ).limit(limit).all()
+
+    @staticmethod
+    def sort_key(expense):
+        """Return the (date, created_at, id) keyset sort key of an expense."""
+        return (expense.date, expense.created_at, expense.id)
+
+    @staticmethod
+    def _seek_condition(cursor, newer):
+        """Build a row comparison against a cursor on (date, created_at, id)."""
+        try:
+            date_str, created_str, expense_id = decode_cursor(cursor)
+            key_date = date.fromisoformat(date_str)
+            key_created = datetime.fromisoformat(created_str)
+            key_id = int(expense_id)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid cursor: {cursor}") from e
+
+        if newer:
+            return db.or_(
+                Expense.date > key_date,
+                db.and_(Expense.date == key_date, db.or_(
+                    Expense.created_at > key_created,
+                    db.and_(Expense.created_at == key_created, Expense.id > key_id)
+                ))
+            )
+        return db.or_(
+            Expense.date < key_date,
+            db.and_(Expense.date == key_date, db.or_(
+                Expense.created_at < key_created,
+                db.and_(Expense.created_at == key_created, Expense.id < key_id)
+            ))
+        )
+
+    @staticmethod
+    def paginate_keyset(query, after=None, before=None, per_page=20):
+        """
+        Page through a query newest-first by seeking on (date, created_at, id).
+
+        Args:
+            query: Expense query with filters already applied
+            after (str): Cursor of the last row of the previous page
+            before (str): Cursor of the first row of the next page
+            per_page (int): Page size
+        Returns:
+            KeysetPage: Page of expenses with next/prev cursors
+        Raises:
+            ValueError: If a cursor is malformed
+        """
+        if before:
+            rows = query.filter(Expense._seek_condition(before, newer=True)).order_by(
+                Expense.date.asc(),
+                Expense.created_at.asc(),
+                Expense.id.asc()
+            ).limit(per_page + 1).all()
+            has_prev = len(rows) > per_page
+            items = list(reversed(rows[:per_page]))
+            return KeysetPage(items, per_page, True, has_prev, Expense.sort_key)
+
+        if after:
+            query = query.filter(Expense._seek_condition(after, newer=False))
+        rows = query.order_by(
+            Expense.date.desc(),
+            Expense.created_at.desc(),
+            Expense.id.desc()
+        ).limit(per_page + 1).all()
+        has_next = len(rows) > per_page
+        return KeysetPage(rows[:per_page], per_page, has_next, bool(after), Expense.sort_key)
+
+DataVersion.track(Expense, 'expenses')
+
+_ROLLUP_FIELDS = ('date', 'category_id', 'amount_cents')
+
+
+def _persisted_values(session, expenses):
+    """Fetch the stored (date, category_id, amount_cents) of expenses in one query."""
+    ids = [expense.id for expense in expenses if expense.id is not None]
+    if not ids:
+        return {}
+    table = Expense.__table__
+    rows = session.connection().execute(
+        db.select(table.c.id, table.c.date, table.c.category_id, table.c.amount_cents)
+        .where(table.c.id.in_(ids))
+    )
+    return {row.id: (row.date, row.category_id, row.amount_cents) for row in rows}
+
+
+@event.listens_for(Session, 'before_flush')
+def _collect_rollup_deltas(session, flush_context, instances):
+    """Record how pending expense writes change the monthly rollups."""
+    deltas = flush_context.attributes.setdefault('expense_rollup_deltas', ExpenseRollup.new_deltas())
+
+    for obj in session.new:
+        if isinstance(obj, Expense):
+            ExpenseRollup.add_delta(deltas, obj.date, obj.category_id, obj.amount_cents, 1)
+
+    changed = [
+        obj for obj in session.dirty
+        if isinstance(obj, Expense) and any(
+            db.inspect(obj).attrs[field].history.has_changes() for field in _ROLLUP_FIELDS
+        )
+    ]
+    deleted = [
+        obj for obj in session.deleted
+        if isinstance(obj, Expense) and obj not in session.new
+    ]
+    persisted = _persisted_values(session, changed + deleted)
+
+    for obj in deleted:
+        old = persisted.get(obj.id)
+        if old:
+            ExpenseRollup.add_delta(deltas, old[0], old[1], -old[2], -1)
+
+    for obj in changed:
+        old = persisted.get(obj.id)
+        if old:
+            ExpenseRollup.add_delta(deltas, old[0], old[1], -old[2], -1)
+        ExpenseRollup.add_delta(deltas, obj.date, obj.category_id, obj.amount_cents, 1)
+
+
+@event.listens_for(Session, 'after_flush')
+def _apply_rollup_deltas(session, flush_context):
+    """Write collected rollup deltas in the same transaction as the flush."""
+    deltas = flush_context.attributes.get('expense_rollup_deltas')
+    if deltas:
+        ExpenseRollup.apply_deltas(session.connection(), deltas)
@@ -0,0 +1,135 @@
+"""
+Recurring Expense Model for Expense Tracker
+
+Rules for expenses that repeat weekly, monthly or yearly (rent,
+subscriptions, utilities). Each rule remembers the last occurrence it has
+generated, so materializing only ever produces the occurrences due since
+the previous run.
+"""
+
+import calendar
+from datetime import datetime, date, timedelta
+from app import db
+from app.money import from_cents, cents_to_float
+from app.tenancy import TenantScoped
+
+RECURRING_FREQUENCIES = ('weekly', 'monthly', 'yearly')
+
+
+def _add_months(start, months):
+    """Return start shifted by months, clamping the day to the month's length."""
+    year, month = divmod(start.month - 1 + months, 12)
+    year += start.year
+    month += 1
+    return date(year, month, min(start.day, calendar.monthrange(year, month)[1]))
+
+
+class RecurringExpense(TenantScoped, db.Model):
+    """
+    Definition of a repeating expense.
+
+    Attributes:
+        description (str): Description copied to each generated expense
+        amount_cents (int): Amount of each occurrence in cents
+        category_id (int): Category of each occurrence
+        frequency (str): 'weekly', 'monthly' or 'yearly'
+        start_date (date): First occurrence
+        end_date (date): Last day an occurrence may fall on, or None
+        last_materialized (date): Latest occurrence already generated, or None
+    """
+
+    __tablename__ = 'recurring_expenses'
+    __table_args__ = (
+        db.Index('ix_recurring_expenses_user', 'user_id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    description = db.Column(db.String(255), nullable=False)
+    amount_cents = db.Column(db.BigInteger, nullable=False)
+    category_id = db.Column(db.Integer, db.ForeignKey('categories.id'), nullable=False)
+    notes = db.Column(db.Text)
+
+    # Schedule
+    frequency = db.Column(db.String(10), nullable=False)
+    start_date = db.Column(db.Date, nullable=False)
+    end_date = db.Column(db.Date)
+    last_materialized = db.Column(db.Date)
+    is_active = db.Column(db.Boolean, default=True, nullable=False)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    category = db.relationship('Category', lazy='joined')
+
+    def __repr__(self):
+        return f'<RecurringExpense {self.description} ({self.frequency})>'
+
+    @property
+    def amount(self):
+        """Amount of each occurrence as an exact Decimal."""
+        return from_cents(self.amount_cents)
+
+    def occurrence(self, n):
+        """
+        Return the date of the n-th occurrence (0 is start_date).
+
+        Monthly and yearly rules are computed from start_date rather than
+        from the previous occurrence, so a rule starting on the 31st falls
+        on the last day of shorter months and returns to the 31st after.
+        """
+        if self.frequency == 'weekly':
+            return self.start_date + timedelta(weeks=n)
+        if self.frequency == 'monthly':
+            return _add_months(self.start_date, n)
+        if self.frequency == 'yearly':
+            return _add_months(self.start_date, 12 * n)
+        raise ValueError(f"Unsupported frequency: {self.frequency}")
+
+    def due_dates(self, until):
+        """
+        List the occurrences after last_materialized up to until, inclusive.
+
+        Args:
+            until (date): Latest date to generate (usually today)
+        Returns:
+            list: Dates not generated yet, oldest first
+        """
+        if self.end_date and self.end_date < until:
+            until = self.end_date
+
+        n = 0
+        if self.last_materialized:
+            # Jump close to the watermark instead of walking from start_date
+            if self.frequency == 'weekly':
+                n = max((self.last_materialized - self.start_date).days // 7, 0)
+            else:
+                months = ((self.last_materialized.year - self.start_date.year) * 12
+                          + self.last_materialized.month - self.start_date.month)
+                n = max(months // (12 if self.frequency == 'yearly' else 1), 0)
+
+        dates = []
+        current = self.occurrence(n)
+        while current <= until:
+            if not self.last_materialized or current > self.last_materialized:
+                dates.append(current)
+            n += 1
+            current = self.occurrence(n)
+        return dates
+
+    def to_dict(self):
+        """Convert recurring expense to dictionary for JSON serialization."""
+        return {
+            'id': self.id,
+            'description': self.description,
+            'amount': cents_to_float(self.amount_cents),
+            'amount_cents': self.amount_cents,
+            'category_id': self.category_id,
+            'category_name': self.category.name if self.category else None,
+            'notes': self.notes,
+            'frequency': self.frequency,
+            'start_date': self.start_date.isoformat(),
+            'end_date': self.end_date.isoformat() if self.end_date else None,
+            'last_materialized': self.last_materialized.isoformat() if self.last_materialized else None,
+            'is_active': self.is_active
+        }
+
@@ -0,0 +1,170 @@
+"""
+Expense Rollup Model for Expense Tracker
+
+Keeps a per-(category, year, month) running sum and count of expenses so
+dashboard aggregates never have to scan the expenses table.
+"""
+
+from collections import defaultdict
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from app import db
+from app.money import format_cents
+from app.tenancy import TenantScoped
+
+
+class ExpenseRollup(TenantScoped, db.Model):
+    """
+    Monthly expense totals per category.
+
+    Attributes:
+        user_id (int): Owner of the category
+        year (int): Calendar year of the expenses
+        month (int): Calendar month of the expenses (1-12)
+        category_id (int): Category the expenses belong to
+        total_cents (int): Sum of expense amounts in cents
+        count (int): Number of expenses
+    """
+
+    __tablename__ = 'expense_rollups'
+    __table_args__ = (
+        db.Index('ix_expense_rollups_user_period', 'user_id', 'year', 'month'),
+    )
+
+    # Composite primary key; categories belong to one user, so rows of a
+    # category are that user's, and joins from categories use the key prefix
+    category_id = db.Column(
+        db.Integer,
+        db.ForeignKey('categories.id', ondelete='CASCADE'),
+        primary_key=True,
+        autoincrement=False
+    )
+    year = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    month = db.Column(db.Integer, primary_key=True, autoincrement=False)
+
+    # Aggregates
+    total_cents = db.Column(db.BigInteger, nullable=False, default=0)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<ExpenseRollup {self.year}-{self.month:02d} cat={self.category_id}: ${format_cents(self.total_cents)}>'
+
+    @staticmethod
+    def new_deltas():
+        """Return an empty delta map keyed by (year, month, category_id)."""
+        return defaultdict(lambda: [0, 0])
+
+    @staticmethod
+    def add_delta(deltas, expense_date, category_id, cents, count):
+        """Accumulate an amount (in cents) and count change for the month of expense_date."""
+        if expense_date is None or category_id is None or cents is None:
+            return
+        entry = deltas[(expense_date.year, expense_date.month, category_id)]
+        entry[0] += cents
+        entry[1] += count
+
+    @staticmethod
+    def _upsert(connection, values):
+        """
+        Build an INSERT that adds values' total and count to an existing row.
+
+        Raises:
+            ValueError: If the database has no single-statement upsert
+        """
+        table = ExpenseRollup.__table__
+        dialect = connection.dialect.name
+        if dialect in ('sqlite', 'postgresql'):
+            insert = sqlite.insert if dialect == 'sqlite' else postgresql.insert
+            statement = insert(table).values(**values)
+            return statement.on_conflict_do_update(
+                index_elements=[table.c.category_id, table.c.year, table.c.month],
+                set_={
+                    'total_cents': table.c.total_cents + statement.excluded.total_cents,
+                    'count': table.c.count + statement.excluded.count
+                }
+            )
+        if dialect == 'mysql':
+            statement = mysql.insert(table).values(**values)
+            return statement.on_duplicate_key_update(
+                total_cents=table.c.total_cents + statement.inserted.total_cents,
+                count=table.c.count + statement.inserted.count
+            )
+        raise ValueError(f"Rollup upserts are not supported on {dialect}")
+
+    @staticmethod
+    def apply_deltas(connection, deltas):
+        """
+        Apply accumulated deltas with atomic in-database increments.
+
+        Deltas that add expenses run as one upsert per row (INSERT ... ON
+        CONFLICT DO UPDATE on SQLite and PostgreSQL, ON DUPLICATE KEY UPDATE
+        on MySQL) adding to total_cents and count in SQL, so concurrent
+        writers never lose each other's changes, even when both create the
+        row. New rows are owned by the category's user. Other deltas are a
+        plain UPDATE; a decrement for a missing row (e.g. its category was
+        just deleted) is dropped.
+        """
+        from app.models.category import Category
+
+        table = ExpenseRollup.__table__
+        categories = Category.__table__
+        for (year, month, category_id), (cents, count) in deltas.items():
+            if not cents and not count:
+                continue
+            if count > 0:
+                connection.execute(ExpenseRollup._upsert(connection, {
+                    'user_id': db.select(categories.c.user_id).where(
+                        categories.c.id == category_id
+                    ).scalar_subquery(),
+                    'year': year,
+                    'month': month,
+                    'category_id': category_id,
+                    'total_cents': cents,
+                    'count': count
+                }))
+                continue
+            connection.execute(
+                table.update().where(
+                    (table.c.year == year) &
+                    (table.c.month == month) &
+                    (table.c.category_id == category_id)
+                ).values(
+                    total_cents=table.c.total_cents + cents,
+                    count=table.c.count + count
+                )
+            )
+
+    @staticmethod
+    def rebuild():
+        """Recompute every user's rollup rows from the expenses table."""
+        from app.models.expense import Expense
+
+        year_col = db.extract('year', Expense.date)
+        month_col = db.extract('month', Expense.date)
+
+        aggregates = db.session.query(
+            Expense.user_id,
+            year_col.label('year'),
+            month_col.label('month'),
+            Expense.category_id,
+            db.func.sum(Expense.amount_cents).label('total'),
+            db.func.count(Expense.id).label('count')
+        ).group_by(
+            Expense.user_id, year_col, month_col, Expense.category_id
+        ).execution_options(all_tenants=True).all()
+
+        connection = db.session.connection()
+        connection.execute(ExpenseRollup.__table__.delete())
+        if aggregates:
+            connection.execute(ExpenseRollup.__table__.insert(), [
+                {
+                    'user_id': row.user_id,
+                    'year': int(row.year),
+                    'month': int(row.month),
+                    'category_id': row.category_id,
+                    'total_cents': int(row.total),
+                    'count': row.count
+                }
+                for row in aggregates
+            ])
+        db.session.commit()
+        return len(aggregates)
@@ -0,0 +1,58 @@
+"""
+User Model for Expense Tracker
+
+Accounts that own categories, expenses, budgets and recurring rules. Each
+user's data is kept apart by the tenancy filters in app.tenancy.
+"""
+
+from datetime import datetime
+from werkzeug.security import generate_password_hash, check_password_hash
+from app import db
+
+
+class User(db.Model):
+    """
+    Registered user.
+
+    Attributes:
+        id (int): Primary key
+        username (str): Unique login name
+        password_hash (str): Salted password hash
+        created_at (datetime): Registration timestamp
+    """
+
+    __tablename__ = 'users'
+
+    id = db.Column(db.Integer, primary_key=True)
+    username = db.Column(db.String(80), nullable=False, unique=True, index=True)
+    password_hash = db.Column(db.String(255), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f'<User {self.username}>'
+
+    def set_password(self, password):
+        """Store a salted hash of password."""
+        self.password_hash = generate_password_hash(password)
+
+    def check_password(self, password):
+        """Check password against the stored hash."""
+        return check_password_hash(self.password_hash, password)
+
+    @staticmethod
+    def create(username, password):
+        """
+        Register a user and give them the default categories.
+
+        Returns:
+            User: The new user
+        """
+        from app.models.category import Category
+
+        user = User(username=username.strip())
+        user.set_password(password)
+        db.session.add(user)
+        db.session.commit()
+
+        Category.create_default_categories(user.id)
+        return user
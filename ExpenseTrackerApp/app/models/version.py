@@ -0,0 +1,110 @@
+"""
+Data Version Model for Expense Tracker
+
+Keeps a monotonically increasing version stamp per tracked dataset. Stamps
+are bumped in the same transaction as the writes they describe, so every
+worker process can detect stale caches with one primary-key lookup. Stamps
+of user-owned datasets are kept per user (see app.tenancy.tenant_key).
+"""
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app import db
+from app.tenancy import tenant_key
+
+
+class DataVersion(db.Model):
+    """
+    Version stamp for a dataset.
+
+    Attributes:
+        name (str): Dataset name (e.g. 'categories', or 'categories:42' for one user)
+        version (int): Incremented on every committed write to the dataset
+    """
+
+    __tablename__ = 'data_versions'
+
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+    # Model class -> dataset name, registered with track()
+    _tracked = {}
+
+    # Callbacks run after a commit that bumped a dataset
+    _commit_listeners = []
+
+    def __repr__(self):
+        return f'<DataVersion {self.name}={self.version}>'
+
+    @classmethod
+    def track(cls, model, name):
+        """Bump the dataset stamp whenever instances of model are written."""
+        cls._tracked[model] = name
+
+    @classmethod
+    def on_commit(cls, callback):
+        """Register callback(names) to run after a commit bumps datasets."""
+        cls._commit_listeners.append(callback)
+        return callback
+
+    @staticmethod
+    def bump(connection, names):
+        """Atomically increment the stamps of the given datasets."""
+        table = DataVersion.__table__
+        for name in sorted(names):
+            result = connection.execute(
+                table.update().where(table.c.name == name).values(version=table.c.version + 1)
+            )
+            if result.rowcount == 0:
+                connection.execute(table.insert().values(name=name, version=1))
+
+    @staticmethod
+    def bump_in_session(session, names):
+        """Bump stamps within the session's transaction and notify on commit."""
+        names = set(names)
+        if not names:
+            return
+        DataVersion.bump(session.connection(), names)
+        session.info.setdefault('bumped_versions', set()).update(names)
+
+    @staticmethod
+    def current(*names):
+        """Return {name: version} for the given datasets in one query."""
+        table = DataVersion.__table__
+        rows = db.session.execute(
+            db.select(table.c.name, table.c.version).where(table.c.name.in_(names))
+        )
+        versions = dict.fromkeys(names, 0)
+        versions.update({row.name: row.version for row in rows})
+        return versions
+
+
+@event.listens_for(Session, 'before_flush')
+def _collect_versions(session, flush_context, instances):
+    """Note which tracked datasets this flush writes to."""
+    names = flush_context.attributes.setdefault('bumped_versions', set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        name = DataVersion._tracked.get(type(obj))
+        if name and (obj not in session.dirty or session.is_modified(obj)):
+            names.add(tenant_key(name, getattr(obj, 'user_id', None)))
+
+
+@event.listens_for(Session, 'after_flush')
+def _apply_versions(session, flush_context):
+    """Bump the stamps noted in before_flush, in the flush's transaction."""
+    DataVersion.bump_in_session(session, flush_context.attributes.get('bumped_versions', ()))
+
+
+@event.listens_for(Session, 'after_commit')
+def _notify_versions(session):
+    """Tell local caches about datasets changed by the committed transaction."""
+    names = session.info.pop('bumped_versions', None)
+    if names:
+        for callback in DataVersion._commit_listeners:
+            callback(names)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_versions(session):
+    """Forget bumps from a transaction that was rolled back."""
+    session.info.pop('bumped_versions', None)
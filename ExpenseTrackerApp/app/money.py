@@ -0,0 +1,61 @@
+"""
+Money Helpers for Flask Expense Tracker
+
+Amounts are stored, summed and cached as integer cents, so totals are exact
+and no Decimal or float arithmetic happens per row. Conversion to Decimal,
+float or display text happens once, at the edge (form input, JSON, templates).
+"""
+
+from decimal import Decimal, ROUND_HALF_UP
+
+_CENT = Decimal('0.01')
+
+
+def to_cents(amount):
+    """
+    Convert an amount in currency units to integer cents, rounding half up.
+
+    Args:
+        amount: int, Decimal, float or numeric string
+    Returns:
+        int: Amount in cents
+    Raises:
+        ValueError: If amount is not a number
+    """
+    if isinstance(amount, int):
+        return amount * 100
+    if not isinstance(amount, Decimal):
+        try:
+            amount = Decimal(str(amount).strip())
+        except ArithmeticError as e:
+            raise ValueError(f"Invalid amount: {amount}") from e
+    if not amount.is_finite():
+        raise ValueError(f"Invalid amount: {amount}")
+    return int(amount.quantize(_CENT, rounding=ROUND_HALF_UP).scaleb(2))
+
+
+def from_cents(cents):
+    """Convert integer cents to an exact Decimal amount."""
+    return Decimal(int(cents or 0)).scaleb(-2)
+
+
+def cents_to_float(cents):
+    """Convert integer cents to a float, for JSON output."""
+    return int(cents or 0) / 100
+
+
+def format_cents(cents, places=2):
+    """
+    Format integer cents as a plain decimal string, e.g. 123456 -> '1234.56'.
+
+    Args:
+        cents (int): Amount in cents
+        places (int): 2 for cents, 0 to round to whole units
+    """
+    cents = int(cents or 0)
+    sign = '-' if cents < 0 else ''
+    cents = abs(cents)
+    if places == 0:
+        return f'{sign}{(cents + 50) // 100}'
+    units, rest = divmod(cents, 100)
+    return f'{sign}{units}.{rest:02d}'
@@ -0,0 +1,63 @@
+"""
+Keyset Pagination for Flask Expense Tracker
+
+Seek-based paging helpers: pages are addressed by opaque cursor tokens that
+encode the sort key of the boundary row, so deep pages cost the same as the
+first one and no COUNT(*) is needed.
+"""
+
+import base64
+import json
+from datetime import date, datetime
+
+
+def encode_cursor(values):
+    """Encode a tuple of sort-key values into an opaque URL-safe token."""
+    payload = [
+        value.isoformat() if isinstance(value, (date, datetime)) else value
+        for value in values
+    ]
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    """
+    Decode a cursor token back into its list of raw values.
+
+    Raises:
+        ValueError: If the token is malformed
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (TypeError, ValueError, UnicodeError) as e:
+        raise ValueError(f"Invalid cursor: {token}") from e
+    if not isinstance(values, list):
+        raise ValueError(f"Invalid cursor: {token}")
+    return values
+
+
+class KeysetPage:
+    """
+    One page of keyset-paginated results.
+
+    Attributes:
+        items (list): Rows on this page, in display order
+        per_page (int): Requested page size
+        has_next (bool): Whether rows exist after this page
+        has_prev (bool): Whether rows exist before this page
+        next_cursor (str): Token for the following page, or None
+        prev_cursor (str): Token for the preceding page, or None
+    """
+
+    def __init__(self, items, per_page, has_next, has_prev, key_func):
+        self.items = items
+        self.per_page = per_page
+        self.has_next = has_next
+        self.has_prev = has_prev
+        self.next_cursor = encode_cursor(key_func(items[-1])) if items and has_next else None
+        self.prev_cursor = encode_cursor(key_func(items[0])) if items and has_prev else None
+
+    def __repr__(self):
+        return f'<KeysetPage items={len(self.items)} has_next={self.has_next} has_prev={self.has_prev}>'
@@ -0,0 +1,164 @@
+"""
+Query Plan Checks for Flask Expense Tracker
+
+Runs the hot list and aggregate queries for the current user, asks the
+database how it executes each statement (EXPLAIN QUERY PLAN on SQLite,
+EXPLAIN on PostgreSQL and MySQL) and reports the ones that read a whole
+table, or sort rows in a temporary B-tree instead of walking an index in
+order. Run through `flask check-query-plans`, ideally against a realistic
+amount of data such as the benchmark database.
+"""
+
+import re
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+from app import db
+from app.instrumentation import count_queries
+from app.models.category import Category
+from app.models.expense import Expense
+from app.pagination import encode_cursor
+
+# A hot code path: name, callable running it, and whether its rows must come
+# back in index order (aggregates may group in a temporary structure)
+HotQuery = namedtuple('HotQuery', 'name run ordered')
+
+# One plan problem: 'scan' (whole table read) or 'sort' (rows sorted in a temp structure)
+PlanProblem = namedtuple('PlanProblem', 'kind detail')
+
+PlanReport = namedtuple('PlanReport', 'name statement plan problems')
+
+_SQLITE_SCAN = re.compile(r'^SCAN (?!.*VIRTUAL TABLE)')
+_SQLITE_SORT = re.compile(r'USE TEMP B-TREE FOR .*\b(ORDER|GROUP) BY')
+_POSTGRES_SCAN = re.compile(r'\bSeq Scan on ')
+_POSTGRES_SORT = re.compile(r'^\s*(->\s*)?(Incremental )?Sort\b')
+
+
+def hot_queries(per_page=20):
+    """
+    The list and aggregate code paths whose plans must stay index-driven.
+
+    Returns:
+        list: HotQuery entries
+    """
+    today = date.today()
+    start = today - timedelta(days=90)
+    category_id = db.session.query(Category.id).order_by(Category.id).limit(1).scalar()
+    cursor = encode_cursor((start, datetime.combine(start, datetime.min.time()), 0))
+
+    def listing(category=None):
+        return Expense.apply_filters(Expense.with_category(), category_id=category)
+
+    def page_numbers():
+        return listing().order_by(
+            Expense.date.desc(),
+            Expense.created_at.desc()
+        ).paginate(page=2, per_page=per_page, error_out=False)
+
+    def timeseries(category=None):
+        from app.timeseries import get_timeseries
+        return get_timeseries(start, today, 'day', category)
+
+    def export():
+        from app.exporter import export_statement
+        return db.session.execute(export_statement().limit(per_page)).all()
+
+    return [
+        HotQuery('expenses_first_page', lambda: Expense.paginate_keyset(listing(), per_page=per_page), True),
+        HotQuery('expenses_after', lambda: Expense.paginate_keyset(listing(), after=cursor, per_page=per_page), True),
+        HotQuery('expenses_before', lambda: Expense.paginate_keyset(listing(), before=cursor, per_page=per_page), True),
+        HotQuery('expenses_category', lambda: Expense.paginate_keyset(
+            listing(category_id), per_page=per_page
+        ), True),
+        HotQuery('expenses_page_number', page_numbers, True),
+        HotQuery('recent_expenses', Expense.get_recent_expenses, True),
+        HotQuery('export', export, True),
+        HotQuery('timeseries_day', timeseries, False),
+        HotQuery('timeseries_day_category', lambda: timeseries(category_id), False),
+        HotQuery('dashboard_stats', Expense.get_dashboard_stats, False)
+    ]
+
+
+def _sqlite_plan(connection, statement, parameters):
+    """Plan lines and problems from SQLite's EXPLAIN QUERY PLAN."""
+    rows = connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters).all()
+    plan = [row[-1] for row in rows]
+    problems = []
+    for line in plan:
+        if _SQLITE_SCAN.search(line):
+            problems.append(PlanProblem('scan', line))
+        elif _SQLITE_SORT.search(line):
+            problems.append(PlanProblem('sort', line))
+    return plan, problems
+
+
+def _postgres_plan(connection, statement, parameters):
+    """Plan lines and problems from PostgreSQL's text EXPLAIN."""
+    rows = connection.exec_driver_sql(f'EXPLAIN {statement}', parameters).all()
+    plan = [row[0] for row in rows]
+    problems = []
+    for line in plan:
+        if _POSTGRES_SCAN.search(line):
+            problems.append(PlanProblem('scan', line.strip()))
+        elif _POSTGRES_SORT.search(line):
+            problems.append(PlanProblem('sort', line.strip()))
+    return plan, problems
+
+
+def _mysql_plan(connection, statement, parameters):
+    """Plan lines and problems from MySQL's tabular EXPLAIN."""
+    rows = connection.exec_driver_sql(f'EXPLAIN {statement}', parameters).mappings().all()
+    plan = [
+        f"{row['table']}: type={row['type']} key={row['key']} extra={row['Extra'] or ''}"
+        for row in rows
+    ]
+    problems = []
+    for line, row in zip(plan, rows):
+        extra = row['Extra'] or ''
+        if row['type'] == 'ALL':
+            problems.append(PlanProblem('scan', line))
+        if 'Using filesort' in extra or 'Using temporary' in extra:
+            problems.append(PlanProblem('sort', line))
+    return plan, problems
+
+
+_EXPLAINERS = {
+    'sqlite': _sqlite_plan,
+    'postgresql': _postgres_plan,
+    'mysql': _mysql_plan
+}
+
+
+def check_query_plans(queries=None):
+    """
+    Run each hot query and check the plan of every SELECT it issues.
+
+    Must be called with a user in scope (see app.tenancy.tenant), since the
+    plans depend on the tenant filter.
+
+    Args:
+        queries (list): HotQuery entries; defaults to hot_queries()
+    Returns:
+        list: PlanReport per SELECT statement, with sort problems dropped for
+            unordered queries
+    Raises:
+        ValueError: If the database has no supported EXPLAIN
+    """
+    dialect = db.engine.dialect.name
+    explain = _EXPLAINERS.get(dialect)
+    if explain is None:
+        raise ValueError(f"Query plan checks are not supported on {dialect}")
+
+    reports = []
+    for query in queries if queries is not None else hot_queries():
+        with count_queries() as counter:
+            query.run()
+        connection = db.session.connection()
+        for statement, parameters in zip(counter.statements, counter.parameters):
+            if not statement.lstrip().upper().startswith(('SELECT', 'WITH')):
+                continue
+            plan, problems = explain(connection, statement, parameters)
+            if not query.ordered:
+                problems = [problem for problem in problems if problem.kind != 'sort']
+            reports.append(PlanReport(query.name, statement, plan, problems))
+    db.session.rollback()
+    return reports
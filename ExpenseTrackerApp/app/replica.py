@@ -0,0 +1,98 @@
+"""
+Read Replica Routing for Flask Expense Tracker
+
+Routes read-only work to an optional replica database (the 'replica' bind,
+configured with DATABASE_READ_URL) while writes stay on the primary.
+
+A session reads from the replica only inside use_replica() or a @read_only
+view, and never once it has written: flushes, DML statements and any read
+in the same request after a write go to the primary. After a request that
+wrote, the client keeps reading from the primary for REPLICA_STICKY_SECONDS
+so it sees its own changes despite replication lag.
+"""
+
+import time
+from contextlib import contextmanager
+from functools import wraps
+from flask import has_request_context, session as flask_session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.sql.dml import UpdateBase
+
+REPLICA_BIND = 'replica'
+
+_STICKY_KEY = '_db_primary_until'
+
+
+class RoutingSession(Session):
+    """Session that sends reads to the replica engine when it is safe to."""
+
+    def _reads_from_replica(self):
+        """Whether plain reads should currently use the replica."""
+        if self.info.get('replica_depth', 0) <= 0 or self.info.get('wrote'):
+            return False
+        if self._flushing:
+            return False
+        if has_request_context() and flask_session.get(_STICKY_KEY, 0) > time.time():
+            return False
+        return True
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not isinstance(clause, UpdateBase) and self._reads_from_replica():
+            engine = self._db.engines.get(REPLICA_BIND)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _mark_flush_write(session, flush_context):
+    """Pin the session to the primary once it has flushed changes."""
+    session.info['wrote'] = True
+
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _mark_statement_write(orm_execute_state):
+    """Pin the session to the primary once it has run a DML statement."""
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info['wrote'] = True
+
+
+@contextmanager
+def use_replica(session=None):
+    """
+    Send reads in this block to the replica, if one is configured.
+
+    Example:
+        with use_replica():
+            total = Expense.get_monthly_total()
+    """
+    if session is None:
+        from app import db
+        session = db.session
+    info = session.info
+    info['replica_depth'] = info.get('replica_depth', 0) + 1
+    try:
+        yield session
+    finally:
+        info['replica_depth'] -= 1
+
+
+def read_only(func):
+    """Decorator for read-only views and model helpers: run reads on the replica."""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with use_replica():
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def init_app(app):
+    """Keep clients on the primary for a while after they write."""
+
+    @app.after_request
+    def stick_to_primary_after_write(response):
+        from app import db
+        if db.session.info.get('wrote') and REPLICA_BIND in app.config.get('SQLALCHEMY_BINDS', {}):
+            flask_session[_STICKY_KEY] = time.time() + app.config.get('REPLICA_STICKY_SECONDS', 5)
+        return response
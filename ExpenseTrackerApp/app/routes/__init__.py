@@ -6,5 +6,8 @@ This package contains all route handlers and blueprints.
 """
 
 from app.routes.main import main_bp
+from app.routes.api import api_bp
+from app.routes.internal import internal_bp
+from app.routes.auth import auth_bp
 
-__all__ = ['main_bp']
\ No newline at end of file
+__all__ = ['main_bp', 'api_bp', 'internal_bp', 'auth_bp']
\ No newline at end of file
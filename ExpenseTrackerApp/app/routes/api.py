@@ -0,0 +1,304 @@
+"""
+JSON API Routes for Flask Expense Tracker
+
+Versioned machine interface for expenses: filtered, cursor-paged listing,
+single reads, and batch create/update/delete that commit in one transaction;
+plus management of recurring expense rules.
+"""
+
+from flask import Blueprint, request, jsonify, current_app
+from sqlalchemy.exc import SQLAlchemyError
+from app import db
+from app.models.expense import Expense
+from app.models.recurring import RecurringExpense
+from app.money import to_cents
+from app.validators import validate_expense, validate_recurring
+from app.replica import read_only
+from app.routes.auth import require_login
+
+# Create Blueprint
+api_bp = Blueprint('api', __name__, url_prefix='/api/v1')
+api_bp.before_request(require_login)
+
+
+def _error(message, status=400, **extra):
+    """Build a JSON error response."""
+    payload = {'status': 'error', 'message': message}
+    payload.update(extra)
+    return jsonify(payload), status
+
+
+def _batch_items(key):
+    """
+    Read a batch from the JSON body: either a bare array or {key: [...]}.
+
+    Returns:
+        tuple: (items, error_response) - exactly one of them is None
+    """
+    body = request.get_json(silent=True)
+    items = body.get(key) if isinstance(body, dict) else body
+    if not isinstance(items, list) or not items:
+        return None, _error(f'Request body must be a non-empty array or an object with a "{key}" array')
+    limit = current_app.config.get('API_MAX_BATCH_SIZE', 1000)
+    if len(items) > limit:
+        return None, _error(f'Batch too large: {len(items)} items (limit {limit})', 413)
+    return items, None
+
+
+def _is_id(value):
+    """Whether a JSON value is usable as a row id (an integer, not a boolean)."""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _id_errors(ids, found, label):
+    """Per-item errors for ids that are not integers or match no row in found."""
+    errors = []
+    for index, value in enumerate(ids):
+        if not _is_id(value):
+            errors.append((index, [f'Invalid id {value!r}: must be an integer']))
+        elif value not in found:
+            errors.append((index, [f'{label} {value} not found']))
+    return errors
+
+
+def _validation_failed(errors):
+    """Build the response for a batch with invalid items."""
+    return _error(
+        'Validation failed',
+        422,
+        errors=[{'index': index, 'messages': messages} for index, messages in errors]
+    )
+
+
+def _commit(status=200, **payload):
+    """Commit the batch transaction and build the success response."""
+    try:
+        db.session.commit()
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        return _error(f'Database error: {str(e)}', 500)
+    return jsonify({'status': 'success', **payload}), status
+
+
+@api_bp.route('/expenses', methods=['GET'])
+@read_only
+def list_expenses():
+    """List expenses newest first, with list filters and cursor paging."""
+    category_id = request.args.get('category', type=int)
+    search_term = request.args.get('search', '').strip()
+    limit = min(max(request.args.get('limit', 50, type=int), 1), 500)
+
+    query = Expense.apply_filters(Expense.with_category(), search_term, category_id, ranked=False)
+    try:
+        page = Expense.paginate_keyset(
+            query,
+            after=request.args.get('after'),
+            before=request.args.get('before'),
+            per_page=limit
+        )
+    except ValueError as e:
+        return _error(str(e))
+
+    return jsonify({
+        'status': 'success',
+        'data': [expense.to_dict() for expense in page.items],
+        'paging': {
+            'has_next': page.has_next,
+            'has_prev': page.has_prev,
+            'next_cursor': page.next_cursor,
+            'prev_cursor': page.prev_cursor
+        }
+    })
+
+
+@api_bp.route('/expenses/<int:expense_id>', methods=['GET'])
+@read_only
+def get_expense(expense_id):
+    """Get a single expense."""
+    expense = Expense.with_category().filter(Expense.id == expense_id).first()
+    if not expense:
+        return _error('Expense not found', 404)
+    return jsonify({'status': 'success', 'data': expense.to_dict()})
+
+
+@api_bp.route('/expenses', methods=['POST'])
+def create_expenses():
+    """Create a batch of expenses; all are saved or none are."""
+    items, error = _batch_items('expenses')
+    if error:
+        return error
+
+    expenses = []
+    errors = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            errors.append((index, ['Item must be an object']))
+            continue
+        values, messages = validate_expense(item)
+        if messages:
+            errors.append((index, messages))
+            continue
+        expenses.append(Expense(**values))
+
+    if errors:
+        return _validation_failed(errors)
+
+    db.session.add_all(expenses)
+    try:
+        db.session.flush()
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        return _error(f'Database error: {str(e)}', 500)
+    data = Expense.to_dict_many(expenses)
+    return _commit(201, data=data)
+
+
+@api_bp.route('/expenses', methods=['PATCH'])
+def update_expenses():
+    """
+    Update a batch of expenses; all are saved or none are.
+
+    Each item needs an "id" and may change any of description, amount,
+    category_id, date and notes.
+    """
+    items, error = _batch_items('expenses')
+    if error:
+        return error
+
+    ids = [item.get('id') for item in items if isinstance(item, dict)]
+    existing = {
+        expense.id: expense
+        for expense in Expense.query.filter(Expense.id.in_([i for i in ids if _is_id(i)]))
+    }
+
+    updates = []
+    errors = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            errors.append((index, ['Item must be an object']))
+            continue
+        if not _is_id(item.get('id')):
+            errors.append((index, [f'Invalid id {item.get("id")!r}: must be an integer']))
+            continue
+        expense = existing.get(item['id'])
+        if not expense:
+            errors.append((index, [f'Expense {item.get("id")} not found']))
+            continue
+        data = {
+            'description': expense.description,
+            'amount': expense.amount,
+            'category_id': expense.category_id,
+            'date': expense.date,
+            'notes': expense.notes
+        }
+        data.update({key: value for key, value in item.items() if key in data})
+        values, messages = validate_expense(data)
+        if messages:
+            errors.append((index, messages))
+            continue
+        updates.append((expense, values))
+
+    if errors:
+        return _validation_failed(errors)
+
+    for expense, values in updates:
+        for key, value in values.items():
+            setattr(expense, key, value)
+
+    try:
+        db.session.flush()
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        return _error(f'Database error: {str(e)}', 500)
+    data = Expense.to_dict_many([expense for expense, _ in updates])
+    return _commit(data=data)
+
+
+@api_bp.route('/expenses', methods=['DELETE'])
+def delete_expenses():
+    """Delete a batch of expenses by id; all are deleted or none are."""
+    ids, error = _batch_items('ids')
+    if error:
+        return error
+
+    expenses = Expense.query.filter(Expense.id.in_([i for i in ids if _is_id(i)])).all()
+    found = {expense.id for expense in expenses}
+    missing = _id_errors(ids, found, 'Expense')
+    if missing:
+        return _validation_failed(missing)
+
+    for expense in expenses:
+        db.session.delete(expense)
+    return _commit(deleted=sorted(found))
+
+
+@api_bp.route('/recurring', methods=['GET'])
+@read_only
+def list_recurring():
+    """List recurring expense rules."""
+    rules = RecurringExpense.query.order_by(RecurringExpense.description).all()
+    return jsonify({'status': 'success', 'data': [rule.to_dict() for rule in rules]})
+
+
+@api_bp.route('/recurring', methods=['POST'])
+def create_recurring():
+    """
+    Create a batch of recurring expense rules; all are saved or none are.
+
+    Each item needs description, amount, category_id, frequency and
+    start_date, and may set end_date and notes. Expenses are generated by
+    `flask materialize-recurring`.
+    """
+    items, error = _batch_items('rules')
+    if error:
+        return error
+
+    rules = []
+    errors = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            errors.append((index, ['Item must be an object']))
+            continue
+        values, messages = validate_recurring(item)
+        if messages:
+            errors.append((index, messages))
+            continue
+        values['amount_cents'] = to_cents(values.pop('amount'))
+        rules.append(RecurringExpense(**values))
+
+    if errors:
+        return _validation_failed(errors)
+
+    db.session.add_all(rules)
+    try:
+        db.session.flush()
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        return _error(f'Database error: {str(e)}', 500)
+    data = [rule.to_dict() for rule in rules]
+    return _commit(201, data=data)
+
+
+@api_bp.route('/recurring', methods=['DELETE'])
+def delete_recurring():
+    """
+    Delete a batch of recurring rules by id; all are deleted or none are.
+
+    Expenses already generated from the rules are kept.
+    """
+    ids, error = _batch_items('ids')
+    if error:
+        return error
+
+    rules = RecurringExpense.query.filter(RecurringExpense.id.in_([i for i in ids if _is_id(i)])).all()
+    found = {rule.id for rule in rules}
+    missing = _id_errors(ids, found, 'Recurring expense')
+    if missing:
+        return _validation_failed(missing)
+
+    Expense.query.filter(Expense.recurring_id.in_(found)).update(
+        {Expense.recurring_id: None}, synchronize_session=False
+    )
+    for rule in rules:
+        db.session.delete(rule)
+    return _commit(deleted=sorted(found))
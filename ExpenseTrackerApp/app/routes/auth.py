@@ -0,0 +1,96 @@
+"""
+Authentication Routes for Flask Expense Tracker
+
+Registration, login and logout. The logged-in user's id is kept in the
+signed session cookie and selects whose data every other route sees.
+"""
+
+from flask import Blueprint, render_template, request, redirect, url_for, flash, session, jsonify
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models.user import User
+from app.tenancy import current_user_id
+from app.validators import validate_registration
+
+# Create Blueprint
+auth_bp = Blueprint('auth', __name__)
+
+
+def require_login():
+    """
+    Before-request hook for blueprints that need a logged-in user.
+
+    JSON API requests get a 401 response; page requests are redirected to
+    the login form.
+    """
+    if current_user_id() is not None:
+        return None
+    if request.blueprint == 'api' or request.accept_mimetypes.best == 'application/json':
+        return jsonify({'status': 'error', 'message': 'Authentication required'}), 401
+    return redirect(url_for('auth.login', next=request.full_path if request.query_string else request.path))
+
+
+def _safe_next(target):
+    """Only follow relative redirect targets after login."""
+    if target and target.startswith('/') and not target.startswith('//'):
+        return target
+    return url_for('main.index')
+
+
+def _log_in(user):
+    """Start a fresh session for user."""
+    session.clear()
+    session['user_id'] = user.id
+    session['username'] = user.username
+
+
+@auth_bp.route('/login', methods=['GET', 'POST'])
+def login():
+    """Log in with username and password."""
+    if request.method == 'POST':
+        username = request.form.get('username', '').strip()
+        user = User.query.filter_by(username=username).first()
+        if user is None or not user.check_password(request.form.get('password', '')):
+            flash('Invalid username or password', 'error')
+            return render_template('login.html', username=username), 401
+
+        _log_in(user)
+        flash(f'Welcome back, {user.username}!', 'success')
+        return redirect(_safe_next(request.args.get('next')))
+
+    return render_template('login.html')
+
+
+@auth_bp.route('/register', methods=['GET', 'POST'])
+def register():
+    """Create an account with the default categories and log in."""
+    if request.method == 'POST':
+        values, errors = validate_registration(request.form)
+        if not errors and User.query.filter_by(username=values['username']).first():
+            errors.append('That username is taken')
+
+        if not errors:
+            try:
+                user = User.create(values['username'], values['password'])
+            except IntegrityError:
+                db.session.rollback()
+                errors.append('That username is taken')
+
+        if errors:
+            for error in errors:
+                flash(error, 'error')
+            return render_template('register.html', username=values['username']), 400
+
+        _log_in(user)
+        flash(f'Welcome, {user.username}! Your account is ready.', 'success')
+        return redirect(url_for('main.index'))
+
+    return render_template('register.html')
+
+
+@auth_bp.route('/logout', methods=['POST'])
+def logout():
+    """Log out and clear the session."""
+    session.clear()
+    flash('You have been logged out', 'success')
+    return redirect(url_for('auth.login'))
@@ -0,0 +1,37 @@
+"""
+Internal Routes for Flask Expense Tracker
+
+Operational endpoints for monitoring, disabled unless INTERNAL_STATS_ENABLED
+is set and, when INTERNAL_STATS_TOKEN is configured, the caller sends it in
+the X-Internal-Token header.
+"""
+
+import hmac
+from flask import Blueprint, abort, current_app, jsonify, request
+from app import db
+from app.instrumentation import pool_stats
+
+# Create Blueprint
+internal_bp = Blueprint('internal', __name__, url_prefix='/internal')
+
+
+@internal_bp.before_request
+def require_internal_access():
+    """Hide the internal endpoints unless enabled and authorized."""
+    if not current_app.config.get('INTERNAL_STATS_ENABLED'):
+        abort(404)
+    token = current_app.config.get('INTERNAL_STATS_TOKEN')
+    if token and not hmac.compare_digest(request.headers.get('X-Internal-Token', ''), token):
+        abort(404)
+
+
+@internal_bp.route('/stats/pool')
+def pool_statistics():
+    """Connection pool state and checkout metrics for every engine."""
+    return jsonify({
+        'status': 'success',
+        'data': {
+            bind_key or 'default': pool_stats(engine)
+            for bind_key, engine in db.engines.items()
+        }
+    })
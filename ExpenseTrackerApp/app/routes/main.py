@@ -2,97 +2,191 @@
 Main Routes for Flask Expense Tracker
 
 Handles all core functionality including dashboard, CRUD operations,
-form processing, and API endpoints.
+form processing, and API endpoints. Every route needs a logged-in user and
+only sees that user's data.
 """
 
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
-from datetime import datetime, date
-from decimal import Decimal, InvalidOperation
+import io
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, current_app, session, make_response, Response, stream_with_context
+from datetime import datetime, date, timedelta
 from sqlalchemy.exc import SQLAlchemyError
 from app import db
 from app.models.expense import Expense
-from app.models.category import Category
+from app.models.category import Category, category_registry
+from app.models.version import DataVersion
+from app.models.budget import Budget
+from app.cache import LRUCache
+from app.fragments import LazySequence
+from app.validators import validate_expense
+from app.importer import import_expenses, IMPORT_FORMATS
+from app.exporter import generate_export
+from app.replica import read_only
+from app.money import cents_to_float, format_cents, to_cents
+from app.timeseries import get_timeseries, TIMESERIES_BUCKETS
+from app.tenancy import current_user_id, tenant_key
+from app.analytics import analytics, available as analytics_available
+from app.routes.auth import require_login
 
 # Create Blueprint
 main_bp = Blueprint('main', __name__)
+main_bp.before_request(require_login)
+
+# Dashboard aggregates keyed by user, data version and month
+_stats_cache = LRUCache(maxsize=256)
+
+
+def _data_versions(names=('expenses', 'categories')):
+    """Return the current user's data version stamps of the given datasets in one query."""
+    keys = [tenant_key(name) for name in names]
+    versions = DataVersion.current(*keys)
+    return tuple(versions[key] for key in keys)
+
+
+def _dashboard_stats(year, month):
+    """Get dashboard stats from the columnar analytics engine when enabled, else from SQL."""
+    if analytics_available():
+        return analytics.get_dashboard_stats(year, month)
+    return Expense.get_dashboard_stats(year, month)
+
+
+def _cached_dashboard_stats(versions, year, month):
+    """Get dashboard stats, recomputing only when the data version changed."""
+    key = (db.engine, current_user_id(), versions, year, month)
+    return _stats_cache.get_or_set(key, lambda: _dashboard_stats(year, month))
+
+
+def _cached_budget_status(versions, year, month):
+    """Get the month's budget status, recomputing only when the data version changed."""
+    key = ('budgets', db.engine, current_user_id(), versions, year, month)
+    return _stats_cache.get_or_set(key, lambda: Budget.month_status(year, month))
+
+
+def _not_modified(etag):
+    """Return a 304 response if the client already holds this ETag, else None."""
+    if etag in request.if_none_match:
+        response = make_response('', 304)
+        response.set_etag(etag)
+        return response
+    return None
 
 @main_bp.route('/')
+@read_only
 def index():
     """Dashboard - Display recent expenses and summary statistics."""
     try:
-        # Get recent expenses
-        recent_expenses = Expense.get_recent_expenses(limit=10)
-
-        # Get current date statistics
         current_date = datetime.now()
-        monthly_total = Expense.get_monthly_total(current_date.year, current_date.month)
-        yearly_total = Expense.get_yearly_total(current_date.year)
+        versions = _data_versions(('expenses', 'categories', 'budgets'))
 
-        # Get category breakdown
-        category_totals = Expense.get_category_totals(current_date.year, current_date.month)
+        # Serve 304 when nothing changed, unless messages are waiting to flash
+        etag = 'dashboard-u{}-e{}-c{}-b{}-{}'.format(current_user_id(), *versions, current_date.date().isoformat())
+        cacheable = not session.get('_flashes')
+        if cacheable:
+            not_modified = _not_modified(etag)
+            if not_modified:
+                return not_modified
 
-        # Get categories for quick add
-        categories = Category.get_active_categories()
+        # Recent expenses, only queried when their cached fragment is rendered
+        recent_expenses = LazySequence(lambda: Expense.get_recent_expenses(limit=10))
 
-        # Count total expenses
-        total_expenses_count = Expense.query.count()
+        # Get current date statistics and category breakdown
+        stats = _cached_dashboard_stats(versions[:2], current_date.year, current_date.month)
+        budgets = _cached_budget_status(versions, current_date.year, current_date.month)
 
-        return render_template(
+        # Get categories for quick add
+        categories = category_registry.active()
+
+        response = make_response(render_template(
             'index.html',
             recent_expenses=recent_expenses,
-            monthly_total=monthly_total,
-            yearly_total=yearly_total,
-            category_totals=category_totals,
+            monthly_total_cents=stats['monthly_total_cents'],
+            yearly_total_cents=stats['yearly_total_cents'],
+            category_totals=stats['category_totals'],
             categories=categories,
-            total_expenses_count=total_expenses_count,
+            total_expenses_count=stats['total_count'],
+            budgets=budgets,
             current_month=current_date.strftime('%B %Y'),
-            current_year=current_date.year
-        )
+            current_year=current_date.year,
+            # Keys of the {% cache %} fragments; 'New' badges depend on the day
+            versions=versions[:2],
+            today=current_date.date()
+        ))
+        if cacheable:
+            response.set_etag(etag)
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        return response
 
     except Exception as e:
         flash(f'Error loading dashboard: {str(e)}', 'error')
         return render_template('index.html', 
                              recent_expenses=[], 
                              categories=[],
-                             monthly_total=0,
-                             category_totals=[])
+                             monthly_total_cents=0,
+                             category_totals=[],
+                             budgets=[])
 
 @main_bp.route('/expenses')
+@read_only
 def expenses():
-    """View all expenses with pagination and filtering."""
+    """View all expenses with pagination and filtering.
+
+    Uses keyset pagination via ``after``/``before`` cursors by default; passing
+    ``page`` falls back to classic page-number pagination. Searches are ranked
+    by relevance and always use page numbers.
+    """
     try:
-        page = request.args.get('page', 1, type=int)
+        page = request.args.get('page', type=int)
+        after = request.args.get('after')
+        before = request.args.get('before')
         category_id = request.args.get('category', type=int)
         search_term = request.args.get('search', '').strip()
+        per_page = current_app.config.get('EXPENSES_PER_PAGE', 20)
 
-        # Base query
-        query = Expense.query
+        # Base query, loading categories in the same SELECT
+        query = Expense.with_category()
 
-        # Apply search filter
-        if search_term:
-            query = query.filter(Expense.description.contains(search_term))
+        # Apply search and category filters
+        query = Expense.apply_filters(query, search_term, category_id)
 
-        # Apply category filter
-        if category_id:
-            query = query.filter_by(category_id=category_id)
+        # Ranked search results use page-number pagination
+        if search_term:
+            page = page or 1
 
         # Paginate results
-        expenses_paginated = query.order_by(
-            Expense.date.desc(), 
-            Expense.created_at.desc()
-        ).paginate(
-            page=page, 
-            per_page=20, 
-            error_out=False
-        )
+        if page:
+            expenses_paginated = query.order_by(
+                Expense.date.desc(), 
+                Expense.created_at.desc()
+            ).paginate(
+                page=page, 
+                per_page=per_page, 
+                error_out=False
+            )
+        else:
+            try:
+                expenses_paginated = Expense.paginate_keyset(
+                    query, after=after, before=before, per_page=per_page
+                )
+            except ValueError:
+                flash('Invalid page link, showing the latest expenses.', 'warning')
+                expenses_paginated = Expense.paginate_keyset(query, per_page=per_page)
 
         # Get categories for filter
-        categories = Category.get_active_categories()
+        categories = category_registry.active()
+
+        # Filters to carry across pagination links
+        filter_args = {}
+        if search_term:
+            filter_args['search'] = search_term
+        if category_id:
+            filter_args['category'] = category_id
 
         return render_template(
             'expenses.html',
             expenses=expenses_paginated.items,
             pagination=expenses_paginated,
+            keyset=not page,
+            filter_args=filter_args,
             categories=categories,
             selected_category=category_id,
             search_term=search_term
@@ -109,11 +203,11 @@ def add_expense():
         return _process_expense_form()
 
     # GET request - show form
-    categories = Category.get_active_categories()
+    categories = category_registry.active()
 
     if not categories:
         Category.create_default_categories()
-        categories = Category.get_active_categories()
+        categories = category_registry.active()
 
     return render_template('add_expense.html', categories=categories)
 
@@ -125,7 +219,7 @@ def edit_expense(expense_id):
     if request.method == 'POST':
         return _process_expense_form(expense)
 
-    categories = Category.get_active_categories()
+    categories = category_registry.active()
     return render_template('edit_expense.html', expense=expense, categories=categories)
 
 @main_bp.route('/delete_expense/<int:expense_id>', methods=['POST'])
@@ -149,25 +243,93 @@ def delete_expense(expense_id):
 
     return redirect(request.referrer or url_for('main.index'))
 
+@main_bp.route('/expenses/import', methods=['GET', 'POST'])
+def import_expenses_upload():
+    """Bulk import expenses from an uploaded CSV or JSON file."""
+    if request.method == 'GET':
+        return render_template('import_expenses.html')
+
+    upload = request.files.get('file')
+    if not upload or not upload.filename:
+        flash('Please choose a file to import', 'error')
+        return redirect(url_for('main.import_expenses_upload'))
+
+    fmt = request.form.get('format') or upload.filename.rsplit('.', 1)[-1].lower()
+    if fmt in ('ndjson', 'jsonl'):
+        fmt = 'json'
+    if fmt not in IMPORT_FORMATS:
+        flash('Unsupported file type, use CSV or JSON', 'error')
+        return redirect(url_for('main.import_expenses_upload'))
+
+    try:
+        stream = io.TextIOWrapper(upload.stream, encoding='utf-8-sig', newline='')
+        result = import_expenses(
+            stream,
+            fmt=fmt,
+            batch_size=current_app.config.get('IMPORT_BATCH_SIZE', 1000)
+        )
+    except (SQLAlchemyError, ValueError, UnicodeDecodeError) as e:
+        flash(f'Error importing expenses: {str(e)}', 'error')
+        return redirect(url_for('main.import_expenses_upload'))
+
+    if request.accept_mimetypes.best == 'application/json':
+        return jsonify({'status': 'success', 'data': result.to_dict()})
+
+    flash(f'Imported {result.inserted} expenses ({result.rows_per_second:.0f} rows/s)', 'success')
+    if result.errors:
+        flash(f'{len(result.errors)} rows were rejected', 'warning')
+    return render_template('import_expenses.html', result=result)
+
+@main_bp.route('/expenses/export.<any(csv, ndjson):fmt>')
+@read_only
+def export_expenses(fmt):
+    """Stream all expenses matching the list filters as CSV or NDJSON."""
+    category_id = request.args.get('category', type=int)
+    search_term = request.args.get('search', '').strip()
+
+    mimetype = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    filename = f"expenses-{datetime.now().strftime('%Y%m%d')}.{fmt}"
+
+    response = Response(
+        stream_with_context(generate_export(fmt, search_term, category_id)),
+        mimetype=mimetype
+    )
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
 @main_bp.route('/api/expenses/summary')
+@read_only
 def api_expenses_summary():
     """API endpoint for expense summary data."""
     try:
         current_date = datetime.now()
-        monthly_total = Expense.get_monthly_total(current_date.year, current_date.month)
-        yearly_total = Expense.get_yearly_total(current_date.year)
-        category_totals = Expense.get_category_totals(current_date.year, current_date.month)
+        versions = _data_versions()
 
-        return jsonify({
+        etag = 'summary-u{}-e{}-c{}-{}-{}'.format(current_user_id(), *versions, current_date.year, current_date.month)
+        not_modified = _not_modified(etag)
+        if not_modified:
+            return not_modified
+
+        stats = _cached_dashboard_stats(versions, current_date.year, current_date.month)
+
+        response = jsonify({
             'status': 'success',
             'data': {
-                'monthly_total': monthly_total,
-                'yearly_total': yearly_total,
-                'category_totals': category_totals,
+                'monthly_total': cents_to_float(stats['monthly_total_cents']),
+                'yearly_total': cents_to_float(stats['yearly_total_cents']),
+                'monthly_total_cents': stats['monthly_total_cents'],
+                'yearly_total_cents': stats['yearly_total_cents'],
+                'category_totals': [
+                    dict(category, total=cents_to_float(category['total_cents']))
+                    for category in stats['category_totals']
+                ],
                 'month': current_date.strftime('%B %Y'),
                 'year': current_date.year
             }
         })
+        response.set_etag(etag)
+        response.cache_control.no_cache = True
+        return response
 
     except Exception as e:
         return jsonify({
@@ -175,50 +337,135 @@ def api_expenses_summary():
             'message': str(e)
         }), 500
 
-def _process_expense_form(expense=None):
-    """Process expense form submission (shared by add and edit)."""
+# Default range per bucket when 'from' is omitted
+_TIMESERIES_DEFAULT_DAYS = {'day': 30, 'week': 7 * 12, 'month': 365}
+
+
+@main_bp.route('/api/expenses/timeseries')
+@read_only
+def api_expenses_timeseries():
+    """
+    API endpoint for spending over time.
+
+    Query parameters: from and to (YYYY-MM-DD, default the trailing period
+    ending today), bucket (day, week or month), category (id) and window
+    (buckets in an optional rolling average).
+    """
+    bucket = request.args.get('bucket', 'day')
+    if bucket not in TIMESERIES_BUCKETS:
+        return jsonify({'status': 'error', 'message': f'bucket must be one of {", ".join(TIMESERIES_BUCKETS)}'}), 400
+
     try:
-        # Get form data
-        description = request.form.get('description', '').strip()
-        amount_str = request.form.get('amount', '').strip()
-        category_id = request.form.get('category_id', type=int)
-        date_str = request.form.get('date', '').strip()
-        notes = request.form.get('notes', '').strip()
-
-        # Validation
-        errors = []
+        end = date.fromisoformat(request.args['to']) if request.args.get('to') else date.today()
+        start = (
+            date.fromisoformat(request.args['from']) if request.args.get('from')
+            else end - timedelta(days=_TIMESERIES_DEFAULT_DAYS[bucket] - 1)
+        )
+    except ValueError:
+        return jsonify({'status': 'error', 'message': 'from and to must be dates in YYYY-MM-DD format'}), 400
 
-        if not description:
-            errors.append('Description is required')
-        elif len(description) > 255:
-            errors.append('Description must be less than 255 characters')
+    category_id = request.args.get('category', type=int)
+    window = request.args.get('window', type=int)
 
-        if not amount_str:
-            errors.append('Amount is required')
-        else:
-            try:
-                amount = Decimal(amount_str)
-                if amount <= 0:
-                    errors.append('Amount must be positive')
-                elif amount > 999999.99:
-                    errors.append('Amount is too large')
-            except (InvalidOperation, ValueError):
-                errors.append('Invalid amount format')
-
-        if not category_id:
-            errors.append('Category is required')
-        else:
-            category = Category.query.get(category_id)
-            if not category or not category.is_active:
-                errors.append('Invalid category selected')
+    versions = _data_versions()
+    etag = 'timeseries-u{}-e{}-c{}-{}-{}-{}-{}-{}'.format(
+        current_user_id(), *versions, start, end, bucket, category_id, window
+    )
+    not_modified = _not_modified(etag)
+    if not_modified:
+        return not_modified
 
-        # Validate date
-        expense_date = date.today()
-        if date_str:
+    try:
+        series = get_timeseries(start, end, bucket, category_id, window)
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+
+    response = jsonify({
+        'status': 'success',
+        'data': {
+            'from': start.isoformat(),
+            'to': end.isoformat(),
+            'bucket': bucket,
+            'category_id': category_id,
+            'window': window,
+            'total': cents_to_float(sum(point['total_cents'] for point in series)),
+            'count': sum(point['count'] for point in series),
+            'series': series
+        }
+    })
+    response.set_etag(etag)
+    response.cache_control.no_cache = True
+    return response
+
+def _budget_warning(category_id, expense_date):
+    """
+    Get the warning to show when the category's budget for the expense's month is exceeded.
+
+    Call it after flushing the expense write and before committing, so the
+    month total includes the write and the check runs in the same transaction.
+    """
+    status = Budget.check(category_id, expense_date)
+    if status and status['over_budget']:
+        return (
+            f'Over budget: {status["category"]} has spent ${format_cents(status["spent_cents"])} '
+            f'of ${format_cents(status["budget_cents"])} for {expense_date.strftime("%B %Y")}'
+        )
+    return None
+
+@main_bp.route('/budgets', methods=['GET', 'POST'])
+def budgets():
+    """View and set per-category budgets for a month (?month=YYYY-MM)."""
+    try:
+        period = datetime.strptime(request.values.get('month', ''), '%Y-%m')
+    except ValueError:
+        period = datetime.now()
+    year, month = period.year, period.month
+    categories = category_registry.active()
+
+    if request.method == 'POST':
+        amounts = {}
+        errors = []
+        for category in categories:
+            raw = request.form.get(f'budget_{category.id}', '').strip()
+            if not raw:
+                amounts[category.id] = None
+                continue
             try:
-                expense_date = datetime.strptime(date_str, '%Y-%m-%d').date()
+                cents = to_cents(raw)
             except ValueError:
-                errors.append('Invalid date format')
+                cents = 0
+            if cents <= 0:
+                errors.append(f'Invalid budget for {category.name}')
+            else:
+                amounts[category.id] = cents
+
+        if errors:
+            for error in errors:
+                flash(error, 'error')
+        else:
+            try:
+                Budget.set_month(year, month, amounts)
+                flash(f'Budgets for {period.strftime("%B %Y")} saved successfully!', 'success')
+            except SQLAlchemyError as e:
+                db.session.rollback()
+                flash(f'Database error: {str(e)}', 'error')
+        return redirect(url_for('main.budgets', month=f'{year:04d}-{month:02d}'))
+
+    status = {item['category_id']: item for item in Budget.month_status(year, month)}
+    return render_template(
+        'budgets.html',
+        categories=categories,
+        status=status,
+        month_value=f'{year:04d}-{month:02d}',
+        month_label=period.strftime('%B %Y')
+    )
+
+def _process_expense_form(expense=None):
+    """Process expense form submission (shared by add and edit)."""
+    try:
+        # Validate form data
+        values, errors = validate_expense(request.form)
+        description = values['description']
 
         # Show errors if any
         if errors:
@@ -232,25 +479,29 @@ def _process_expense_form(expense=None):
         # Create or update expense
         if expense:
             expense.description = description
-            expense.amount = amount
-            expense.category_id = category_id
-            expense.date = expense_date
-            expense.notes = notes or None
+            expense.amount = values['amount']
+            expense.category_id = values['category_id']
+            expense.date = values['date']
+            expense.notes = values['notes']
             expense.updated_at = datetime.utcnow()
             action = 'updated'
         else:
             expense = Expense(
                 description=description,
-                amount=amount,
-                category_id=category_id,
-                date=expense_date,
-                notes=notes or None
+                amount=values['amount'],
+                category_id=values['category_id'],
+                date=values['date'],
+                notes=values['notes']
             )
             db.session.add(expense)
             action = 'added'
 
+        db.session.flush()
+        warning = _budget_warning(values['category_id'], values['date'])
         db.session.commit()
         flash(f'Expense "{description}" {action} successfully!', 'success')
+        if warning:
+            flash(warning, 'warning')
         return redirect(url_for('main.index'))
 
     except Exception as e:
@@ -0,0 +1,222 @@
+"""
+Full-Text Search for Flask Expense Tracker
+
+Searches expense descriptions and notes through the best index the database
+offers: an SQLite FTS5 virtual table kept in sync by triggers, or a MySQL
+FULLTEXT index. Falls back to LIKE matching only when neither is available.
+"""
+
+import re
+from sqlalchemy import event, text
+from app import db
+from app.models.expense import Expense
+
+FTS_TABLE = 'expenses_fts'
+FULLTEXT_INDEX = 'ix_expenses_fulltext'
+
+BACKEND_FTS5 = 'fts5'
+BACKEND_FULLTEXT = 'fulltext'
+BACKEND_LIKE = 'like'
+
+_SQLITE_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        description, notes,
+        content='expenses', content_rowid='id',
+        tokenize='unicode61', prefix='2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON expenses BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, description, notes)
+        VALUES (new.id, new.description, new.notes);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON expenses BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, description, notes)
+        VALUES ('delete', old.id, old.description, old.notes);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF description, notes ON expenses BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, description, notes)
+        VALUES ('delete', old.id, old.description, old.notes);
+        INSERT INTO {FTS_TABLE}(rowid, description, notes)
+        VALUES (new.id, new.description, new.notes);
+    END""",
+]
+
+# Detected backend per engine, so detection runs once per process
+_backends = {}
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def _sqlite_has_fts5(connection):
+    """Check whether the SQLite library was compiled with FTS5."""
+    options = connection.exec_driver_sql('PRAGMA compile_options').scalars().all()
+    return 'ENABLE_FTS5' in options
+
+
+def _create_sqlite_index(connection):
+    """Create the FTS5 table and sync triggers if FTS5 is available."""
+    if not _sqlite_has_fts5(connection):
+        return False
+    for statement in _SQLITE_DDL:
+        connection.exec_driver_sql(statement)
+    return True
+
+
+def _create_mysql_index(connection):
+    """Add the FULLTEXT index on description and notes if it is missing."""
+    exists = connection.execute(text(
+        "SELECT COUNT(*) FROM information_schema.statistics "
+        "WHERE table_schema = DATABASE() AND table_name = 'expenses' "
+        "AND index_name = :name"
+    ), {'name': FULLTEXT_INDEX}).scalar()
+    if not exists:
+        connection.exec_driver_sql(
+            f"ALTER TABLE expenses ADD FULLTEXT INDEX {FULLTEXT_INDEX} (description, notes)"
+        )
+    return True
+
+
+@event.listens_for(Expense.__table__, 'after_create')
+def _create_search_index(target, connection, **kw):
+    """Create the full-text index alongside the expenses table."""
+    _backends.pop(connection.engine, None)
+    if connection.dialect.name == 'sqlite':
+        _create_sqlite_index(connection)
+    elif connection.dialect.name == 'mysql':
+        _create_mysql_index(connection)
+
+
+@event.listens_for(Expense.__table__, 'before_drop')
+def _drop_search_index(target, connection, **kw):
+    """Drop the FTS5 table, which is not part of the model metadata."""
+    _backends.pop(connection.engine, None)
+    if connection.dialect.name == 'sqlite':
+        connection.exec_driver_sql(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+def _search_bind():
+    """
+    Return the engine the session runs expense queries on right now.
+
+    Inside use_replica() or a @read_only view that is the replica, which may
+    be a different database (and SQLite build) than the primary.
+    """
+    return db.session.get_bind(mapper=Expense.__mapper__)
+
+
+def get_backend(engine=None):
+    """
+    Return the search backend available on an engine.
+
+    Args:
+        engine: Engine to inspect; defaults to the one expense queries are
+            currently routed to
+    """
+    if engine is None:
+        engine = _search_bind()
+    if engine not in _backends:
+        backend = BACKEND_LIKE
+        connection = db.session.connection(bind_arguments={'bind': engine})
+        if engine.dialect.name == 'sqlite':
+            found = connection.execute(text(
+                "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = :name"
+            ), {'name': FTS_TABLE}).scalar()
+            if found:
+                backend = BACKEND_FTS5
+        elif engine.dialect.name == 'mysql':
+            found = connection.execute(text(
+                "SELECT COUNT(*) FROM information_schema.statistics "
+                "WHERE table_schema = DATABASE() AND table_name = 'expenses' "
+                "AND index_name = :name"
+            ), {'name': FULLTEXT_INDEX}).scalar()
+            if found:
+                backend = BACKEND_FULLTEXT
+        _backends[engine] = backend
+    return _backends[engine]
+
+
+def _tokens(term):
+    """Split a search term into index-friendly word tokens."""
+    return _TOKEN_RE.findall(term)
+
+
+def apply_search(query, term, ranked=True):
+    """
+    Filter an expense query to rows whose description or notes match term.
+
+    Every word must match, and each is prefix-matched so partial input
+    ("groc") finds "groceries"; the LIKE fallback matches each word anywhere
+    in the text.
+
+    Args:
+        query: Query selecting from the expenses table
+        term (str): User search input
+        ranked (bool): Order results by relevance, best first
+    Returns:
+        Query: The filtered (and optionally ordered) query
+    """
+    tokens = _tokens(term)
+    if not tokens:
+        return query
+
+    engine = _search_bind()
+    backend = get_backend(engine)
+
+    if backend == BACKEND_FTS5:
+        match = ' '.join(f'"{token}"*' for token in tokens)
+        matches = db.select(
+            db.literal_column('rowid').label('rowid'),
+            db.literal_column('rank').label('rank')
+        ).select_from(db.table(FTS_TABLE)).where(
+            db.literal_column(FTS_TABLE).op('MATCH')(match)
+        )
+        # MATERIALIZED needs SQLite 3.35; get_backend() has connected, so the
+        # engine knows its library version
+        if engine.dialect.server_version_info >= (3, 35, 0):
+            # Materialize the matches once: left inline, SQLite may drive the join
+            # from another filter's index and re-run MATCH for every candidate row
+            matches = matches.cte('search_matches').prefix_with('MATERIALIZED')
+        else:
+            matches = matches.subquery('search_matches')
+        query = query.join(matches, matches.c.rowid == Expense.id)
+        if ranked:
+            query = query.order_by(matches.c.rank)
+        return query
+
+    if backend == BACKEND_FULLTEXT:
+        match = ' '.join(f'+{token}*' for token in tokens)
+        relevance = text(
+            'MATCH (expenses.description, expenses.notes) AGAINST (:search_match IN BOOLEAN MODE)'
+        ).bindparams(search_match=match)
+        query = query.filter(relevance)
+        if ranked:
+            query = query.order_by(db.desc(relevance))
+        return query
+
+    for token in tokens:
+        query = query.filter(db.or_(
+            Expense.description.contains(token, autoescape=True),
+            Expense.notes.contains(token, autoescape=True)
+        ))
+    return query
+
+
+def rebuild_index():
+    """
+    Create the full-text index if needed and repopulate it from expenses.
+
+    Returns:
+        str: The backend now in use
+    """
+    connection = db.session.connection()
+    dialect = connection.dialect.name
+
+    if dialect == 'sqlite':
+        if _create_sqlite_index(connection):
+            connection.exec_driver_sql(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    elif dialect == 'mysql':
+        _create_mysql_index(connection)
+
+    engine = connection.engine
+    db.session.commit()
+    _backends.pop(engine, None)
+    return get_backend(engine)
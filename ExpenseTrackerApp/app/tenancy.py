@@ -0,0 +1,128 @@
+"""
+Multi-User Tenancy for Flask Expense Tracker
+
+Every user-owned table carries a user_id. The current user comes from the
+login session (or tenant() in commands), and ORM queries against user-owned
+models are filtered to that user automatically with loader criteria, so
+routes and model helpers need no explicit filters and every aggregate only
+touches the current user's rows. Without a user, such queries fail unless
+they opt in to every user's rows with execution_options(all_tenants=True). New rows are stamped with the current
+user, and data version stamps are kept per user, so one user's writes never
+invalidate another user's caches.
+"""
+
+from contextlib import contextmanager
+from flask import g, has_app_context, session
+from sqlalchemy import event, false
+from sqlalchemy.orm import Session, declared_attr, with_loader_criteria
+from app import db
+
+
+def current_user_id():
+    """Return the id of the user whose data is in scope, or None."""
+    if not has_app_context():
+        return None
+    return g.get('user_id')
+
+
+@contextmanager
+def tenant(user_id):
+    """
+    Scope queries and new rows to user_id within the block.
+
+    Example:
+        with tenant(user.id):
+            Expense.get_monthly_total()
+    """
+    previous = g.get('user_id')
+    g.user_id = user_id
+    try:
+        yield
+    finally:
+        g.user_id = previous
+
+
+def tenant_key(name, user_id=None):
+    """
+    Data version stamp name of a dataset for one user, e.g. 'expenses:42'.
+
+    Args:
+        name (str): Dataset name
+        user_id (int): Owner; defaults to the current user. Without a user
+            the plain dataset name is returned.
+    """
+    if user_id is None:
+        user_id = current_user_id()
+    return name if user_id is None else f'{name}:{user_id}'
+
+
+def split_key(key):
+    """Split a stamp name from tenant_key() into (dataset name, user id or None)."""
+    name, _, user_id = key.partition(':')
+    return name, int(user_id) if user_id else None
+
+
+class TenantScoped:
+    """Mixin for models whose rows belong to one user."""
+
+    @declared_attr
+    def user_id(cls):
+        return db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _scope_to_tenant(orm_execute_state):
+    """
+    Restrict ORM statements on user-owned models to the current user.
+
+    Relationship and column loads are left alone, since they start from rows
+    that were already scoped. Pass execution_options(all_tenants=True) to
+    opt out, e.g. for maintenance commands.
+
+    Without a current user the check fails closed: a statement that selects
+    user-owned rows raises RuntimeError, and user-owned tables it only joins
+    or nests match no rows.
+
+    Raises:
+        RuntimeError: If no user is in scope and the statement reads or
+            writes user-owned models
+    """
+    state = orm_execute_state
+    if state.is_column_load or state.is_relationship_load:
+        return
+    if not (state.is_select or state.is_update or state.is_delete):
+        return
+    if state.execution_options.get('all_tenants'):
+        return
+
+    user_id = current_user_id()
+    if user_id is None:
+        scoped = [mapper.class_.__name__ for mapper in state.all_mappers if issubclass(mapper.class_, TenantScoped)]
+        if scoped:
+            raise RuntimeError(
+                f"No user in scope for a query on {', '.join(scoped)}; "
+                "use tenant(user_id), or execution_options(all_tenants=True) to read every user's rows"
+            )
+        criteria = lambda cls: false()
+    else:
+        criteria = lambda cls: cls.user_id == user_id
+    state.statement = state.statement.options(with_loader_criteria(
+        TenantScoped,
+        criteria,
+        include_aliases=True
+    ))
+
+
+@event.listens_for(TenantScoped, 'init', propagate=True)
+def _stamp_tenant(target, args, kwargs):
+    """Assign new user-owned objects to the current user unless given one."""
+    if 'user_id' not in kwargs:
+        target.user_id = current_user_id()
+
+
+def init_app(app):
+    """Take the current user from the login session on every request."""
+
+    @app.before_request
+    def load_tenant():
+        g.user_id = session.get('user_id')
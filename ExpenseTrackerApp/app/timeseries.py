@@ -0,0 +1,165 @@
+"""
+Spending Time Series for Flask Expense Tracker
+
+Buckets expense sums and counts by day, ISO week (Monday start) or month
+with one GROUP BY over a dialect-appropriate date truncation, then fills
+empty buckets with zeros and optionally adds a rolling average.
+"""
+
+from collections import deque
+from datetime import date, timedelta
+from app import db
+from app.models.expense import Expense
+from app.models.rollup import ExpenseRollup
+from app.money import cents_to_float
+from app.replica import use_replica
+
+TIMESERIES_BUCKETS = ('day', 'week', 'month')
+
+# Upper bound on buckets per response, so one request cannot build a huge series
+MAX_BUCKETS = 3700
+
+
+def bucket_start(day, bucket):
+    """Return the first day of the bucket containing day."""
+    if bucket == 'week':
+        return day - timedelta(days=day.weekday())
+    if bucket == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def next_bucket(start, bucket):
+    """Return the first day of the bucket after the one starting at start."""
+    if bucket == 'week':
+        return start + timedelta(days=7)
+    if bucket == 'month':
+        return date(start.year + start.month // 12, start.month % 12 + 1, 1)
+    return start + timedelta(days=1)
+
+
+def bucket_count(start, end, bucket):
+    """Number of buckets needed to cover start..end."""
+    first, last = bucket_start(start, bucket), bucket_start(end, bucket)
+    if bucket == 'month':
+        return (last.year - first.year) * 12 + last.month - first.month + 1
+    return (last - first).days // (7 if bucket == 'week' else 1) + 1
+
+
+def _truncate(column, bucket, dialect):
+    """SQL expression truncating a DATE column to the start of its bucket."""
+    if bucket == 'day':
+        return column
+    if dialect == 'sqlite':
+        if bucket == 'week':
+            return db.func.date(column, 'weekday 0', '-6 days')
+        return db.func.strftime('%Y-%m-01', column)
+    if dialect in ('mysql', 'mariadb'):
+        if bucket == 'week':
+            return db.func.subdate(column, db.func.weekday(column))
+        return db.func.date_format(column, '%Y-%m-01')
+    # PostgreSQL and others with date_trunc
+    return db.cast(db.func.date_trunc(bucket, column), db.Date)
+
+
+def _as_date(value):
+    """Normalize a bucket key returned by the driver (date, datetime or string)."""
+    if isinstance(value, date):
+        return date(value.year, value.month, value.day)
+    return date.fromisoformat(str(value)[:10])
+
+
+def _month_totals(start, end, category_id):
+    """Per-month sums from the rollup, for ranges made of whole months."""
+    query = db.session.query(
+        ExpenseRollup.year,
+        ExpenseRollup.month,
+        db.func.sum(ExpenseRollup.total_cents),
+        db.func.sum(ExpenseRollup.count)
+    ).filter(
+        ExpenseRollup.year * 100 + ExpenseRollup.month >= start.year * 100 + start.month,
+        ExpenseRollup.year * 100 + ExpenseRollup.month <= end.year * 100 + end.month
+    ).group_by(ExpenseRollup.year, ExpenseRollup.month)
+
+    if category_id:
+        query = query.filter(ExpenseRollup.category_id == category_id)
+
+    return {date(year, month, 1): (total, count) for year, month, total, count in query}
+
+
+def _bucket_totals(start, end, bucket, category_id):
+    """Per-bucket sums from one GROUP BY over the expenses table."""
+    dialect = db.session.get_bind(Expense).dialect.name
+    key = _truncate(Expense.date, bucket, dialect).label('bucket')
+    query = db.session.query(
+        key,
+        db.func.sum(Expense.amount_cents),
+        db.func.count(Expense.id)
+    ).filter(
+        Expense.date >= start,
+        Expense.date <= end
+    ).group_by(key)
+
+    if category_id:
+        query = query.filter(Expense.category_id == category_id)
+
+    return {_as_date(bucket_key): (total, count) for bucket_key, total, count in query}
+
+
+def get_timeseries(start, end, bucket='day', category_id=None, window=None):
+    """
+    Get spending per bucket between two dates, inclusive.
+
+    Whole-month ranges bucketed by month are read from the monthly rollup;
+    everything else is one GROUP BY over the expenses in range. Buckets with
+    no expenses are included with zero totals.
+
+    Args:
+        start (date): First day of the range
+        end (date): Last day of the range
+        bucket (str): 'day', 'week' or 'month'
+        category_id (int): Only count this category
+        window (int): If set, add a trailing rolling average of totals over
+            this many buckets
+    Returns:
+        list: Dicts with start, total, total_cents, count (and rolling_avg)
+    Raises:
+        ValueError: If the bucket is unknown, the range is inverted or too long
+    """
+    if bucket not in TIMESERIES_BUCKETS:
+        raise ValueError(f"Unsupported bucket: {bucket}")
+    if start > end:
+        raise ValueError("'from' must not be after 'to'")
+    if bucket_count(start, end, bucket) > MAX_BUCKETS:
+        raise ValueError(f"Range too long: more than {MAX_BUCKETS} {bucket} buckets")
+    if window is not None and window < 1:
+        raise ValueError("'window' must be a positive number of buckets")
+
+    whole_months = start.day == 1 and next_bucket(end, 'day').day == 1
+    with use_replica():
+        if bucket == 'month' and whole_months:
+            totals = _month_totals(start, end, category_id)
+        else:
+            totals = _bucket_totals(start, end, bucket, category_id)
+
+    series = []
+    recent = deque()
+    running = 0.0
+    current = bucket_start(start, bucket)
+    while current <= end:
+        cents, count = totals.get(current, (0, 0))
+        point = {
+            'start': current.isoformat(),
+            'total': cents_to_float(cents),
+            'total_cents': int(cents or 0),
+            'count': int(count or 0)
+        }
+        if window:
+            recent.append(point['total'])
+            running += point['total']
+            if len(recent) > window:
+                running -= recent.popleft()
+            point['rolling_avg'] = round(running / len(recent), 2)
+        series.append(point)
+        current = next_bucket(current, bucket)
+    return series
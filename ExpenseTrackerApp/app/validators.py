@@ -0,0 +1,158 @@
+"""
+Input Validation for Flask Expense Tracker
+
+Validation rules for expense input, shared by the web forms, bulk import
+and the JSON API so every entry point accepts exactly the same data.
+"""
+
+from datetime import datetime, date
+from decimal import Decimal, InvalidOperation
+
+MAX_AMOUNT = Decimal('999999.99')
+CENT = Decimal('0.01')
+
+
+def _clean_str(value):
+    """Return value as a stripped string ('' for None)."""
+    if value is None:
+        return ''
+    return str(value).strip()
+
+
+def validate_expense(data, get_category=None):
+    """
+    Validate raw expense input.
+
+    Args:
+        data (Mapping): Raw fields: description, amount, category_id, date, notes
+        get_category (callable): Returns the category for an id, or None;
+            defaults to the process-wide category registry
+    Returns:
+        tuple: (values, errors) where values holds the cleaned description,
+            amount (Decimal in whole cents), category_id, date and notes,
+            and errors is a list of messages (empty when the input is valid)
+    """
+    if get_category is None:
+        from app.models.category import category_registry
+        get_category = category_registry.get
+
+    errors = []
+    values = {}
+
+    description = _clean_str(data.get('description'))
+    if not description:
+        errors.append('Description is required')
+    elif len(description) > 255:
+        errors.append('Description must be less than 255 characters')
+    values['description'] = description
+
+    amount_str = _clean_str(data.get('amount'))
+    if not amount_str:
+        errors.append('Amount is required')
+    else:
+        try:
+            amount = Decimal(amount_str)
+            if amount <= 0:
+                errors.append('Amount must be positive')
+            elif amount > MAX_AMOUNT:
+                errors.append('Amount is too large')
+            elif amount != amount.quantize(CENT):
+                errors.append('Amount must have at most 2 decimal places')
+            else:
+                values['amount'] = amount.quantize(CENT)
+        except (InvalidOperation, ValueError):
+            errors.append('Invalid amount format')
+
+    try:
+        category_id = int(_clean_str(data.get('category_id')) or 0)
+    except ValueError:
+        category_id = 0
+    if not category_id:
+        errors.append('Category is required')
+    else:
+        category = get_category(category_id)
+        if not category or not category.is_active:
+            errors.append('Invalid category selected')
+    values['category_id'] = category_id
+
+    # Validate date
+    raw_date = data.get('date')
+    expense_date = date.today()
+    if isinstance(raw_date, date):
+        expense_date = raw_date
+    elif _clean_str(raw_date):
+        try:
+            expense_date = datetime.strptime(_clean_str(raw_date), '%Y-%m-%d').date()
+        except ValueError:
+            errors.append('Invalid date format')
+    values['date'] = expense_date
+
+    values['notes'] = _clean_str(data.get('notes')) or None
+
+    return values, errors
+
+
+def validate_recurring(data, get_category=None):
+    """
+    Validate raw recurring expense input.
+
+    Accepts the expense fields (with start_date in place of date) plus
+    frequency and an optional end_date.
+
+    Returns:
+        tuple: (values, errors) as for validate_expense, with start_date,
+            end_date and frequency in place of date
+    """
+    from app.models.recurring import RECURRING_FREQUENCIES
+
+    fields = dict(data)
+    fields['date'] = data.get('start_date')
+    values, errors = validate_expense(fields, get_category)
+    values['start_date'] = values.pop('date')
+
+    frequency = _clean_str(data.get('frequency')).lower()
+    if frequency not in RECURRING_FREQUENCIES:
+        errors.append(f"Frequency must be one of: {', '.join(RECURRING_FREQUENCIES)}")
+    values['frequency'] = frequency
+
+    values['end_date'] = None
+    raw_end = data.get('end_date')
+    if isinstance(raw_end, date):
+        values['end_date'] = raw_end
+    elif _clean_str(raw_end):
+        try:
+            values['end_date'] = datetime.strptime(_clean_str(raw_end), '%Y-%m-%d').date()
+        except ValueError:
+            errors.append('Invalid end date format')
+    if values['end_date'] and values['end_date'] < values['start_date']:
+        errors.append('End date must not be before the start date')
+
+    return values, errors
+
+
+def validate_registration(data):
+    """
+    Validate raw sign-up input.
+
+    Args:
+        data (Mapping): Raw fields: username, password, confirm_password
+    Returns:
+        tuple: (values, errors) with the cleaned username and password
+    """
+    errors = []
+    username = _clean_str(data.get('username'))
+    password = data.get('password') or ''
+
+    if not username:
+        errors.append('Username is required')
+    elif len(username) < 3 or len(username) > 80:
+        errors.append('Username must be between 3 and 80 characters')
+    elif not all(char.isalnum() or char in '_.-' for char in username):
+        errors.append('Username may only contain letters, digits, "_", "." and "-"')
+
+    if len(password) < 8:
+        errors.append('Password must be at least 8 characters')
+    elif password != (data.get('confirm_password') or ''):
+        errors.append('Passwords do not match')
+
+    return {'username': username, 'password': password}, errors
@@ -0,0 +1,6 @@
+"""
+Benchmarks for Flask Expense Tracker
+
+Synthetic data generation and latency/query/memory benchmarks for the hot
+routes. Run with: python -m benchmarks.run --help
+"""
@@ -0,0 +1,181 @@
+"""
+Synthetic Data Generator for Flask Expense Tracker
+
+Fills the database with categories and expenses whose dates and amounts
+look like real spending: more purchases on weekends and around paydays,
+log-normally distributed amounts with a per-category typical price, and
+occasional large outliers. All data belongs to one benchmark user. Rows
+are inserted in batches with executemany, then the monthly rollups and data
+versions are brought in step.
+"""
+
+import math
+import random
+import time
+from itertools import accumulate
+from datetime import date, datetime, timedelta
+from app import db
+from app.models import User, Category, Expense, ExpenseRollup, DataVersion
+from app.tenancy import tenant, tenant_key
+
+BENCHMARK_USER = 'benchmark'
+BENCHMARK_PASSWORD = 'benchmark-password'
+
+# (typical amount, spread) of the log-normal amount distribution per default category
+CATEGORY_PROFILES = {
+    'Food & Dining': (18, 0.7),
+    'Transportation': (25, 0.8),
+    'Entertainment': (30, 0.9),
+    'Shopping': (45, 1.0),
+    'Bills & Utilities': (90, 0.5),
+    'Healthcare': (60, 1.1),
+    'Education': (40, 1.0),
+    'Travel': (220, 1.0),
+    'Others': (20, 1.2)
+}
+
+# Relative share of expenses per default category
+CATEGORY_WEIGHTS = {
+    'Food & Dining': 30,
+    'Transportation': 15,
+    'Entertainment': 8,
+    'Shopping': 12,
+    'Bills & Utilities': 6,
+    'Healthcare': 4,
+    'Education': 3,
+    'Travel': 2,
+    'Others': 5
+}
+
+DESCRIPTIONS = {
+    'Food & Dining': ['Groceries', 'Lunch', 'Coffee', 'Dinner out', 'Takeaway pizza', 'Bakery', 'Supermarket run'],
+    'Transportation': ['Fuel', 'Bus ticket', 'Train fare', 'Taxi ride', 'Parking', 'Car wash', 'Metro card top-up'],
+    'Entertainment': ['Cinema tickets', 'Concert', 'Streaming subscription', 'Video game', 'Museum entry'],
+    'Shopping': ['Clothes', 'Shoes', 'Electronics', 'Home decor', 'Gift', 'Kitchenware'],
+    'Bills & Utilities': ['Electricity bill', 'Water bill', 'Internet', 'Mobile plan', 'Gas bill'],
+    'Healthcare': ['Pharmacy', 'Doctor visit', 'Dentist', 'Vitamins', 'Eye exam'],
+    'Education': ['Books', 'Online course', 'Workshop', 'Stationery', 'Tuition'],
+    'Travel': ['Flight', 'Hotel', 'Car rental', 'Travel insurance', 'Tour booking'],
+    'Others': ['Miscellaneous', 'Donation', 'Repair', 'Pet supplies', 'Haircut']
+}
+
+NOTES = ['', '', '', '', 'card', 'cash', 'shared with friends', 'monthly', 'reimbursable', 'discounted']
+
+# Relative purchase frequency by weekday, Monday first
+WEEKDAY_WEIGHTS = (0.9, 0.9, 1.0, 1.0, 1.3, 1.6, 1.2)
+
+
+def _date_sampler(rng, years):
+    """Return a function drawing expense dates from the last `years` years."""
+    end = date.today()
+    start = end - timedelta(days=int(365 * years))
+    days = [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+    weights = []
+    for day in days:
+        weight = WEEKDAY_WEIGHTS[day.weekday()]
+        if day.day in (1, 2, 15, 16):
+            weight *= 1.4  # payday bump
+        weights.append(weight)
+    cumulative = list(accumulate(weights))
+    return lambda: rng.choices(days, cum_weights=cumulative)[0]
+
+
+def _amount_cents(rng, typical, spread):
+    """Draw a log-normal amount in cents around typical, with rare large outliers."""
+    value = rng.lognormvariate(math.log(typical), spread)
+    if rng.random() < 0.005:
+        value *= rng.uniform(5, 20)
+    return int(round(min(max(value, 0.5), 999999.99) * 100))
+
+
+def benchmark_user():
+    """Return the user owning the benchmark data, creating it if needed."""
+    user = User.query.filter_by(username=BENCHMARK_USER).first()
+    if user is None:
+        user = User.create(BENCHMARK_USER, BENCHMARK_PASSWORD)
+    return user
+
+
+def create_categories(count):
+    """
+    Ensure the current user has at least `count` categories, topping up the defaults.
+
+    Returns:
+        list: All the user's Category rows
+    """
+    Category.create_default_categories()
+    existing = Category.query.count()
+    for number in range(existing + 1, count + 1):
+        db.session.add(Category(
+            name=f'Category {number}',
+            description=f'Generated category {number}',
+            color=f'#{(number * 2654435761) & 0xFFFFFF:06X}',
+            icon='🏷️'
+        ))
+    db.session.commit()
+    return Category.query.order_by(Category.id).all()
+
+
+def generate(expenses=100000, categories=9, years=3, batch_size=5000, seed=42, progress=None):
+    """
+    Insert synthetic expenses for the benchmark user.
+
+    Args:
+        expenses (int): Number of expenses to insert
+        categories (int): Minimum number of categories
+        years (int): How many years back the dates reach
+        batch_size (int): Rows per executemany insert and commit
+        seed (int): Random seed, so runs are reproducible
+        progress (callable): Called with the running row count after each batch
+    Returns:
+        dict: Row counts and elapsed seconds
+    """
+    rng = random.Random(seed)
+    started = time.perf_counter()
+
+    user_id = benchmark_user().id
+    with tenant(user_id):
+        rows = create_categories(categories)
+    profiles = []
+    for category in rows:
+        typical, spread = CATEGORY_PROFILES.get(category.name, (rng.uniform(10, 120), rng.uniform(0.5, 1.1)))
+        words = DESCRIPTIONS.get(category.name, [f'{category.name} purchase', f'{category.name} service'])
+        profiles.append((category.id, typical, spread, words))
+    weights = [CATEGORY_WEIGHTS.get(category.name, 3) for category in rows]
+    next_date = _date_sampler(rng, years)
+
+    inserted = 0
+    while inserted < expenses:
+        size = min(batch_size, expenses - inserted)
+        batch = []
+        deltas = ExpenseRollup.new_deltas()
+        for _ in range(size):
+            category_id, typical, spread, words = rng.choices(profiles, weights=weights)[0]
+            day = next_date()
+            cents = _amount_cents(rng, typical, spread)
+            created = datetime.combine(day, datetime.min.time()) + timedelta(seconds=rng.randrange(86400))
+            batch.append({
+                'description': rng.choice(words),
+                'amount_cents': cents,
+                'date': day,
+                'notes': rng.choice(NOTES) or None,
+                'category_id': category_id,
+                'user_id': user_id,
+                'created_at': created,
+                'updated_at': created
+            })
+            ExpenseRollup.add_delta(deltas, day, category_id, cents, 1)
+
+        db.session.execute(Expense.__table__.insert(), batch)
+        ExpenseRollup.apply_deltas(db.session.connection(), deltas)
+        DataVersion.bump_in_session(db.session, {tenant_key('expenses', user_id)})
+        db.session.commit()
+        inserted += size
+        if progress:
+            progress(inserted)
+
+    return {
+        'categories': len(rows),
+        'expenses': inserted,
+        'elapsed_seconds': round(time.perf_counter() - started, 3)
+    }
@@ -0,0 +1,290 @@
+"""
+Benchmark Suite for Flask Expense Tracker
+
+Drives the hot routes through the Flask test client and reports latency
+percentiles, queries per request and peak Python memory per scenario, plus
+the time a fresh interpreter takes to import the app and run the factory.
+Results are written as JSON so runs can be compared:
+
+    python -m benchmarks.run --generate 1000000
+    python -m benchmarks.run -o after.json --compare before.json
+
+The database comes from BENCHMARK_DATABASE_URL (see config.BenchmarkConfig).
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import date, datetime
+from app import create_app, db
+from app.instrumentation import count_queries
+from app.models import Category, Expense
+from app.pagination import encode_cursor
+from app.tenancy import tenant
+from benchmarks import datagen
+
+# Keyset and offset pages this deep are used for the "deep page" scenarios
+DEEP_PAGE = 500
+
+
+# Times `import app` plus the app factory in a fresh interpreter
+STARTUP_SNIPPET = (
+    "import time; started = time.perf_counter(); "
+    "from app import create_app; create_app('benchmark'); "
+    "print(time.perf_counter() - started)"
+)
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(pct / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+class Scenario:
+    """
+    One benchmarked request.
+
+    Attributes:
+        name (str): Scenario name used in the results
+        method (str): HTTP method
+        url (str): Request URL, including query string
+        data (callable): Returns form data for each POST, or None
+    """
+
+    def __init__(self, name, url, method='GET', data=None):
+        self.name = name
+        self.url = url
+        self.method = method
+        self.data = data
+
+    def request(self, client):
+        """Issue the request and return the response."""
+        if self.method == 'POST':
+            return client.post(self.url, data=self.data())
+        return client.get(self.url)
+
+
+def build_scenarios(app, per_page, user_id):
+    """Build the scenario list from what is in the benchmark user's data."""
+    with app.app_context(), tenant(user_id):
+        category = Category.query.order_by(Category.id).first()
+        category_id = category.id if category else 1
+        total = db.session.query(db.func.count(Expense.id)).scalar()
+        deep_offset = min(DEEP_PAGE * per_page, max(total - per_page, 0))
+        deep_page = deep_offset // per_page + 1
+        boundary = Expense.query.order_by(
+            Expense.date.desc(), Expense.created_at.desc(), Expense.id.desc()
+        ).offset(deep_offset).first()
+        cursor = encode_cursor(Expense.sort_key(boundary)) if boundary else ''
+
+    counter = iter(range(sys.maxsize))
+
+    def expense_form():
+        return {
+            'description': f'Benchmark expense {next(counter)}',
+            'amount': '12.34',
+            'category_id': str(category_id),
+            'date': date.today().isoformat(),
+            'notes': 'benchmark'
+        }
+
+    return [
+        Scenario('index', '/'),
+        Scenario('expenses', '/expenses'),
+        Scenario('expenses_search', '/expenses?search=coffee'),
+        Scenario('expenses_category', f'/expenses?category={category_id}'),
+        Scenario('expenses_search_category', f'/expenses?search=groceries&category={category_id}'),
+        Scenario('expenses_deep_keyset', f'/expenses?after={cursor}'),
+        Scenario('expenses_deep_offset', f'/expenses?page={deep_page}'),
+        Scenario('api_expenses_summary', '/api/expenses/summary'),
+        Scenario('add_expense', '/add_expense', method='POST', data=expense_form)
+    ]
+
+
+def run_scenario(client, scenario, iterations, warmup):
+    """
+    Time one scenario.
+
+    Latency and query counts come from the timed iterations; peak memory
+    is measured in a separate pass under tracemalloc, which would otherwise
+    distort the timings.
+    """
+    for _ in range(warmup):
+        scenario.request(client)
+
+    timings = []
+    queries = []
+    statuses = set()
+    for _ in range(iterations):
+        with count_queries(client.application) as counter:
+            started = time.perf_counter()
+            response = scenario.request(client)
+            timings.append((time.perf_counter() - started) * 1000)
+        queries.append(counter.count)
+        statuses.add(response.status_code)
+
+    tracemalloc.start()
+    for _ in range(max(iterations // 10, 1)):
+        tracemalloc.reset_peak()
+        scenario.request(client)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings.sort()
+    return {
+        'url': scenario.url,
+        'method': scenario.method,
+        'iterations': iterations,
+        'status_codes': sorted(statuses),
+        'mean_ms': round(sum(timings) / len(timings), 3),
+        'min_ms': round(timings[0], 3),
+        'p50_ms': round(percentile(timings, 50), 3),
+        'p90_ms': round(percentile(timings, 90), 3),
+        'p95_ms': round(percentile(timings, 95), 3),
+        'p99_ms': round(percentile(timings, 99), 3),
+        'max_ms': round(timings[-1], 3),
+        'queries_per_request': round(sum(queries) / len(queries), 2),
+        'max_queries': max(queries),
+        'peak_memory_kb': round(peak / 1024, 1)
+    }
+
+
+def measure_startup(runs):
+    """
+    Time import plus create_app in fresh interpreters, as a worker boot would.
+
+    Returns:
+        dict: Best, median and worst startup time over the runs
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    timings = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, '-c', STARTUP_SNIPPET],
+            cwd=root, check=True, capture_output=True, text=True
+        ).stdout
+        timings.append(float(output.strip().splitlines()[-1]) * 1000)
+    timings.sort()
+    return {
+        'runs': runs,
+        'min_ms': round(timings[0], 3),
+        'p50_ms': round(percentile(timings, 50), 3),
+        'max_ms': round(timings[-1], 3)
+    }
+
+
+def compare(results, baseline):
+    """Print p50/p95 and query count changes against a baseline run."""
+    if 'startup' in results and 'startup' in baseline:
+        old, new = baseline['startup']['p50_ms'], results['startup']['p50_ms']
+        print(f"\nstartup p50: {old:.1f}ms -> {new:.1f}ms ({(new - old) / old * 100:+.0f}%)")
+
+    print(f"\n{'scenario':28} {'p50 ms':>18} {'p95 ms':>18} {'queries':>12}")
+    for name, current in results['scenarios'].items():
+        before = baseline.get('scenarios', {}).get(name)
+        if not before:
+            print(f'{name:28} (not in baseline)')
+            continue
+
+        def change(key):
+            old, new = before[key], current[key]
+            pct = (new - old) / old * 100 if old else 0.0
+            return f'{new:.2f} ({pct:+.0f}%)'
+
+        print(f"{name:28} {change('p50_ms'):>18} {change('p95_ms'):>18} "
+              f"{before['queries_per_request']:>5.1f}->{current['queries_per_request']:<5.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the hot routes of the expense tracker.')
+    parser.add_argument('--generate', type=int, metavar='N', help='Insert N synthetic expenses first')
+    parser.add_argument('--categories', type=int, default=9, help='Minimum categories when generating')
+    parser.add_argument('--years', type=int, default=3, help='Years of history when generating')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed when generating')
+    parser.add_argument('--iterations', type=int, default=50, help='Timed requests per scenario')
+    parser.add_argument('--warmup', type=int, default=5, help='Untimed requests per scenario')
+    parser.add_argument('--startup-runs', type=int, default=5, help='Fresh-interpreter startups to time (0 to skip)')
+    parser.add_argument('--only', nargs='*', metavar='SCENARIO', help='Run only these scenarios')
+    parser.add_argument('--output', '-o', default='benchmark-results.json', help='Where to write the JSON results')
+    parser.add_argument('--compare', metavar='FILE', help='Baseline results JSON to compare against')
+    args = parser.parse_args(argv)
+
+    app = create_app('benchmark')
+
+    if args.generate:
+        with app.app_context():
+            db.create_all(bind_key=None)
+            print(f'Generating {args.generate} expenses...')
+            summary = datagen.generate(
+                expenses=args.generate,
+                categories=args.categories,
+                years=args.years,
+                seed=args.seed,
+                progress=lambda n: print(f'  {n} rows', end='\r')
+            )
+            print(f"\n✅ Generated {summary['expenses']} expenses in {summary['elapsed_seconds']}s")
+
+    with app.app_context():
+        if not db.inspect(db.engine).has_table(Expense.__tablename__):
+            parser.error('The benchmark database has no schema; run with --generate N first')
+        user_id = datagen.benchmark_user().id
+        with tenant(user_id):
+            expense_count = db.session.query(db.func.count(Expense.id)).scalar()
+            category_count = Category.query.count()
+        database = db.engine.url.render_as_string(hide_password=True)
+    if not expense_count:
+        parser.error('The benchmark database is empty; run with --generate N first')
+
+    scenarios = build_scenarios(app, app.config.get('EXPENSES_PER_PAGE', 20), user_id)
+    if args.only:
+        scenarios = [scenario for scenario in scenarios if scenario.name in args.only]
+
+    results = {
+        'meta': {
+            'timestamp': datetime.utcnow().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'database': database,
+            'expenses': expense_count,
+            'categories': category_count,
+            'iterations': args.iterations,
+            'warmup': args.warmup
+        },
+        'scenarios': {}
+    }
+
+    if args.startup_runs:
+        results['startup'] = measure_startup(args.startup_runs)
+        print(f"{'startup':28} p50 {results['startup']['p50_ms']:8.2f}ms  "
+              f"min {results['startup']['min_ms']:8.2f}ms  max {results['startup']['max_ms']:8.2f}ms")
+
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['user_id'] = user_id
+        session['username'] = datagen.BENCHMARK_USER
+    for scenario in scenarios:
+        stats = run_scenario(client, scenario, args.iterations, args.warmup)
+        results['scenarios'][scenario.name] = stats
+        print(f"{scenario.name:28} p50 {stats['p50_ms']:8.2f}ms  p95 {stats['p95_ms']:8.2f}ms  "
+              f"p99 {stats['p99_ms']:8.2f}ms  {stats['queries_per_request']:5.1f} queries  "
+              f"{stats['peak_memory_kb']:8.1f}KB peak")
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f'✅ Results written to {os.path.abspath(args.output)}')
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            compare(results, json.load(f))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,196 @@
+"""
+Worker Class Throughput Benchmark for Flask Expense Tracker
+
+Starts gunicorn with gunicorn.conf.py once per worker setup against the
+benchmark database, logs in as the benchmark user and has concurrent
+clients request the read-only benchmark routes for a fixed time, reporting
+requests per second and latency percentiles:
+
+    python -m benchmarks.run --generate 100000      # once, to create the data
+    python -m benchmarks.workers --clients 32 --duration 20
+
+gevent must be installed for the gevent setup; setups whose worker class
+cannot be imported are skipped.
+"""
+
+import argparse
+import http.cookiejar
+import importlib.util
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from datetime import datetime
+from app import create_app
+from benchmarks import datagen
+from benchmarks.run import build_scenarios, percentile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# name -> (gunicorn worker class, threads per worker, module the class needs)
+WORKER_SETUPS = {
+    'sync': ('sync', 1, None),
+    'gthread': ('gthread', 4, None),
+    'gevent': ('gevent', 1, 'gevent')
+}
+
+
+def _free_port():
+    """Ask the OS for an unused local port."""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(worker_class, threads, workers, port):
+    """Start gunicorn in the background and wait until it answers."""
+    env = dict(
+        os.environ,
+        FLASK_CONFIG='benchmark',
+        GUNICORN_BIND=f'127.0.0.1:{port}',
+        GUNICORN_WORKER_CLASS=worker_class,
+        GUNICORN_THREADS=str(threads),
+        WEB_CONCURRENCY=str(workers),
+        GUNICORN_ACCESS_LOG='/dev/null'
+    )
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app'],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f'http://127.0.0.1:{port}/login', timeout=1).close()
+            return process
+        except OSError:
+            if process.poll() is not None:
+                break
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f'gunicorn ({worker_class}) did not start')
+
+
+def _login(base_url):
+    """Log in as the benchmark user and return an opener carrying the session cookie."""
+    opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+    form = urllib.parse.urlencode({
+        'username': datagen.BENCHMARK_USER,
+        'password': datagen.BENCHMARK_PASSWORD
+    }).encode('ascii')
+    opener.open(f'{base_url}/login', data=form, timeout=10).close()
+    return opener
+
+
+def drive_load(base_url, urls, clients, duration):
+    """
+    Request urls round-robin from concurrent clients for duration seconds.
+
+    Returns:
+        dict: Requests per second, latency percentiles and error count
+    """
+    deadline = time.monotonic() + duration
+    timings = []
+    errors = []
+    lock = threading.Lock()
+
+    def client(offset):
+        opener = _login(base_url)
+        own_timings, own_errors = [], 0
+        position = offset
+        while time.monotonic() < deadline:
+            url = urls[position % len(urls)]
+            position += 1
+            started = time.perf_counter()
+            try:
+                with opener.open(base_url + url, timeout=30) as response:
+                    response.read()
+            except (urllib.error.URLError, OSError):
+                own_errors += 1
+                continue
+            own_timings.append((time.perf_counter() - started) * 1000)
+        with lock:
+            timings.extend(own_timings)
+            errors.append(own_errors)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    timings.sort()
+    return {
+        'requests': len(timings),
+        'errors': sum(errors),
+        'requests_per_second': round(len(timings) / elapsed, 1),
+        'p50_ms': round(percentile(timings, 50), 2),
+        'p95_ms': round(percentile(timings, 95), 2),
+        'p99_ms': round(percentile(timings, 99), 2)
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare gunicorn worker classes on the benchmark routes.')
+    parser.add_argument('--setups', nargs='*', choices=list(WORKER_SETUPS), default=list(WORKER_SETUPS),
+                        help='Worker setups to run')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Worker processes per setup')
+    parser.add_argument('--clients', type=int, default=32, help='Concurrent clients')
+    parser.add_argument('--duration', type=float, default=20, help='Seconds of load per setup')
+    parser.add_argument('--output', '-o', default='worker-results.json', help='Where to write the JSON results')
+    args = parser.parse_args(argv)
+
+    app = create_app('benchmark')
+    with app.app_context():
+        user_id = datagen.benchmark_user().id
+    urls = [
+        scenario.url for scenario in build_scenarios(app, app.config.get('EXPENSES_PER_PAGE', 20), user_id)
+        if scenario.method == 'GET'
+    ]
+
+    results = {
+        'meta': {
+            'timestamp': datetime.utcnow().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'workers': args.workers,
+            'clients': args.clients,
+            'duration_seconds': args.duration,
+            'urls': urls
+        },
+        'setups': {}
+    }
+
+    for name in args.setups:
+        worker_class, threads, requirement = WORKER_SETUPS[name]
+        if requirement and importlib.util.find_spec(requirement) is None:
+            print(f'{name:10} skipped: {requirement} is not installed')
+            continue
+        port = _free_port()
+        process = start_server(worker_class, threads, args.workers, port)
+        try:
+            stats = drive_load(f'http://127.0.0.1:{port}', urls, args.clients, args.duration)
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+        stats.update(worker_class=worker_class, threads=threads)
+        results['setups'][name] = stats
+        print(f"{name:10} {stats['requests_per_second']:8.1f} req/s  p50 {stats['p50_ms']:8.2f}ms  "
+              f"p95 {stats['p95_ms']:8.2f}ms  p99 {stats['p99_ms']:8.2f}ms  {stats['errors']} errors")
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f'✅ Results written to {os.path.abspath(args.output)}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Gunicorn Configuration for Flask Expense Tracker
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Everything deployment specific comes from the environment:
+
+    PORT                          Port to listen on (default 8000)
+    GUNICORN_BIND                 Full bind address, overrides PORT
+    WEB_CONCURRENCY               Worker processes (default 2 x CPUs + 1)
+    GUNICORN_THREADS              Threads per worker (default 1)
+    GUNICORN_WORKER_CLASS         sync, gthread or gevent (default: sync, or
+                                  gthread when GUNICORN_THREADS > 1)
+    GUNICORN_WORKER_CONNECTIONS   Concurrent requests per gevent worker (default 100)
+    GUNICORN_TIMEOUT              Seconds before a silent worker is restarted (default 30)
+    GUNICORN_MAX_REQUESTS         Requests before a worker is replaced (default 1000, 0 = never)
+    GUNICORN_PRELOAD              Load the app once in the master (default true)
+
+The app is imported once in the master and the workers are forked from it,
+so they share its code and module data copy-on-write; the master freezes
+the garbage collector's view of those objects before forking, so collections
+in the workers do not write to (and so copy) the shared pages. Each worker
+drops the database connections it inherited, so no pooled connection is
+ever used by two processes. See the README for how the worker classes
+compare on the benchmark routes.
+"""
+
+import gc
+import multiprocessing
+import os
+
+
+def _env_int(name, default):
+    """Read an integer setting from the environment."""
+    return int(os.environ.get(name) or default)
+
+
+bind = os.environ.get('GUNICORN_BIND') or f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = _env_int('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1)
+threads = _env_int('GUNICORN_THREADS', 1)
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS') or ('gthread' if threads > 1 else 'sync')
+worker_connections = _env_int('GUNICORN_WORKER_CONNECTIONS', 100)
+
+timeout = _env_int('GUNICORN_TIMEOUT', 30)
+graceful_timeout = timeout
+keepalive = 5
+# Recycling workers bounds slow memory growth; with preload a new worker is just a fork
+max_requests = _env_int('GUNICORN_MAX_REQUESTS', 1000)
+max_requests_jitter = max_requests // 10
+
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'true').lower() in ('1', 'true', 'yes', 'on')
+
+# Worker heartbeats go to a file; keep it in memory where /dev/shm exists (containers)
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+forwarded_allow_ips = os.environ.get('FORWARDED_ALLOW_IPS', '127.0.0.1')
+
+if worker_class == 'gevent':
+    # Patch before the app is preloaded, so the locks and sockets it creates
+    # at import time are cooperative in the workers
+    from gevent import monkey
+    monkey.patch_all()
+
+
+def when_ready(server):
+    """After the preloaded app is imported: move its objects out of GC tracking."""
+    if preload_app:
+        gc.collect()
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    """Drop the pooled connections the worker inherited from the master."""
+    from app import db
+    from wsgi import app
+
+    with app.app_context():
+        for engine in db.engines.values():
+            # close=False leaves the master's sockets alone and just forgets them here
+            engine.dispose(close=False)
@@ -3,9 +3,18 @@
 
 
 import os
+import time
+import click
+from sqlalchemy.exc import IntegrityError
 from flask.cli import FlaskGroup
 from app import create_app, db
-from app.models import Category, Expense
+from app.models import User, Category, Expense, ExpenseRollup, DataVersion, Budget, RecurringExpense
+from app.search import rebuild_index
+from app.importer import import_expenses as run_import, IMPORT_FORMATS
+from app.exporter import generate_export, EXPORT_FORMATS
+from app.recurring import materialize_recurring as run_materialize
+from app.tenancy import tenant, tenant_key
+from app.validators import validate_registration
 
 # Create Flask application
 app = create_app(os.getenv('FLASK_CONFIG') or 'default')
@@ -13,37 +22,353 @@ app = create_app(os.getenv('FLASK_CONFIG') or 'default')
 # Create CLI group
 cli = FlaskGroup(app)
 
+def _user_scope(username):
+    """Return a tenant() context for the named user, failing if it does not exist."""
+    user = User.query.filter_by(username=username).first()
+    if user is None:
+        raise click.ClickException(f'No user named {username}; create one with `flask create-user`')
+    return tenant(user.id)
+
 @app.cli.command()
 def init_db():
     """Initialize the database."""
     print("Creating database tables...")
-    db.create_all()
+    db.create_all(bind_key=None)
     print("✅ Database tables created")
-
-    print("Creating default categories...")
-    Category.create_default_categories()
-    print("✅ Default categories created")
-
-    print("🎉 Database initialization complete!")
+    print("🎉 Database initialization complete! Create a user with `flask create-user NAME`")
 
 @app.cli.command()
 def reset_db():
     """Reset the database."""
     print("Dropping all tables...")
-    db.drop_all()
+    db.drop_all(bind_key=None)
     print("Creating fresh tables...")
-    db.create_all()
-    print("Creating default categories...")
-    Category.create_default_categories()
+    db.create_all(bind_key=None)
     print("🎉 Database reset complete!")
 
+@app.cli.command()
+@click.argument('username')
+@click.password_option()
+def create_user(username, password):
+    """Create a user with the default categories."""
+    values, errors = validate_registration({
+        'username': username, 'password': password, 'confirm_password': password
+    })
+    if not errors and User.query.filter_by(username=values['username']).first():
+        errors.append('That username is taken')
+    if errors:
+        raise click.ClickException('; '.join(errors))
+    user = User.create(values['username'], values['password'])
+    print(f"✅ Created user {user.username}")
+
+def _columns(table_name):
+    """Return the column names a table has in the database."""
+    return {column['name'] for column in db.inspect(db.engine).get_columns(table_name)}
+
+def _require_tenancy():
+    """Fail unless `flask migrate-tenancy` has given the expenses table its user_id."""
+    if 'user_id' not in _columns('expenses'):
+        raise click.ClickException(
+            'This database predates per-user ownership; run `flask migrate-tenancy --owner NAME` first'
+        )
+
+def _recreate_for_tenancy(operations, connection, table):
+    """
+    Rebuild a reflected table with the model's tenancy schema.
+
+    Copies the columns the database has (a column the model gained later,
+    such as amount_cents, is added by its own migration), makes user_id
+    NOT NULL, and adds the model's foreign keys, per-user unique
+    constraints and user-leading indexes in place of the old indexes.
+    """
+    stored = db.Table(table.name, db.MetaData(), autoload_with=connection)
+    stored_foreign_keys = {
+        element.parent.name for constraint in stored.foreign_key_constraints for element in constraint.elements
+    }
+    model_indexes = {index.name for index in table.indexes}
+
+    with operations.batch_alter_table(table.name, recreate='always') as batch:
+        batch.alter_column('user_id', existing_type=db.Integer(), nullable=False)
+        for column in table.columns:
+            if column.name not in stored.c or column.name in stored_foreign_keys:
+                continue
+            for foreign_key in column.foreign_keys:
+                batch.create_foreign_key(
+                    f'fk_{table.name}_{column.name}',
+                    foreign_key.column.table.name,
+                    [column.name],
+                    [foreign_key.column.name],
+                    ondelete=foreign_key.ondelete
+                )
+        for constraint in table.constraints:
+            if isinstance(constraint, db.UniqueConstraint) and constraint.name:
+                batch.create_unique_constraint(constraint.name, [column.name for column in constraint.columns])
+        for index in stored.indexes:
+            if index.name not in model_indexes:
+                batch.drop_index(index.name)
+        for index in table.indexes:
+            if index.name not in {stored_index.name for stored_index in stored.indexes} and \
+                    all(column.name in stored.c for column in index.columns):
+                batch.create_index(index.name, [column.name for column in index.columns], unique=index.unique)
+
+@app.cli.command()
+@click.option('--owner', required=True, help='User to own the existing data (created if missing)')
+def migrate_tenancy(owner):
+    """Give an existing single-user database per-user ownership (one-off, idempotent)."""
+    from alembic.operations import Operations
+    from alembic.runtime.migration import MigrationContext
+
+    # New tables (users, budgets, recurring rules) are created with user_id already
+    db.create_all(bind_key=None)
+    user = User.query.filter_by(username=owner).first()
+    if user is None:
+        password = click.prompt(f'Password for new user {owner}', hide_input=True, confirmation_prompt=True)
+        values, errors = validate_registration({'username': owner, 'password': password, 'confirm_password': password})
+        if errors:
+            raise click.ClickException('; '.join(errors))
+        user = User(username=values['username'])
+        user.set_password(password)
+        db.session.add(user)
+        db.session.commit()
+
+    inspector = db.inspect(db.engine)
+    migrated = []
+    with db.engine.begin() as connection:
+        operations = Operations(MigrationContext.configure(connection))
+        for model in (Category, Expense, RecurringExpense, Budget):
+            table = model.__table__
+            columns = {column['name'] for column in inspector.get_columns(table.name)}
+            if 'user_id' in columns:
+                continue
+
+            print(f"Assigning {table.name} to {user.username}...")
+            connection.execute(db.text(f'ALTER TABLE {table.name} ADD COLUMN user_id INTEGER'))
+            if table.name == 'expenses' and 'recurring_id' not in columns:
+                connection.execute(db.text('ALTER TABLE expenses ADD COLUMN recurring_id INTEGER'))
+            # A bare table, so the model's onupdate (updated_at) is not applied
+            connection.execute(db.table(table.name, db.column('user_id')).update().values(user_id=user.id))
+            _recreate_for_tenancy(operations, connection, table)
+            migrated.append(table.name)
+
+        if migrated:
+            # Rollups are derived data: recreate the table (new key) and rebuild it below
+            ExpenseRollup.__table__.drop(connection, checkfirst=True)
+            ExpenseRollup.__table__.create(connection)
+
+    if not migrated:
+        print("✅ Data already has per-user ownership")
+        return
+
+    print("Rebuilding the search index...")
+    rebuild_index()
+    if 'amount_cents' in _columns('expenses'):
+        print("Rebuilding monthly expense rollups...")
+        ExpenseRollup.rebuild()
+    else:
+        print("Amounts are still stored as decimals; run `flask migrate-money-to-cents` next")
+    DataVersion.bump_in_session(db.session, {
+        tenant_key(name, user.id) for name in ('expenses', 'categories', 'budgets')
+    })
+    db.session.commit()
+    print(f"✅ Existing data now belongs to {user.username} ({', '.join(migrated)})")
+
+@app.cli.command()
+def rebuild_rollups():
+    """Rebuild the monthly expense rollups from scratch."""
+    print("Rebuilding monthly expense rollups...")
+    rows = ExpenseRollup.rebuild()
+    print(f"✅ Rebuilt {rows} rollup rows")
+
+@app.cli.command()
+def migrate_money_to_cents():
+    """Convert stored Numeric amounts to integer cents (one-off, idempotent; after migrate-tenancy)."""
+    _require_tenancy()
+    expense_columns = _columns('expenses')
+    rollup_columns = _columns('expense_rollups')
+
+    if 'amount' not in expense_columns and 'total' not in rollup_columns:
+        print("✅ Amounts are already stored in cents")
+        return
+
+    # The conversion and the rollup rebuild share the session's transaction,
+    # so a failure leaves the amounts as they were and the command can rerun
+    legacy = db.table('expenses', db.column('amount'), db.column('amount_cents'))
+    connection = db.session.connection()
+    try:
+        if 'amount' in expense_columns:
+            if 'amount_cents' not in expense_columns:
+                print("Adding expenses.amount_cents...")
+                connection.execute(db.text(
+                    'ALTER TABLE expenses ADD COLUMN amount_cents BIGINT NOT NULL DEFAULT 0'
+                ))
+            print("Converting amounts to cents...")
+            result = connection.execute(legacy.update().values(
+                amount_cents=db.cast(db.func.round(legacy.c.amount * 100), db.BigInteger)
+            ))
+            print(f"  {result.rowcount} expenses converted")
+            connection.execute(db.text('ALTER TABLE expenses DROP COLUMN amount'))
+
+        # Rollups are derived data: recreate the table and rebuild it
+        ExpenseRollup.__table__.drop(connection, checkfirst=True)
+        ExpenseRollup.__table__.create(connection)
+
+        print("Rebuilding monthly expense rollups...")
+        rows = ExpenseRollup.rebuild()
+    except Exception:
+        db.session.rollback()
+        raise
+    # Cached pages are keyed by each user's stamps, so move every user's
+    DataVersion.bump_in_session(db.session, {
+        tenant_key(name, user_id)
+        for user_id, in db.session.query(User.id)
+        for name in ('expenses', 'categories')
+    })
+    db.session.commit()
+    print(f"✅ Migrated amounts to cents ({rows} rollup rows)")
+
+@app.cli.command()
+def migrate_recurring_schema():
+    """Add recurring expense tables and columns to an existing database (idempotent)."""
+    RecurringExpense.__table__.create(db.engine, checkfirst=True)
+
+    inspector = db.inspect(db.engine)
+    expense_columns = {column['name'] for column in inspector.get_columns('expenses')}
+    with db.engine.begin() as connection:
+        if 'recurring_id' not in expense_columns:
+            print("Adding expenses.recurring_id...")
+            connection.execute(db.text(
+                'ALTER TABLE expenses ADD COLUMN recurring_id INTEGER REFERENCES recurring_expenses (id)'
+            ))
+        for index in Expense.__table__.indexes:
+            if index.name == 'uq_expenses_recurring_date':
+                index.create(connection, checkfirst=True)
+    print("✅ Recurring expense schema is up to date")
+
+@app.cli.command()
+def migrate_expense_indexes():
+    """Replace the expense indexes with the composite ones the hot queries use (idempotent)."""
+    _require_tenancy()
+    superseded = ('ix_expenses_user_date', 'ix_expenses_user_category_date', 'ix_expenses_description')
+    with db.engine.begin() as connection:
+        stored = db.Table('expenses', db.MetaData(), autoload_with=connection)
+        existing = {index.name for index in stored.indexes}
+        for index in Expense.__table__.indexes:
+            if index.name not in existing:
+                print(f"Creating {index.name}...")
+                index.create(connection)
+        for index in stored.indexes:
+            if index.name in superseded:
+                print(f"Dropping {index.name}...")
+                index.drop(connection)
+    print("✅ Expense indexes are up to date")
+
+@app.cli.command()
+@click.option('--until', type=click.DateTime(formats=['%Y-%m-%d']), help='Generate up to this date (default: today)')
+@click.option('--batch-size', type=int, help='Rows per batch insert (default: IMPORT_BATCH_SIZE)')
+@click.option('--every', type=int, help='Keep running, materializing every N seconds')
+def materialize_recurring(until, batch_size, every):
+    """Generate recurring expenses due since the last run."""
+    batch_size = batch_size or app.config.get('IMPORT_BATCH_SIZE', 1000)
+    while True:
+        try:
+            result = run_materialize(until.date() if until else None, batch_size=batch_size)
+            print(f"✅ Generated {result.inserted} expenses from {result.rules} recurring rules "
+                  f"in {result.elapsed:.2f}s")
+        except IntegrityError:
+            # Another run generated the same occurrences first; retry on the next tick
+            print("⚠️  Skipped: a concurrent run is materializing the same occurrences")
+        if not every:
+            break
+        time.sleep(every)
+
+@app.cli.command()
+def rebuild_search_index():
+    """Build or rebuild the full-text search index."""
+    print("Rebuilding full-text search index...")
+    backend = rebuild_index()
+    print(f"✅ Search backend: {backend}")
+
+@app.cli.command()
+@click.argument('file', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(IMPORT_FORMATS), help='File format (default: from extension)')
+@click.option('--batch-size', type=int, help='Rows per batch insert (default: IMPORT_BATCH_SIZE)')
+@click.option('--user', 'username', required=True, help='User to import the expenses for')
+def import_expenses(file, fmt, batch_size, username):
+    """Bulk import expenses from a CSV or JSON file."""
+    if not fmt:
+        fmt = 'csv' if file.lower().endswith('.csv') else 'json'
+    batch_size = batch_size or app.config.get('IMPORT_BATCH_SIZE', 1000)
+
+    print(f"Importing expenses from {file}...")
+    with _user_scope(username), open(file, encoding='utf-8-sig', newline='') as stream:
+        result = run_import(stream, fmt=fmt, batch_size=batch_size)
+
+    for row, messages in result.errors:
+        print(f"  Row {row}: {'; '.join(messages)}")
+    print(f"✅ Imported {result.inserted} expenses, rejected {len(result.errors)} "
+          f"in {result.elapsed:.2f}s ({result.rows_per_second:.0f} rows/s)")
+
+@app.cli.command()
+@click.option('--format', 'fmt', type=click.Choice(EXPORT_FORMATS), default='csv', show_default=True)
+@click.option('--search', default='', help='Full-text search filter')
+@click.option('--category', 'category_id', type=int, help='Category id filter')
+@click.option('--output', '-o', type=click.File('w', encoding='utf-8'), default='-', help='Output file (default: stdout)')
+@click.option('--user', 'username', required=True, help='User whose expenses to export')
+def export_expenses(fmt, search, category_id, output, username):
+    """Stream expenses to a CSV or NDJSON file."""
+    with _user_scope(username):
+        for chunk in generate_export(fmt, search.strip(), category_id):
+            output.write(chunk)
+
+@app.cli.command()
+@click.option('--user', 'username', required=True, help='User whose snapshot to check')
+def check_analytics(username):
+    """Compare a user's columnar analytics snapshot with SQL totals."""
+    from app.analytics import analytics, load_numpy
+    if not load_numpy():
+        raise click.ClickException('numpy is not installed; run `pip install numpy`')
+    with _user_scope(username):
+        started = time.perf_counter()
+        snapshot = analytics.snapshot()
+        print(f"Loaded {len(snapshot)} expenses in {time.perf_counter() - started:.2f}s")
+        mismatches = analytics.check_consistency()
+    for month, category_id, ours, theirs in mismatches:
+        print(f"❌ {month:%Y-%m} category {category_id}: snapshot {ours} != SQL {theirs}")
+    if mismatches:
+        raise SystemExit(1)
+    print("✅ Analytics snapshot matches the database")
+
+@app.cli.command()
+@click.option('--user', 'username', required=True, help='User whose data the queries run against')
+@click.option('--verbose', '-v', is_flag=True, help='Print every plan, not only the failing ones')
+def check_query_plans(username, verbose):
+    """EXPLAIN the hot list and aggregate queries; fail on full scans or sorts."""
+    from app.query_plans import check_query_plans as run_check
+    with _user_scope(username):
+        try:
+            reports = run_check()
+        except ValueError as e:
+            raise click.ClickException(str(e))
+    for report in reports:
+        if report.problems or verbose:
+            print(f"{'❌' if report.problems else '✅'} {report.name}: {report.statement}")
+            for line in report.plan:
+                print(f"    {line}")
+    failing = sorted({report.name for report in reports if report.problems})
+    if failing:
+        print(f"❌ {len(failing)} queries need an index: {', '.join(failing)}")
+        raise SystemExit(1)
+    print(f"✅ {len(reports)} query plans use indexes without scans or sorts")
+
 @app.shell_context_processor
 def make_shell_context():
     """Make database models available in shell."""
     return {
         'db': db,
+        'User': User,
         'Category': Category,
-        'Expense': Expense
+        'Expense': Expense,
+        'RecurringExpense': RecurringExpense
     }
 
 if __name__ == '__main__':
@@ -52,12 +377,9 @@ if __name__ == '__main__':
     print("Press Ctrl+C to stop the server")
     print("-" * 50)
 
-    # Initialize database on first run
+    # Initialize database on first run; users get default categories on sign-up
     with app.app_context():
-        db.create_all()
-        if Category.query.count() == 0:
-            print("First run detected - creating default categories...")
-            Category.create_default_categories()
+        db.create_all(bind_key=None)
 
     # Use debug from app config for flexibility
     app.run(
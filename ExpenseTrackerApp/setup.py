@@ -66,17 +66,11 @@ def initialize_database():
 
     try:
         from app import create_app, db
-        from app.models.category import Category
 
         app = create_app('development')
         with app.app_context():
             db.create_all()
-
-            if Category.query.count() == 0:
-                Category.create_default_categories()
-                print_success("Database initialized with default categories")
-            else:
-                print_success("Database already initialized")
+            print_success("Database initialized; register a user to get the default categories")
 
         return True
 
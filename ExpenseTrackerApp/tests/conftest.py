@@ -0,0 +1,56 @@
+"""
+Shared pytest fixtures for Flask Expense Tracker
+
+Every test gets a fresh app built with the 'testing' config (an in-memory
+SQLite database with the schema created at startup) and a registered user
+whose session the test client carries.
+"""
+
+from datetime import date, timedelta
+import pytest
+from app import create_app, db
+from app.models import User, Category, Expense
+from app.tenancy import tenant
+
+
+@pytest.fixture
+def app():
+    """A fresh application with an empty database."""
+    app = create_app('testing')
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def user_id(app):
+    """Id of a registered user who has the default categories."""
+    with app.app_context():
+        return User.create('tester', 'tester-password').id
+
+
+@pytest.fixture
+def client(app, user_id):
+    """Test client logged in as the user."""
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['user_id'] = user_id
+        session['username'] = 'tester'
+    return client
+
+
+def add_expenses(app, user_id, count, start=None):
+    """Insert count expenses for the user, spread over categories and days."""
+    start = start or date.today()
+    with app.app_context(), tenant(user_id):
+        categories = [category.id for category in Category.query.order_by(Category.id)]
+        for number in range(count):
+            db.session.add(Expense(
+                description=f'Expense {number}',
+                amount='12.50',
+                category_id=categories[number % len(categories)],
+                date=start - timedelta(days=number % 40),
+                notes='note' if number % 2 else None
+            ))
+        db.session.commit()
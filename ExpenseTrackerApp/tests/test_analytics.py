@@ -0,0 +1,62 @@
+"""The dashboard aggregates come from the columnar analytics engine when it is enabled."""
+
+from datetime import date
+import pytest
+from app.models import Category, Expense
+from app.tenancy import tenant
+from tests.conftest import add_expenses
+
+pytest.importorskip('numpy')
+
+
+def _by_category(category_totals):
+    return sorted(category_totals, key=lambda category: category['category'])
+
+
+@pytest.fixture
+def analytics_enabled(app, monkeypatch):
+    """Enable analytics and fail any dashboard aggregate that falls back to SQL."""
+    app.config['ANALYTICS_ENABLED'] = True
+
+    def sql_stats(year=None, month=None):
+        pytest.fail('dashboard stats were read from SQL')
+
+    monkeypatch.setattr(Expense, 'get_dashboard_stats', staticmethod(sql_stats))
+
+
+@pytest.fixture
+def expected(app, user_id):
+    """The SQL dashboard stats for 60 expenses, taken before analytics is enabled."""
+    add_expenses(app, user_id, 60)
+    with app.app_context(), tenant(user_id):
+        return Expense.get_dashboard_stats()
+
+
+def test_summary_from_analytics_matches_sql(client, expected, analytics_enabled):
+    data = client.get('/api/expenses/summary').get_json()['data']
+    assert expected['monthly_total_cents'] > 0
+    assert data['monthly_total_cents'] == expected['monthly_total_cents']
+    assert data['yearly_total_cents'] == expected['yearly_total_cents']
+    assert [(category['category'], category['total_cents']) for category in _by_category(data['category_totals'])] == [
+        (category['category'], category['total_cents']) for category in _by_category(expected['category_totals'])
+    ]
+
+
+def test_dashboard_renders_from_analytics(client, expected, analytics_enabled):
+    response = client.get('/')
+    assert response.status_code == 200
+
+
+def test_summary_from_analytics_sees_new_expenses(app, client, user_id, analytics_enabled):
+    assert client.get('/api/expenses/summary').get_json()['data']['monthly_total_cents'] == 0
+
+    with app.app_context(), tenant(user_id):
+        category_id = Category.query.order_by(Category.id).first().id
+    response = client.post('/add_expense', data={
+        'description': 'Coffee', 'amount': '3.25', 'category_id': category_id, 'date': date.today().isoformat()
+    })
+    assert response.status_code == 302
+
+    data = client.get('/api/expenses/summary').get_json()['data']
+    assert data['monthly_total_cents'] == 325
+    assert [category['total_cents'] for category in data['category_totals']] == [325]
@@ -0,0 +1,40 @@
+"""Batch API endpoints reject malformed ids per item instead of failing."""
+
+import pytest
+from tests.conftest import add_expenses
+
+
+@pytest.fixture
+def expense_id(app, client, user_id):
+    add_expenses(app, user_id, 1)
+    return client.get('/api/v1/expenses').get_json()['data'][0]['id']
+
+
+def _errors(response):
+    assert response.status_code == 422
+    return {error['index']: error['messages'] for error in response.get_json()['errors']}
+
+
+@pytest.mark.parametrize('bad_id', [[1], {'id': 1}, True, '1', None])
+def test_update_rejects_non_integer_ids(client, expense_id, bad_id):
+    response = client.patch('/api/v1/expenses', json=[
+        {'id': expense_id, 'description': 'Changed'},
+        {'id': bad_id, 'description': 'Changed'}
+    ])
+    errors = _errors(response)
+    assert list(errors) == [1]
+    assert 'must be an integer' in errors[1][0]
+
+
+@pytest.mark.parametrize('url', ['/api/v1/expenses', '/api/v1/recurring'])
+def test_delete_rejects_non_integer_ids(client, expense_id, url):
+    response = client.delete(url, json={'ids': [[1], True, 'x', 987654]})
+    errors = _errors(response)
+    assert all('must be an integer' in errors[index][0] for index in (0, 1, 2))
+    assert errors[3][0].endswith('987654 not found')
+
+
+def test_delete_with_valid_ids_still_succeeds(client, expense_id):
+    response = client.delete('/api/v1/expenses', json=[expense_id])
+    assert response.status_code == 200
+    assert response.get_json()['deleted'] == [expense_id]
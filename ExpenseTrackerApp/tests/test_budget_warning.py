@@ -0,0 +1,56 @@
+"""Saving an expense that goes over budget warns without failing the save."""
+
+from datetime import date
+from unittest import mock
+from app import db
+from app.models import Budget, Category, Expense
+from app.tenancy import tenant
+
+
+def _set_budget(app, user_id, cents):
+    with app.app_context(), tenant(user_id):
+        category_id = db.session.query(Category.id).order_by(Category.id).limit(1).scalar()
+        today = date.today()
+        Budget.set_month(today.year, today.month, {category_id: cents})
+        return category_id
+
+
+def _add_expense(client, category_id, amount):
+    return client.post('/add_expense', data={
+        'description': 'Groceries',
+        'amount': amount,
+        'category_id': category_id,
+        'date': date.today().isoformat()
+    })
+
+
+def _flashes(client):
+    with client.session_transaction() as session:
+        return session.get('_flashes', [])
+
+
+def test_over_budget_expense_is_saved_and_warned(app, client, user_id):
+    category_id = _set_budget(app, user_id, 5000)
+    _add_expense(client, category_id, '75.00')
+    flashes = _flashes(client)
+    assert flashes[0][0] == 'success'
+    assert flashes[1][0] == 'warning'
+    assert '$75.00 of $50.00' in flashes[1][1]
+
+
+def test_under_budget_expense_is_not_warned(app, client, user_id):
+    category_id = _set_budget(app, user_id, 5000)
+    _add_expense(client, category_id, '25.00')
+    assert [category for category, _ in _flashes(client)] == ['success']
+
+
+def test_failed_budget_check_does_not_report_a_saved_expense(app, client, user_id):
+    category_id = _set_budget(app, user_id, 5000)
+    with mock.patch.object(Budget, 'check', side_effect=RuntimeError('boom')):
+        _add_expense(client, category_id, '75.00')
+    flashes = _flashes(client)
+    with app.app_context(), tenant(user_id):
+        saved = Expense.query.count()
+    # The check runs before commit, so a failure rolls the write back with it
+    assert saved == 0
+    assert flashes == [('error', 'Error processing expense: boom')]
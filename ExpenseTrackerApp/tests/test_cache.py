@@ -0,0 +1,30 @@
+"""Per-user process caches stay bounded."""
+
+from app.cache import LRUCache
+from app.models import User
+from app.models.category import CategoryRegistry
+from app.tenancy import tenant
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(maxsize=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+    assert cache.keys() == ['a', 'c']
+    assert cache.pop('a') == 1
+    assert cache.pop('a', 'gone') == 'gone'
+
+
+def test_category_registry_keeps_only_recent_users(app):
+    registry = CategoryRegistry(maxsize=2)
+    with app.app_context():
+        users = [User.create(f'user{number}', 'user-password').id for number in range(3)]
+        for user_id in users:
+            with tenant(user_id):
+                assert len(registry.all()) == 9
+        assert [user_id for _, user_id in registry._entries.keys()] == users[1:]
+
+        registry.invalidate(users[2])
+        assert [user_id for _, user_id in registry._entries.keys()] == users[1:2]
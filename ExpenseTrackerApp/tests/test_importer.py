@@ -0,0 +1,36 @@
+"""Bulk import validates amounts like the forms and the API."""
+
+import io
+from app.importer import import_expenses
+from app.models import Category, Expense
+from app.tenancy import tenant
+
+CSV = """description,amount,category,date
+Coffee,3.50,Food & Dining,2024-03-01
+Rounding,0.004,Food & Dining,2024-03-01
+Fraction,12.345,Food & Dining,2024-03-02
+Trailing zero,12.500,Food & Dining,2024-03-03
+"""
+
+
+def test_import_rejects_sub_cent_amounts(app, user_id):
+    with app.app_context(), tenant(user_id):
+        result = import_expenses(io.StringIO(CSV))
+        assert result.inserted == 2
+        assert result.errors == [
+            (3, ['Amount must have at most 2 decimal places']),
+            (4, ['Amount must have at most 2 decimal places'])
+        ]
+        assert sorted(expense.amount_cents for expense in Expense.query) == [350, 1250]
+
+
+def test_api_rejects_sub_cent_amounts(app, client, user_id):
+    with app.app_context(), tenant(user_id):
+        category_id = Category.query.filter_by(name='Food & Dining').one().id
+    response = client.post('/api/v1/expenses', json={'expenses': [
+        {'description': 'Rounding', 'amount': '0.004', 'category_id': category_id, 'date': '2024-03-01'}
+    ]})
+    assert response.status_code == 422
+    assert response.get_json()['errors'] == [
+        {'index': 0, 'messages': ['Amount must have at most 2 decimal places']}
+    ]
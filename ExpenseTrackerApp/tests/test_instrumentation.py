@@ -0,0 +1,77 @@
+"""Query counting, query budgets and the per-request timing hooks."""
+
+import logging
+import re
+import pytest
+from config import TestingConfig
+from app import create_app, db
+from app.instrumentation import _listener_users, count_queries, query_budget
+from app.models import DataVersion
+
+
+def _select_one(app, times=1):
+    with app.app_context():
+        for _ in range(times):
+            db.session.execute(db.select(DataVersion.name)).all()
+
+
+def test_count_queries_attaches_listeners_only_inside_the_block(app):
+    with app.app_context():
+        engine = db.engine
+    assert engine not in _listener_users
+    with count_queries(app) as outer:
+        _select_one(app)
+        with count_queries(app) as inner:
+            _select_one(app)
+        assert _listener_users[engine] == 1
+    assert engine not in _listener_users
+    assert (outer.count, inner.count) == (2, 1)
+    assert all('data_versions' in statement for statement in outer.statements)
+
+
+def test_query_budget_passes_within_budget(app):
+    with query_budget(2, app) as counter:
+        _select_one(app, 2)
+    assert counter.count == 2
+
+
+def test_query_budget_fails_over_budget_listing_statements(app):
+    with pytest.raises(AssertionError, match=r'3 queries \(budget 2\)') as failure:
+        with query_budget(2, app):
+            _select_one(app, 3)
+    assert '3. SELECT data_versions.name' in str(failure.value)
+
+
+class TestPerRequestInstrumentation:
+    """Requests against an app built with QUERY_INSTRUMENTATION on."""
+
+    @pytest.fixture
+    def app(self, monkeypatch):
+        monkeypatch.setattr(TestingConfig, 'QUERY_INSTRUMENTATION', True)
+        app = create_app('testing')
+        yield app
+        with app.app_context():
+            db.session.remove()
+            db.engine.dispose()
+
+    def test_server_timing_counts_request_queries(self, app, client):
+        with count_queries(app) as counter:
+            response = client.get('/expenses')
+        assert response.status_code == 200
+        timing = response.headers['Server-Timing']
+        match = re.search(r'db;dur=[\d.]+;desc="(\d+) queries"', timing)
+        assert match and int(match.group(1)) == counter.count > 0
+        assert 'tpl;dur=' in timing and 'total;dur=' in timing
+
+    def test_slow_queries_are_logged_with_route(self, app, client, caplog):
+        app.config['SLOW_QUERY_THRESHOLD_MS'] = 0
+        caplog.set_level(logging.WARNING, logger=app.logger.name)
+        client.get('/expenses')
+        slow = [record.getMessage() for record in caplog.records if 'Slow query' in record.getMessage()]
+        assert slow and all(' in GET main.expenses: SELECT ' in message for message in slow)
+
+    def test_fast_queries_are_not_logged(self, app, client, caplog):
+        app.config['SLOW_QUERY_THRESHOLD_MS'] = 60_000
+        caplog.set_level(logging.WARNING, logger=app.logger.name)
+        client.get('/expenses')
+        assert not [record for record in caplog.records if 'Slow query' in record.getMessage()]
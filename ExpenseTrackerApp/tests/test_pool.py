@@ -0,0 +1,64 @@
+"""Connection pool overflow, timeouts and the checkout metrics."""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from config import TestingConfig
+from app import create_app, db
+from app.instrumentation import InstrumentedQueuePool, pool_stats
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=2,
+        max_overflow=1,
+        pool_timeout=0.2
+    )
+    yield engine
+    engine.dispose()
+
+
+def test_checkouts_beyond_pool_size_overflow_then_time_out(engine):
+    connections = [engine.connect() for _ in range(3)]
+    stats = pool_stats(engine)
+    assert (stats['size'], stats['checked_out'], stats['overflow']) == (2, 3, 1)
+
+    with pytest.raises(PoolTimeoutError):
+        engine.connect()
+
+    metrics = pool_stats(engine)['metrics']
+    assert metrics['checkouts'] == 3
+    assert metrics['overflow_checkouts'] == 1
+    assert metrics['peak_overflow'] == 1
+    assert metrics['timeouts'] == 1
+    assert metrics['max_wait_ms'] >= 200
+
+    for connection in connections:
+        connection.close()
+    stats = pool_stats(engine)
+    assert stats['checked_out'] == 0
+
+
+def test_returned_connections_are_reused_without_overflow(engine):
+    for _ in range(5):
+        with engine.connect():
+            pass
+    stats = pool_stats(engine)
+    assert stats['pool_class'] == 'InstrumentedQueuePool'
+    assert stats['metrics']['checkouts'] == 5
+    assert stats['metrics']['overflow_checkouts'] == 0
+    assert stats['metrics']['timeouts'] == 0
+
+
+def test_app_uses_instrumented_pool_when_metrics_are_on(monkeypatch, tmp_path):
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'app.db'}")
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_ENGINE_OPTIONS', {'pool_size': 2, 'max_overflow': 0}, raising=False)
+    monkeypatch.setattr(TestingConfig, 'DB_POOL_METRICS', True)
+    app = create_app('testing')
+    with app.app_context():
+        assert isinstance(db.engine.pool, InstrumentedQueuePool)
+        assert pool_stats(db.engine)['metrics']['checkouts'] > 0
+        db.engine.dispose()
@@ -0,0 +1,48 @@
+"""Query counts of the dashboard and expense list must not grow with the data."""
+
+import pytest
+from app.instrumentation import count_queries, query_budget
+from tests.conftest import add_expenses
+
+# Statements per warm page view: versions, stats, budgets and recent expenses
+# on the dashboard; a single keyset page on the list
+PAGE_BUDGETS = {
+    '/': 4,
+    '/expenses': 1
+}
+
+
+def _page_queries(app, client, user_id, expenses, url):
+    add_expenses(app, user_id, expenses)
+    with query_budget(PAGE_BUDGETS[url], app) as counter:
+        response = client.get(url)
+    assert response.status_code == 200
+    return counter.count
+
+
+@pytest.mark.parametrize('url', sorted(PAGE_BUDGETS))
+def test_page_query_count_is_constant(app, client, user_id, url):
+    # Warm the category registry, which only reloads when categories change
+    client.get(url)
+    # Each new batch of rows moves the expenses stamp, so cached stats miss again
+    counts = [_page_queries(app, client, user_id, expenses, url) for expenses in (1, 50, 200)]
+    assert len(set(counts)) == 1, counts
+
+
+@pytest.mark.parametrize('query', ['category=1', 'page=2', 'search=expense'])
+def test_filtered_expense_list_stays_within_budget(app, client, user_id, query):
+    add_expenses(app, user_id, 60)
+    client.get('/expenses')
+    with query_budget(3, app):
+        assert client.get(f'/expenses?{query}').status_code == 200
+
+
+def test_cached_dashboard_fragments_skip_their_queries(app, client, user_id):
+    add_expenses(app, user_id, 20)
+    client.get('/')
+    with count_queries(app) as counter:
+        response = client.get('/')
+    assert response.status_code == 200
+    assert b'Expense 0' in response.data
+    # Only the version stamps: stats, budgets and recent expenses are all cached
+    assert counter.count == 1, counter.statements
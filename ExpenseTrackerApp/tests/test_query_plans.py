@@ -0,0 +1,37 @@
+"""The hot list and aggregate queries must walk indexes on the testing database."""
+
+import pytest
+from app import db
+from app.instrumentation import query_budget
+from app.query_plans import check_query_plans, hot_queries
+from app.tenancy import tenant
+from tests.conftest import add_expenses
+
+
+@pytest.fixture
+def reports(app, user_id):
+    add_expenses(app, user_id, 120)
+    # No ANALYZE: without statistics SQLite plans as if every table were large
+    with app.app_context(), tenant(user_id):
+        yield check_query_plans()
+
+
+def test_hot_queries_use_indexes_without_scans_or_sorts(reports):
+    failing = [
+        f"{report.name}: {problem.kind} {problem.detail}"
+        for report in reports for problem in report.problems
+    ]
+    assert not failing, '\n'.join(failing)
+
+
+def test_every_hot_query_is_explained(reports):
+    names = {report.name for report in reports}
+    assert names == {query.name for query in hot_queries()}
+
+
+def test_hot_queries_stay_within_query_budget(app, user_id):
+    add_expenses(app, user_id, 120)
+    with app.app_context(), tenant(user_id):
+        for query in hot_queries():
+            with query_budget(2, app):
+                query.run()
@@ -0,0 +1,129 @@
+"""Read-only routes and aggregates read the replica; writes stay on the primary."""
+
+import shutil
+import time
+from datetime import date
+import pytest
+from sqlalchemy import event
+from config import TestingConfig
+from app import create_app, db
+from app.models import Category, Expense
+from app.replica import REPLICA_BIND, _STICKY_KEY, use_replica
+from app.tenancy import tenant
+from tests.conftest import add_expenses
+
+
+@pytest.fixture
+def app(monkeypatch, tmp_path):
+    """An app with a primary and a replica SQLite file."""
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'primary.db'}")
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_BINDS', {REPLICA_BIND: f"sqlite:///{tmp_path / 'replica.db'}"})
+    app = create_app('testing')
+    yield app
+    with app.app_context():
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+@pytest.fixture
+def statements(app, user_id, tmp_path):
+    """
+    Seed the primary, copy it to the replica, and record which database
+    ran each statement afterwards as (database, sql) pairs.
+    """
+    add_expenses(app, user_id, 10)
+    with app.app_context():
+        engines = {None: db.engines[None], REPLICA_BIND: db.engines[REPLICA_BIND]}
+        for engine in engines.values():
+            engine.dispose()
+    shutil.copy(tmp_path / 'primary.db', tmp_path / 'replica.db')
+
+    recorded = []
+    listeners = []
+    for name, engine in engines.items():
+        def record(conn, cursor, statement, parameters, context, executemany, name=name or 'primary'):
+            recorded.append((name, statement))
+        event.listen(engine, 'before_cursor_execute', record)
+        listeners.append((engine, record))
+    yield recorded
+    for engine, record in listeners:
+        event.remove(engine, 'before_cursor_execute', record)
+
+
+def _databases(statements):
+    return {name for name, _ in statements}
+
+
+@pytest.mark.parametrize('url', ['/', '/expenses', '/api/expenses/summary', '/api/v1/expenses'])
+def test_read_only_routes_read_the_replica(client, statements, url):
+    assert client.get(url).status_code == 200
+    assert statements and _databases(statements) == {REPLICA_BIND}
+
+
+@pytest.mark.parametrize('aggregate', [
+    'get_monthly_total', 'get_yearly_total', 'get_category_totals', 'get_dashboard_stats', 'get_recent_expenses'
+])
+def test_expense_aggregates_read_the_replica(app, user_id, statements, aggregate):
+    with app.app_context(), tenant(user_id):
+        getattr(Expense, aggregate)()
+    assert statements and _databases(statements) == {REPLICA_BIND}
+
+
+def test_plain_reads_outside_read_only_use_the_primary(app, user_id, statements):
+    with app.app_context(), tenant(user_id):
+        Expense.query.count()
+    assert _databases(statements) == {'primary'}
+
+
+def test_reads_after_a_write_in_the_same_session_use_the_primary(app, user_id, statements):
+    with app.app_context(), tenant(user_id), use_replica():
+        category_id = db.session.query(Category.id).order_by(Category.id).limit(1).scalar()
+        assert _databases(statements) == {REPLICA_BIND}
+        statements.clear()
+
+        db.session.add(Expense(description='Coffee', amount='3.00', category_id=category_id, date=date.today()))
+        db.session.flush()
+        # Only the primary's transaction holds the new row
+        assert Expense.get_recent_expenses(limit=1)[0].description == 'Coffee'
+        db.session.commit()
+    assert _databases(statements) == {'primary'}
+
+
+def test_add_and_edit_write_to_the_primary(app, client, statements):
+    category_id = client.get('/api/v1/expenses').get_json()['data'][0]['category_id']
+    statements.clear()
+    response = client.post('/add_expense', data={
+        'description': 'Coffee', 'amount': '3.00', 'category_id': category_id, 'date': date.today().isoformat()
+    })
+    assert response.status_code == 302
+    writes = [name for name, sql in statements if sql.lstrip().upper().startswith(('INSERT', 'UPDATE', 'DELETE'))]
+    assert writes and set(writes) == {'primary'}
+    # The request wrote, so all of its reads stayed on the primary too
+    assert _databases(statements) == {'primary'}
+
+    statements.clear()
+    response = client.post('/edit_expense/1', data={
+        'description': 'Lunch', 'amount': '9.00', 'category_id': category_id, 'date': date.today().isoformat()
+    })
+    assert response.status_code == 302
+    assert statements and _databases(statements) == {'primary'}
+
+
+def test_client_sticks_to_the_primary_after_writing(app, client, statements):
+    category_id = client.get('/api/v1/expenses').get_json()['data'][0]['category_id']
+    client.post('/add_expense', data={
+        'description': 'Coffee', 'amount': '3.00', 'category_id': category_id, 'date': date.today().isoformat()
+    })
+    statements.clear()
+    response = client.get('/')
+    assert response.status_code == 200
+    assert b'Coffee' in response.data
+    assert _databases(statements) == {'primary'}
+
+    # Once the sticky window has passed, reads go back to the replica
+    with client.session_transaction() as session:
+        session[_STICKY_KEY] = time.time() - 1
+    statements.clear()
+    client.get('/')
+    assert _databases(statements) == {REPLICA_BIND}
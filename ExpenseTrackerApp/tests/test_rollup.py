@@ -0,0 +1,53 @@
+"""Rollup deltas are applied as atomic upserts."""
+
+from datetime import date
+from types import SimpleNamespace
+import pytest
+from sqlalchemy.dialects import mysql, postgresql
+from app import db
+from app.models import Category, ExpenseRollup
+from app.tenancy import tenant
+
+
+def _apply(cents, count, category_id, day=date(2024, 2, 10)):
+    deltas = ExpenseRollup.new_deltas()
+    ExpenseRollup.add_delta(deltas, day, category_id, cents, count)
+    ExpenseRollup.apply_deltas(db.session.connection(), deltas)
+    db.session.commit()
+
+
+def _rollups():
+    return [
+        (row.user_id, row.year, row.month, row.category_id, row.total_cents, row.count)
+        for row in db.session.execute(db.select(ExpenseRollup.__table__))
+    ]
+
+
+def test_deltas_applied_twice_to_a_new_key_accumulate(app, user_id):
+    with app.app_context(), tenant(user_id):
+        category_id = db.session.query(Category.id).order_by(Category.id).limit(1).scalar()
+        _apply(1250, 1, category_id)
+        _apply(750, 2, category_id)
+        assert _rollups() == [(user_id, 2024, 2, category_id, 2000, 3)]
+
+
+def test_decrements_for_missing_rows_are_dropped(app, user_id):
+    with app.app_context(), tenant(user_id):
+        category_id = db.session.query(Category.id).order_by(Category.id).limit(1).scalar()
+        _apply(-500, -1, category_id)
+        _apply(300, 0, category_id)
+        assert _rollups() == []
+        _apply(1000, 1, category_id)
+        _apply(-400, -1, category_id)
+        assert _rollups() == [(user_id, 2024, 2, category_id, 600, 0)]
+
+
+@pytest.mark.parametrize('dialect, clause', [
+    (mysql.dialect(), 'ON DUPLICATE KEY UPDATE total_cents = (expense_rollups.total_cents + VALUES(total_cents))'),
+    (postgresql.dialect(), 'ON CONFLICT (category_id, year, month) DO UPDATE SET total_cents = (expense_rollups.total_cents + excluded.total_cents)')
+])
+def test_upsert_adds_in_sql_on_server_databases(dialect, clause):
+    statement = ExpenseRollup._upsert(SimpleNamespace(dialect=dialect), {
+        'user_id': 1, 'year': 2024, 'month': 2, 'category_id': 3, 'total_cents': 100, 'count': 1
+    })
+    assert clause in ' '.join(str(statement.compile(dialect=dialect)).split())
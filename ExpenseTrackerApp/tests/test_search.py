@@ -0,0 +1,65 @@
+"""Search picks its backend from the database the query is routed to."""
+
+import shutil
+import sqlite3
+import pytest
+from config import TestingConfig
+from app import create_app, db
+from app.exporter import generate_export
+from app.models import Expense
+from app.replica import use_replica
+from app.search import BACKEND_FTS5, BACKEND_LIKE, FTS_TABLE, get_backend
+from app.tenancy import tenant
+from tests.conftest import add_expenses
+
+
+@pytest.fixture
+def app(monkeypatch, tmp_path):
+    """An app whose replica is a copy of the primary without the FTS5 table."""
+    primary, replica = tmp_path / 'primary.db', tmp_path / 'replica.db'
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', f'sqlite:///{primary}')
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_BINDS', {'replica': f'sqlite:///{replica}'})
+    app = create_app('testing')
+    yield app
+    with app.app_context():
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+@pytest.fixture
+def replica(app, user_id, tmp_path):
+    add_expenses(app, user_id, 5)
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose()
+    shutil.copy(tmp_path / 'primary.db', tmp_path / 'replica.db')
+    with sqlite3.connect(tmp_path / 'replica.db') as connection:
+        connection.execute(f'DROP TABLE {FTS_TABLE}')
+        for suffix in ('ai', 'ad', 'au'):
+            connection.execute(f'DROP TRIGGER {FTS_TABLE}_{suffix}')
+
+
+def _search(term):
+    return Expense.apply_filters(Expense.query, term).all()
+
+
+def test_backend_follows_replica_routing(app, user_id, replica):
+    with app.app_context(), tenant(user_id):
+        assert get_backend() == BACKEND_FTS5
+        with use_replica():
+            assert get_backend() == BACKEND_LIKE
+
+
+def test_replica_searches_do_not_use_the_primary_index(app, user_id, replica):
+    with app.app_context(), tenant(user_id):
+        assert len(_search('expense')) == 5
+        with use_replica():
+            assert len(_search('expense')) == 5
+            assert [expense.description for expense in _search('expense 3')] == ['Expense 3']
+
+
+def test_search_exports_use_the_replica_backend(app, user_id, replica):
+    with app.app_context(), tenant(user_id):
+        lines = list(generate_export('ndjson', 'expense 3'))
+    assert len(lines) == 1 and '"Expense 3"' in lines[0]
@@ -0,0 +1,48 @@
+"""Importing the app and running the factory must stay cheap for workers and CLI runs."""
+
+import json
+import os
+import subprocess
+import sys
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Seconds for `import app` plus create_app('production') in a fresh interpreter
+STARTUP_BUDGET = 2.0
+
+STARTUP_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+from app import create_app
+app = create_app('production')
+elapsed = time.perf_counter() - started
+print(json.dumps({'seconds': elapsed, 'modules': sorted(sys.modules)}))
+"""
+
+
+def _start(tmp_path, **env):
+    environment = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{tmp_path / 'startup.db'}",
+        ANALYTICS_ENABLED='false',
+        JINJA_BYTECODE_CACHE_DIR='',
+        **env
+    )
+    result = subprocess.run(
+        [sys.executable, '-c', STARTUP_SCRIPT],
+        cwd=APP_DIR, env=environment, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_create_app_stays_within_startup_budget(tmp_path):
+    startup = _start(tmp_path)
+    assert startup['seconds'] < STARTUP_BUDGET, f"startup took {startup['seconds']:.2f}s"
+    # Schema creation is an explicit step outside development
+    assert not (tmp_path / 'startup.db').exists() or os.path.getsize(tmp_path / 'startup.db') == 0
+
+
+def test_numpy_is_not_imported_with_analytics_disabled(tmp_path):
+    startup = _start(tmp_path)
+    assert 'numpy' not in startup['modules']
+    assert 'app.analytics' in startup['modules']
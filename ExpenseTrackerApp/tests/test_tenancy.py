@@ -0,0 +1,88 @@
+"""Users only ever see their own data, and unscoped queries fail closed."""
+
+from datetime import date, timedelta
+import pytest
+from app import db
+from app.models import Budget, Category, Expense, RecurringExpense, User
+from app.recurring import materialize_recurring
+from app.tenancy import tenant
+
+
+@pytest.fixture
+def alice(app):
+    """A second user with one distinctive expense; returns (user id, expense id)."""
+    with app.app_context():
+        user_id = User.create('alice', 'alice-password').id
+        with tenant(user_id):
+            category = Category.query.order_by(Category.id).first()
+            expense = Expense(description='Alice secret', amount='999.99', category_id=category.id,
+                              date=date.today())
+            db.session.add(expense)
+            Budget.set_month(date.today().year, date.today().month, {category.id: 100})
+            db.session.commit()
+            return user_id, expense.id
+
+
+@pytest.fixture
+def own_expense(app, client, user_id):
+    """An expense of the logged-in user, so pages have data to render."""
+    with app.app_context(), tenant(user_id):
+        category = Category.query.order_by(Category.id).first()
+        db.session.add(Expense(description='Tester lunch', amount='12.50', category_id=category.id,
+                               date=date.today()))
+        db.session.commit()
+
+
+@pytest.mark.parametrize('url', [
+    '/', '/expenses', '/expenses?search=secret', '/budgets', '/expenses/export.csv',
+    '/api/expenses/summary', '/api/expenses/timeseries', '/api/v1/expenses', '/api/v1/recurring'
+])
+def test_routes_show_only_the_users_own_data(client, alice, own_expense, url):
+    response = client.get(url)
+    assert response.status_code == 200
+    body = response.get_data(as_text=True)
+    assert 'Alice secret' not in body
+    assert '999.99' not in body
+
+
+def test_other_users_expenses_cannot_be_read_or_changed(client, alice):
+    _, expense_id = alice
+    assert client.get(f'/api/v1/expenses/{expense_id}').status_code == 404
+    assert client.get(f'/edit_expense/{expense_id}').status_code == 404
+    assert client.patch('/api/v1/expenses', json=[{'id': expense_id, 'description': 'Mine'}]).status_code == 422
+    assert client.delete('/api/v1/expenses', json=[expense_id]).status_code == 422
+
+
+def test_aggregates_cover_only_the_current_user(app, user_id, alice, own_expense):
+    with app.app_context(), tenant(user_id):
+        assert str(Expense.get_monthly_total()) == '12.50'
+        stats = Expense.get_dashboard_stats()
+        assert stats['total_count'] == 1
+        assert stats['monthly_total_cents'] == 1250
+        assert [e.description for e in Expense.get_recent_expenses()] == ['Tester lunch']
+        assert Budget.month_status() == []
+        assert len(Category.query.all()) == 9
+
+
+def test_queries_without_a_user_fail_closed(app, alice):
+    with app.app_context():
+        with pytest.raises(RuntimeError, match='No user in scope'):
+            Expense.query.all()
+        with pytest.raises(RuntimeError, match='No user in scope'):
+            db.session.query(db.func.count(Category.id)).scalar()
+        # Tables that are only joined match nothing rather than every user
+        assert db.session.query(User.id).join(Category, Category.user_id == User.id).all() == []
+        assert Expense.query.execution_options(all_tenants=True).count() == 1
+
+
+def test_scheduled_recurring_run_covers_every_user(app, user_id, alice):
+    alice_id, _ = alice
+    start = date.today() - timedelta(days=1)
+    for owner in (user_id, alice_id):
+        with app.app_context(), tenant(owner):
+            category = Category.query.order_by(Category.id).first()
+            db.session.add(RecurringExpense(description='Rent', amount_cents=50000, category_id=category.id,
+                                            frequency='monthly', start_date=start))
+            db.session.commit()
+    with app.app_context():
+        assert materialize_recurring().inserted == 2
@@ -0,0 +1,133 @@
+"""The migrate-* commands upgrade a database created by the original schema."""
+
+import os
+import sqlite3
+import subprocess
+import sys
+import pytest
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Schema and rows as the first release of the app created them
+BASELINE_SCHEMA = """
+CREATE TABLE categories (
+    id INTEGER NOT NULL,
+    name VARCHAR(50) NOT NULL,
+    description TEXT,
+    color VARCHAR(7),
+    icon VARCHAR(50),
+    is_active BOOLEAN NOT NULL,
+    created_at DATETIME NOT NULL,
+    PRIMARY KEY (id)
+);
+CREATE UNIQUE INDEX ix_categories_name ON categories (name);
+CREATE TABLE expenses (
+    id INTEGER NOT NULL,
+    description VARCHAR(255) NOT NULL,
+    amount NUMERIC(10, 2) NOT NULL,
+    date DATE NOT NULL,
+    notes TEXT,
+    category_id INTEGER NOT NULL,
+    created_at DATETIME NOT NULL,
+    updated_at DATETIME NOT NULL,
+    PRIMARY KEY (id),
+    FOREIGN KEY(category_id) REFERENCES categories (id)
+);
+CREATE INDEX ix_expenses_description ON expenses (description);
+CREATE INDEX ix_expenses_date ON expenses (date);
+CREATE INDEX ix_expenses_category_id ON expenses (category_id);
+INSERT INTO categories VALUES
+    (1, 'Food & Dining', NULL, '#FF6B6B', '🍽️', 1, '2024-01-01 00:00:00.000000'),
+    (2, 'Transportation', NULL, '#4ECDC4', '🚗', 1, '2024-01-01 00:00:00.000000');
+INSERT INTO expenses VALUES
+    (1, 'Lunch', 12.50, '2024-03-05', NULL, 1, '2024-03-05 12:00:00.000000', '2024-03-05 12:00:00.000000'),
+    (2, 'Dinner', 20.10, '2024-03-20', 'with friends', 1, '2024-03-20 19:00:00.000000', '2024-03-21 08:00:00.000000'),
+    (3, 'Bus pass', 45.00, '2024-04-01', NULL, 2, '2024-04-01 09:00:00.000000', '2024-04-01 09:00:00.000000');
+"""
+
+
+@pytest.fixture
+def database(tmp_path):
+    path = tmp_path / 'baseline.db'
+    with sqlite3.connect(path) as connection:
+        connection.executescript(BASELINE_SCHEMA)
+    return path
+
+
+def _flask(database, *args, input=None):
+    environment = dict(
+        os.environ,
+        FLASK_CONFIG='production',
+        DATABASE_URL=f'sqlite:///{database}',
+        JINJA_BYTECODE_CACHE_DIR=''
+    )
+    return subprocess.run(
+        [sys.executable, '-m', 'flask', '--app', 'run', *args],
+        cwd=APP_DIR, env=environment, input=input, capture_output=True, text=True
+    )
+
+
+def _query(database, sql):
+    with sqlite3.connect(database) as connection:
+        return connection.execute(sql).fetchall()
+
+
+def _migrate_tenancy(database):
+    result = _flask(database, 'migrate-tenancy', '--owner', 'alice', input='alice-password\nalice-password\n')
+    assert result.returncode == 0, result.stderr
+    return result
+
+
+def test_migrate_tenancy_assigns_baseline_data_to_the_owner(database):
+    _migrate_tenancy(database)
+    # Existing rows keep their amounts and timestamps
+    assert _query(database, 'SELECT id, user_id, amount, updated_at FROM expenses ORDER BY id') == [
+        (1, 1, 12.5, '2024-03-05 12:00:00.000000'),
+        (2, 1, 20.1, '2024-03-21 08:00:00.000000'),
+        (3, 1, 45, '2024-04-01 09:00:00.000000')
+    ]
+    assert _query(database, 'SELECT DISTINCT user_id FROM categories') == [(1,)]
+    indexes = {name for name, in _query(database, "SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert {'ix_expenses_user_recent', 'ix_expenses_user_category_recent'} <= indexes
+    assert not {'ix_categories_name', 'ix_expenses_description'} & indexes
+    assert 'already has per-user ownership' in _flask(database, 'migrate-tenancy', '--owner', 'alice').stdout
+
+
+def test_money_migration_refuses_to_run_before_tenancy(database):
+    result = _flask(database, 'migrate-money-to-cents')
+    assert result.returncode != 0
+    assert 'run `flask migrate-tenancy --owner NAME` first' in result.stderr
+    assert _query(database, 'SELECT id, amount FROM expenses ORDER BY id') == [(1, 12.5), (2, 20.1), (3, 45)]
+
+
+def test_baseline_database_upgrades_in_documented_order(database):
+    assert 'run `flask migrate-money-to-cents` next' in _migrate_tenancy(database).stdout
+    for command in ('migrate-money-to-cents', 'migrate-recurring-schema', 'migrate-expense-indexes'):
+        result = _flask(database, command)
+        assert result.returncode == 0, result.stderr
+
+    assert _query(database, 'SELECT id, user_id, amount_cents, updated_at FROM expenses ORDER BY id') == [
+        (1, 1, 1250, '2024-03-05 12:00:00.000000'),
+        (2, 1, 2010, '2024-03-21 08:00:00.000000'),
+        (3, 1, 4500, '2024-04-01 09:00:00.000000')
+    ]
+    assert _query(database, 'SELECT year, month, category_id, total_cents, count FROM expense_rollups ORDER BY month') == [
+        (2024, 3, 1, 3260, 2),
+        (2024, 4, 2, 4500, 1)
+    ]
+    assert 'already stored in cents' in _flask(database, 'migrate-money-to-cents').stdout
+
+
+def test_index_migration_refuses_to_run_before_tenancy(database):
+    result = _flask(database, 'migrate-expense-indexes')
+    assert result.returncode != 0
+    assert 'run `flask migrate-tenancy --owner NAME` first' in result.stderr
+    assert 'OperationalError' not in result.stderr
+
+
+def test_upgraded_database_passes_the_query_plan_check(database):
+    _migrate_tenancy(database)
+    for command in ('migrate-money-to-cents', 'migrate-expense-indexes'):
+        assert _flask(database, command).returncode == 0
+    result = _flask(database, 'check-query-plans', '--user', 'alice')
+    assert result.returncode == 0, result.stdout + result.stderr
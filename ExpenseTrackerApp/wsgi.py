@@ -0,0 +1,15 @@
+"""
+WSGI Entry Point for Flask Expense Tracker
+
+Production servers load the application from here:
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+The configuration is taken from FLASK_CONFIG and defaults to production.
+run.py stays the development entry point.
+"""
+
+import os
+from app import create_app
+
+app = create_app(os.getenv('FLASK_CONFIG') or 'production')